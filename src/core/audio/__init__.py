@@ -0,0 +1,26 @@
+from .waveform import WaveformPyramid
+from .reader import AudioReader
+from .dsp import (
+    AudioEffect, VolumeEffect, EQEffect, FadeEffect,
+    AUDIO_EFFECT_TYPES, create_audio_effect, audio_effect_from_dict
+)
+from .mixer import AudioClip, AudioMixer
+from .engine import AudioEngine, MixAhead, render_audio, export_audio
+
+__all__ = [
+    'WaveformPyramid',
+    'AudioReader',
+    'AudioEffect',
+    'VolumeEffect',
+    'EQEffect',
+    'FadeEffect',
+    'AUDIO_EFFECT_TYPES',
+    'create_audio_effect',
+    'audio_effect_from_dict',
+    'AudioClip',
+    'AudioMixer',
+    'AudioEngine',
+    'MixAhead',
+    'render_audio',
+    'export_audio'
+]
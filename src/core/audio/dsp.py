@@ -0,0 +1,194 @@
+import uuid
+import numpy as np
+
+
+class AudioEffect:
+    """Base class for audio effects.
+
+    Effects process (frames, channels) float32 blocks in place. ``clip_time``
+    is the time of the block's first frame within the clip, so effects that
+    depend on position (fades) work the same in playback and offline export.
+    """
+
+    def __init__(self):
+        self.id = str(uuid.uuid4())
+        self.enabled = True
+
+    def reset(self):
+        """Forget state carried between blocks, e.g. after a seek."""
+        pass
+
+    def process(self, block: np.ndarray, clip_time: float, clip_duration: float,
+                sample_rate: int):
+        """Process a block in place."""
+        raise NotImplementedError
+
+    def to_dict(self) -> dict:
+        """Convert the effect to a dictionary for serialization."""
+        return {
+            'id': self.id,
+            'type': self.__class__.__name__,
+            'enabled': self.enabled
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'AudioEffect':
+        """Create an effect from a dictionary."""
+        params = {key: value for key, value in data.items()
+                  if key not in ('id', 'type', 'enabled')}
+        effect = cls(**params)
+        effect.id = data['id']
+        effect.enabled = data['enabled']
+        return effect
+
+
+def db_to_gain(db: float) -> float:
+    return 10.0 ** (db / 20.0)
+
+
+class VolumeEffect(AudioEffect):
+    """Constant gain in decibels."""
+
+    def __init__(self, gain_db: float = 0.0):
+        super().__init__()
+        self.gain_db = gain_db
+
+    def process(self, block, clip_time, clip_duration, sample_rate):
+        if self.gain_db != 0.0:
+            block *= db_to_gain(self.gain_db)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data['gain_db'] = self.gain_db
+        return data
+
+
+class EQEffect(AudioEffect):
+    """Three-band equaliser (low shelf, mid, high shelf) in decibels.
+
+    The response is realised as a linear-phase FIR filter applied by
+    overlap-save FFT convolution, so each block costs a couple of vectorised
+    FFTs regardless of the settings. The filter adds TAPS // 2 frames of
+    latency; a flat EQ is skipped entirely.
+    """
+
+    TAPS = 255
+    DESIGN_SIZE = 4096  # Frequency grid the response is sampled on
+
+    def __init__(self, low_db: float = 0.0, mid_db: float = 0.0, high_db: float = 0.0,
+                 low_freq: float = 250.0, high_freq: float = 4000.0):
+        super().__init__()
+        self.low_db = low_db
+        self.mid_db = mid_db
+        self.high_db = high_db
+        self.low_freq = low_freq
+        self.high_freq = high_freq
+        self._spectra = {}  # (settings, sample rate, fft size) -> kernel spectrum
+        self._history = None  # Last TAPS - 1 input frames
+
+    def reset(self):
+        self._history = None
+
+    def settings(self):
+        return (self.low_db, self.mid_db, self.high_db, self.low_freq, self.high_freq)
+
+    def kernel(self, sample_rate: int) -> np.ndarray:
+        """Windowed FIR kernel approximating the band gains."""
+        freqs = np.fft.rfftfreq(self.DESIGN_SIZE, 1.0 / sample_rate)
+        # Interpolate the gain in dB over log frequency, an octave around each crossover
+        knots = np.log2([self.low_freq / 1.4142, self.low_freq * 1.4142,
+                         self.high_freq / 1.4142, self.high_freq * 1.4142])
+        gains_db = np.interp(np.log2(np.maximum(freqs, 1.0)), knots,
+                             [self.low_db, self.mid_db, self.mid_db, self.high_db])
+        impulse = np.fft.irfft(10.0 ** (gains_db / 20.0), n=self.DESIGN_SIZE)
+        impulse = np.roll(impulse, self.TAPS // 2)[:self.TAPS]
+        return (impulse * np.hanning(self.TAPS)).astype(np.float32)
+
+    def spectrum(self, sample_rate: int, fft_size: int) -> np.ndarray:
+        key = (self.settings(), sample_rate, fft_size)
+        spectrum = self._spectra.get(key)
+        if spectrum is None:
+            spectrum = np.fft.rfft(self.kernel(sample_rate), fft_size)[:, np.newaxis]
+            self._spectra = {key: spectrum}  # Only the current settings are kept
+        return spectrum
+
+    def process(self, block, clip_time, clip_duration, sample_rate):
+        if self.low_db == self.mid_db == self.high_db == 0.0:
+            return
+        frames, channels = block.shape
+        overlap = self.TAPS - 1
+        if self._history is None or self._history.shape[1] != channels:
+            self._history = np.zeros((overlap, channels), dtype=np.float32)
+
+        # Overlap-save: filter history + block and keep the fully convolved tail
+        signal = np.concatenate([self._history, block])
+        fft_size = 1 << int(np.ceil(np.log2(len(signal))))
+        spectrum = np.fft.rfft(signal, fft_size, axis=0)
+        spectrum *= self.spectrum(sample_rate, fft_size)
+        filtered = np.fft.irfft(spectrum, fft_size, axis=0)
+        self._history[...] = signal[-overlap:]
+        block[...] = filtered[overlap:overlap + frames]
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data.update({
+            'low_db': self.low_db,
+            'mid_db': self.mid_db,
+            'high_db': self.high_db,
+            'low_freq': self.low_freq,
+            'high_freq': self.high_freq
+        })
+        return data
+
+
+class FadeEffect(AudioEffect):
+    """Linear fade in at the start of the clip and fade out at its end."""
+
+    def __init__(self, fade_in: float = 0.5, fade_out: float = 0.5):
+        super().__init__()
+        self.fade_in = max(0.0, fade_in)
+        self.fade_out = max(0.0, fade_out)
+        self._ramp = np.zeros(0, dtype=np.float32)  # 0, 1, 2, ... reused for every block
+
+    def process(self, block, clip_time, clip_duration, sample_rate):
+        frames = len(block)
+        block_end = clip_time + frames / sample_rate
+        if clip_time >= self.fade_in and block_end <= clip_duration - self.fade_out:
+            return  # Fully between the fades
+
+        if len(self._ramp) < frames:
+            self._ramp = np.arange(frames, dtype=np.float32)
+        times = self._ramp[:frames] / sample_rate + clip_time
+        gains = np.ones(frames, dtype=np.float32)
+        if self.fade_in > 0:
+            np.minimum(gains, times / self.fade_in, out=gains)
+        if self.fade_out > 0:
+            np.minimum(gains, (clip_duration - times) / self.fade_out, out=gains)
+        np.clip(gains, 0.0, 1.0, out=gains)
+        block *= gains[:, np.newaxis]
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data.update({
+            'fade_in': self.fade_in,
+            'fade_out': self.fade_out
+        })
+        return data
+
+
+AUDIO_EFFECT_TYPES = {
+    'Volume': VolumeEffect,
+    'EQ': EQEffect,
+    'Fade': FadeEffect,
+}
+
+
+def create_audio_effect(name: str) -> AudioEffect:
+    """Create an audio effect from its palette name ("Volume", "EQ" or "Fade")."""
+    return AUDIO_EFFECT_TYPES[name]()
+
+
+def audio_effect_from_dict(data: dict) -> AudioEffect:
+    """Recreate a serialized audio effect."""
+    classes = {cls.__name__: cls for cls in AUDIO_EFFECT_TYPES.values()}
+    return classes[data['type']].from_dict(data)
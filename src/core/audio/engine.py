@@ -0,0 +1,158 @@
+import wave
+import logging
+import threading
+import numpy as np
+
+from .mixer import AudioMixer
+
+logger = logging.getLogger(__name__)
+
+
+class AudioEngine:
+    """Produces the mixed timeline audio block by block and keeps the play position.
+
+    Blocks are pulled in order with ``next_block``; during playback a
+    MixAhead does so on its own thread. ``time`` gives the timeline time
+    being heard from the frames still queued in the output.
+    """
+
+    def __init__(self, clips=(), sample_rate: int = 48000, channels: int = 2,
+                 block_size: int = 1024):
+        self.mixer = AudioMixer(sample_rate, channels, block_size)
+        self.mixer.set_clips(clips)
+        self.frame = 0  # Timeline frame of the next block
+
+    @property
+    def sample_rate(self) -> int:
+        return self.mixer.sample_rate
+
+    def set_clips(self, clips):
+        self.mixer.set_clips(clips)
+
+    def seek(self, time_pos: float):
+        """Continue from a timeline time; decoders reopen lazily."""
+        self.frame = int(round(max(0.0, time_pos) * self.sample_rate))
+
+    def next_block(self) -> np.ndarray:
+        """Mix and return the next block (a reused buffer) and advance."""
+        block = self.mixer.mix(self.frame)
+        self.frame += len(block)
+        return block
+
+    def time(self, buffered_frames: int = 0) -> float:
+        """Timeline time being heard, given the frames still queued in the output."""
+        return max(0, self.frame - buffered_frames) / self.sample_rate
+
+    def close(self):
+        self.mixer.close()
+
+
+class MixAhead:
+    """Mixes an AudioEngine ahead of playback on a worker thread into a ring buffer.
+
+    Mixing reads from the decoders' pipes and may block, so it stays off
+    the thread feeding the audio device, which only copies mixed frames out
+    with ``read_into``. The worker keeps up to ``blocks`` blocks mixed
+    ahead and waits while the ring is full.
+    """
+
+    def __init__(self, engine: AudioEngine, blocks: int = 8):
+        self.engine = engine
+        self.block_size = engine.mixer.block_size
+        self.ring = np.zeros((blocks * self.block_size, engine.mixer.channels), dtype=np.float32)
+        self.written = 0  # Frames mixed into the ring since the last start
+        self.read = 0     # Frames copied out since the last start
+        self.start_frame = 0
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.thread = None
+
+    def start(self, time_pos: float = 0.0):
+        """Discard mixed audio and mix from a timeline time."""
+        self.stop()
+        self.engine.seek(time_pos)
+        self.start_frame = self.engine.frame
+        self.written = self.read = 0
+        self.stopping = False
+        self.thread = threading.Thread(target=self._run, name="audio-mix", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        size = len(self.ring)
+        while True:
+            with self.condition:
+                while not self.stopping and self.written - self.read > size - self.block_size:
+                    self.condition.wait()
+                if self.stopping:
+                    return
+            try:
+                block = self.engine.next_block()
+            except Exception as e:
+                logger.error(f"Error mixing audio: {e}")
+                return
+            with self.condition:
+                # Blocks tile the ring exactly, so a block never wraps
+                start = self.written % size
+                self.ring[start:start + len(block)] = block
+                self.written += len(block)
+                self.condition.notify_all()
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Copy up to ``len(out)`` mixed frames; returns how many were ready."""
+        size = len(self.ring)
+        with self.condition:
+            frames = min(len(out), self.written - self.read)
+            start = self.read % size
+            first = min(frames, size - start)
+            out[:first] = self.ring[start:start + first]
+            out[first:frames] = self.ring[:frames - first]
+            self.read += frames
+            self.condition.notify_all()
+        return frames
+
+    def time(self, buffered_frames: int = 0) -> float:
+        """Timeline time being heard, given the frames copied out but still queued."""
+        return max(0, self.start_frame + self.read - buffered_frames) / self.engine.sample_rate
+
+    def stop(self):
+        """Stop the worker; a block being mixed is finished first."""
+        if self.thread is None:
+            return
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.thread = None
+
+
+def render_audio(clips, start_time: float, end_time: float, sample_rate: int = 48000,
+                 channels: int = 2, block_size: int = 4096):
+    """Render a timeline range offline, yielding mixed blocks.
+
+    Uses the same mixer and effects as playback. Each yielded block is a
+    view of a reused buffer, valid until the next iteration; the last one
+    is trimmed to ``end_time``.
+    """
+    engine = AudioEngine(clips, sample_rate, channels, block_size)
+    try:
+        engine.seek(start_time)
+        end_frame = int(round(end_time * sample_rate))
+        while engine.frame < end_frame:
+            frames = min(block_size, end_frame - engine.frame)
+            yield engine.next_block()[:frames]
+    finally:
+        engine.close()
+
+
+def export_audio(clips, path: str, duration: float, sample_rate: int = 48000, channels: int = 2):
+    """Mix clips from time 0 to ``duration`` into a 16-bit WAV file."""
+    pcm = None
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        for block in render_audio(clips, 0.0, duration, sample_rate, channels):
+            if pcm is None or len(pcm) != len(block):
+                pcm = np.empty(block.shape, dtype=np.int16)
+            np.multiply(block, 32767.0, out=pcm, casting='unsafe')
+            wav.writeframes(pcm.tobytes())
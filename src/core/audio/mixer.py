@@ -0,0 +1,141 @@
+import copy
+import logging
+import numpy as np
+
+from .reader import AudioReader
+
+logger = logging.getLogger(__name__)
+
+
+class AudioClip:
+    """A span of a file's audio placed on the timeline.
+
+    Args:
+        path: Media file
+        start_time: Timeline time the clip starts at
+        duration: Length on the timeline in seconds
+        source_start: Time in the source file the clip starts from
+        speed: Playback speed (time-stretched, pitch preserved)
+        effects: AudioEffects applied in order
+        muted: Contribute silence (e.g. reversed clips)
+    """
+
+    def __init__(self, path: str, start_time: float, duration: float, source_start: float = 0.0,
+                 speed: float = 1.0, effects=(), muted: bool = False):
+        self.path = path
+        self.start_time = start_time
+        self.duration = duration
+        self.source_start = source_start
+        self.speed = speed
+        self.effects = list(effects)
+        self.muted = muted
+
+    @classmethod
+    def from_video_node(cls, node, start_time: float) -> 'AudioClip':
+        """The audio of a timeline clip; reversed clips are silent."""
+        return cls(node.video_path, start_time, node.get_duration(),
+                   source_start=node.start_time, speed=node.speed,
+                   effects=node.audio_effects, muted=node.is_reversed or not node.has_audio)
+
+
+class _ClipStream:
+    """Decoder state of one clip during mixing."""
+
+    def __init__(self, clip: AudioClip, local_frame: int, sample_rate: int, channels: int, effects):
+        self.reader = AudioReader(clip.path, sample_rate, channels,
+                                  start_time=clip.source_start + local_frame / sample_rate * clip.speed,
+                                  speed=clip.speed)
+        self.next_frame = local_frame  # Clip-local frame the reader produces next
+        for effect in effects:
+            effect.reset()
+
+
+class AudioMixer:
+    """Mixes the clips active in each block into one reused output buffer.
+
+    Each clip keeps a streaming decoder open while blocks are requested in
+    order; a jump (seek) reopens it at the new position. Clips are read into
+    a shared scratch block, processed in place by their effects and summed,
+    so mixing allocates nothing per block. Decoding runs in the ffmpeg
+    subprocesses, leaving only the vectorised DSP and sums on this thread.
+
+    Each mixer processes its own copies of the clips' effects, so stateful
+    effects (the EQ's filter history) are not shared between a node preview
+    and timeline playback mixing the same clip.
+    """
+
+    def __init__(self, sample_rate: int = 48000, channels: int = 2, block_size: int = 1024):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self.clips = []
+        self.streams = {}  # id(clip) -> _ClipStream
+        self.effects = {}  # id(clip) -> this mixer's copies of the clip's effects
+        self.out = np.zeros((block_size, channels), dtype=np.float32)
+        self.scratch = np.zeros((block_size, channels), dtype=np.float32)
+
+    def set_clips(self, clips):
+        """Replace the clips being mixed, closing decoders of removed ones."""
+        self.clips = list(clips)
+        self.effects = {id(clip): self.effects.get(id(clip)) or [copy.deepcopy(effect) for effect in clip.effects]
+                        for clip in self.clips}
+        keep = {id(clip) for clip in self.clips}
+        for key in [key for key in self.streams if key not in keep]:
+            self.streams.pop(key).reader.close()
+
+    def clip_frames(self, clip: AudioClip):
+        """Timeline frame range [start, end) covered by a clip."""
+        start = int(round(clip.start_time * self.sample_rate))
+        return start, start + int(round(clip.duration * self.sample_rate))
+
+    def stream_for(self, clip: AudioClip, local_frame: int) -> _ClipStream:
+        """Get the clip's decoder positioned at a clip-local frame."""
+        stream = self.streams.get(id(clip))
+        if stream is not None and stream.next_frame != local_frame:
+            stream.reader.close()
+            stream = None
+        if stream is None:
+            stream = _ClipStream(clip, local_frame, self.sample_rate, self.channels, self.effects[id(clip)])
+            self.streams[id(clip)] = stream
+        return stream
+
+    def mix(self, start_frame: int) -> np.ndarray:
+        """Mix one block starting at a timeline frame; returns the reused output buffer."""
+        out = self.out
+        out[...] = 0.0
+        block_end = start_frame + self.block_size
+
+        for clip in self.clips:
+            clip_start, clip_end = self.clip_frames(clip)
+            if clip_end <= start_frame or clip_start >= block_end:
+                if clip_end <= start_frame and id(clip) in self.streams:
+                    self.streams.pop(id(clip)).reader.close()  # Finished
+                continue
+            if clip.muted:
+                continue
+
+            first = max(clip_start, start_frame) - start_frame
+            last = min(clip_end, block_end) - start_frame
+            local_frame = start_frame + first - clip_start
+            try:
+                stream = self.stream_for(clip, local_frame)
+                part = self.scratch[:last - first]
+                stream.reader.read_into(part)
+                stream.next_frame += last - first
+                clip_time = local_frame / self.sample_rate
+                for effect in self.effects[id(clip)]:
+                    if effect.enabled:
+                        effect.process(part, clip_time, clip.duration, self.sample_rate)
+                out[first:last] += part
+            except Exception as e:
+                logger.error(f"Error mixing audio of {clip.path}: {e}")
+                stream = self.streams.pop(id(clip), None)
+                if stream is not None:
+                    stream.reader.close()
+
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+    def close(self):
+        """Stop all decoders."""
+        self.set_clips([])
@@ -0,0 +1,74 @@
+import logging
+import numpy as np
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+
+def atempo_factors(speed: float):
+    """Split a speed change into ffmpeg atempo factors, which must lie in 0.5-2.0."""
+    factors = []
+    while speed > 2.0:
+        factors.append(2.0)
+        speed /= 2.0
+    while speed < 0.5:
+        factors.append(0.5)
+        speed /= 0.5
+    if abs(speed - 1.0) > 1e-6:
+        factors.append(speed)
+    return factors
+
+
+class AudioReader:
+    """Decodes a file's audio through an ffmpeg pipe as interleaved float32 frames.
+
+    Audio is resampled to ``sample_rate`` with ``channels`` channels, starts at
+    ``start_time`` seconds into the source and is time-stretched by ``speed``
+    without changing pitch. Frames are read straight into caller buffers, so
+    the reader allocates nothing per block.
+    """
+
+    def __init__(self, path: str, sample_rate: int = 48000, channels: int = 2,
+                 start_time: float = 0.0, speed: float = 1.0):
+        self.path = path
+        self.channels = channels
+        self.frame_bytes = 4 * channels
+        self.ended = False
+
+        stream = ffmpeg.input(path, ss=start_time) if start_time > 0 else ffmpeg.input(path)
+        audio = stream.audio
+        for factor in atempo_factors(speed):
+            audio = audio.filter('atempo', factor)
+        self.process = (
+            audio.output('pipe:', format='f32le', acodec='pcm_f32le', ac=channels, ar=sample_rate)
+            .global_args('-nostdin', '-loglevel', 'error')
+            .run_async(pipe_stdout=True)
+        )
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Fill a C-contiguous (frames, channels) float32 buffer.
+
+        Returns the number of frames decoded; the rest of the buffer is
+        zeroed once the audio ends (or if the file has no audio).
+        """
+        view = memoryview(out).cast('B')
+        filled = 0
+        while filled < len(view) and not self.ended:
+            count = self.process.stdout.readinto(view[filled:])
+            if not count:
+                self.ended = True
+                break
+            filled += count
+        frames = filled // self.frame_bytes
+        if frames < len(out):
+            out[frames:] = 0.0
+        return frames
+
+    def close(self):
+        """Stop the decoder."""
+        try:
+            self.process.stdout.close()
+            self.process.kill()
+            self.process.wait()
+        except Exception as e:
+            logger.error(f"Error closing audio reader for {self.path}: {e}")
@@ -0,0 +1,174 @@
+import os
+import json
+import logging
+import numpy as np
+import ffmpeg
+
+from ..cache import cache_dir, media_fingerprint, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_SAMPLE_RATE = 22050
+BASE_BLOCK = 64        # Samples summarised by one peak of the finest level
+LEVEL_FACTOR = 4       # Peaks of one level merged into one peak of the next
+CHUNK_BLOCKS = 4096    # Base peaks computed per chunk read from the decoder
+MIN_LEVEL_PEAKS = 16   # Stop building coarser levels below this many peaks
+
+
+def _reduce_level(peaks: np.ndarray) -> np.ndarray:
+    """Merge groups of LEVEL_FACTOR (min, max) peaks into one."""
+    count = len(peaks) // LEVEL_FACTOR * LEVEL_FACTOR
+    tail = peaks[count:]
+    grouped = peaks[:count].reshape(-1, LEVEL_FACTOR, 2)
+    reduced = np.empty((len(grouped) + (1 if len(tail) else 0), 2), dtype=peaks.dtype)
+    reduced[:len(grouped), 0] = grouped[:, :, 0].min(axis=1)
+    reduced[:len(grouped), 1] = grouped[:, :, 1].max(axis=1)
+    if len(tail):
+        reduced[-1, 0] = tail[:, 0].min()
+        reduced[-1, 1] = tail[:, 1].max()
+    return reduced
+
+
+def _base_peaks(samples: np.ndarray) -> np.ndarray:
+    """(min, max) of every BASE_BLOCK samples; a final partial block is padded with its last sample."""
+    blocks = -(-len(samples) // BASE_BLOCK)
+    if len(samples) < blocks * BASE_BLOCK:
+        samples = np.concatenate([samples, np.full(blocks * BASE_BLOCK - len(samples),
+                                                   samples[-1], samples.dtype)])
+    samples = samples.reshape(blocks, BASE_BLOCK)
+    return np.stack([samples.min(axis=1), samples.max(axis=1)], axis=1)
+
+
+def _build_levels(base: np.ndarray):
+    """Stack level 0 peaks and the coarser levels reduced from them.
+
+    Returns (peaks, levels) as stored by WaveformPyramid.
+    """
+    levels = []
+    arrays = []
+    offset = 0
+    level = base
+    samples_per_peak = BASE_BLOCK
+    while len(level):
+        levels.append((offset, len(level), samples_per_peak))
+        arrays.append(level)
+        offset += len(level)
+        if len(level) <= MIN_LEVEL_PEAKS:
+            break
+        level = _reduce_level(level)
+        samples_per_peak *= LEVEL_FACTOR
+    peaks = np.concatenate(arrays) if arrays else np.zeros((0, 2), np.int16)
+    return peaks, levels
+
+
+class WaveformPyramid:
+    """Multi-resolution min/max peaks of a clip's audio.
+
+    Level 0 holds one (min, max) pair per BASE_BLOCK samples; every further
+    level merges LEVEL_FACTOR peaks of the previous one. All levels live in a
+    single int16 array that is memory-mapped from disk, so drawing a range at
+    any zoom only touches the pages of the level and range it needs.
+    """
+
+    def __init__(self, peaks: np.ndarray, levels, sample_rate: int):
+        self.peaks = peaks          # (total peaks, 2) int16, usually a memmap
+        self.levels = levels        # [(offset, count, samples per peak)] fine to coarse
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self) -> float:
+        if not self.levels:
+            return 0.0
+        offset, count, samples = self.levels[0]
+        return count * samples / self.sample_rate
+
+    @classmethod
+    def cache_paths(cls, media_path: str):
+        """Paths of the peak array and its metadata in the cache."""
+        base = os.path.join(cache_dir('waveforms'), media_fingerprint(media_path))
+        return base + '.npy', base + '.json'
+
+    @classmethod
+    def load(cls, media_path: str):
+        """Load a cached pyramid without touching the media, or None if not analysed."""
+        try:
+            peaks_path, meta_path = cls.cache_paths(media_path)
+            with open(meta_path) as f:
+                meta = json.load(f)
+            peaks = np.load(peaks_path, mmap_mode='r') if meta['levels'] else np.zeros((0, 2), np.int16)
+            return cls(peaks, [tuple(level) for level in meta['levels']], meta['sample_rate'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def analyse(cls, media_path: str, stop_event=None):
+        """Decode a clip's audio once, in chunks, and store its pyramid in the cache.
+
+        Audio that decodes to nothing is stored as an empty pyramid so it is
+        not analysed again. When ffmpeg fails (e.g. the clip has no audio
+        stream) an empty pyramid is returned without caching it. Returns
+        None if stopped through ``stop_event``.
+        """
+        chunks = []
+        process = (
+            ffmpeg.input(media_path)
+            .output('pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar=ANALYSIS_SAMPLE_RATE, vn=None)
+            .global_args('-nostdin', '-loglevel', 'error')
+            .run_async(pipe_stdout=True)
+        )
+        try:
+            chunk_bytes = BASE_BLOCK * CHUNK_BLOCKS * 2
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                data = process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                chunks.append(_base_peaks(np.frombuffer(data, dtype=np.int16)))
+        finally:
+            process.stdout.close()
+            process.wait()
+        if process.returncode != 0:
+            logger.warning(f"Audio analysis of {media_path} failed (ffmpeg exit code {process.returncode})")
+            return cls(np.zeros((0, 2), np.int16), [], ANALYSIS_SAMPLE_RATE)
+
+        peaks, levels = _build_levels(np.concatenate(chunks) if chunks else np.zeros((0, 2), np.int16))
+        peaks_path, meta_path = cls.cache_paths(media_path)
+        if levels:
+            np.save(peaks_path, peaks)
+        write_json_atomic(meta_path, {'levels': levels, 'sample_rate': ANALYSIS_SAMPLE_RATE})
+        return cls.load(media_path)
+
+    def level_for(self, seconds_per_pixel: float) -> int:
+        """Coarsest level that still has at least one peak per pixel."""
+        best = 0
+        for index, (offset, count, samples) in enumerate(self.levels):
+            if samples / self.sample_rate <= seconds_per_pixel:
+                best = index
+        return best
+
+    def peaks_for_range(self, start_time: float, end_time: float, pixels: int):
+        """Min and max amplitude (-1..1) per pixel column across a time range.
+
+        Only the slice of the best-matching level covering the range is read.
+        Returns two float32 arrays of length ``pixels`` (empty if no audio).
+        """
+        if not self.levels or pixels <= 0 or end_time <= start_time:
+            return np.zeros(0, np.float32), np.zeros(0, np.float32)
+
+        level = self.level_for((end_time - start_time) / pixels)
+        offset, count, samples = self.levels[level]
+        peak_duration = samples / self.sample_rate
+        first = int(start_time / peak_duration)
+        last = int(np.ceil(end_time / peak_duration))
+        first, last = max(0, min(first, count)), max(0, min(last, count))
+        if last <= first:
+            return np.zeros(pixels, np.float32), np.zeros(pixels, np.float32)
+
+        data = np.asarray(self.peaks[offset + first:offset + last])
+        # Split the peaks evenly across the pixel columns
+        edges = np.linspace(0, len(data), pixels + 1).astype(np.intp)
+        starts = np.minimum(edges[:-1], len(data) - 1)
+        mins = np.minimum.reduceat(data[:, 0], starts)
+        maxs = np.maximum.reduceat(data[:, 1], starts)
+        return mins.astype(np.float32) / 32768.0, maxs.astype(np.float32) / 32768.0
@@ -0,0 +1,48 @@
+import os
+import hashlib
+import json
+from pathlib import Path
+
+
+def cache_root() -> Path:
+    """Base directory for WeaveClip's on-disk caches."""
+    root = os.environ.get('WEAVECLIP_CACHE_DIR')
+    if root:
+        return Path(root)
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'weaveclip'
+
+
+def cache_dir(*parts) -> Path:
+    """Get (and create) a subdirectory of the cache root."""
+    path = cache_root().joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def path_key(path) -> str:
+    """Stable short key for a filesystem path."""
+    return hashlib.sha1(os.path.abspath(str(path)).encode('utf-8')).hexdigest()[:16]
+
+
+def media_fingerprint(path, size: int = None, mtime_ns: int = None) -> str:
+    """Identify a media file by path, size and modification time.
+
+    The file itself is never read, so fingerprints are cheap to compute for
+    whole directories; any rewrite of the file changes its fingerprint.
+    """
+    if size is None or mtime_ns is None:
+        stat = os.stat(path)
+        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+    key = f"{os.path.abspath(str(path))}|{size}|{mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def write_json_atomic(path, data):
+    """Write JSON so that readers see either the old or the new file, never a partial one."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,148 @@
+import queue
+import logging
+import threading
+import cv2
+import numpy as np
+
+from .frame_pool import FramePool
+from .image_reader import SequenceReader
+
+logger = logging.getLogger(__name__)
+
+
+class ClipReader:
+    """Decodes a clip's frames in playback order on a read-ahead thread.
+
+    Frames are produced for consecutive output frames at ``fps`` starting at
+    ``start_time`` (local to the clip), mapped through the node's trims, speed
+    and reversal. Forward playback reads the source sequentially and grabs
+    past skipped frames; only large jumps seek. Decoded frames are RGB and,
+    if ``size`` is given, shrunk before colour conversion.
+
+    Frames come from a recycled pool: a frame returned by ``read`` stays valid
+    until the next call to ``read``.
+    """
+
+    MAX_GRAB_AHEAD = 30  # Skip at most this many frames by grabbing instead of seeking
+
+    def __init__(self, video_node, fps: float, start_time: float = 0.0,
+                 size=None, read_ahead: int = 4):
+        self.video_node = video_node
+        self.fps = fps
+        self.start_time = start_time
+        self.size = size  # (width, height) or None for full resolution
+        self.queue = queue.Queue(maxsize=read_ahead)
+        # The consumer holds one frame and the decoder fills one more
+        self.pool = FramePool(depth=read_ahead + 2)
+        self.scratch = FramePool(depth=1)
+        self.stop_event = threading.Event()
+        self.ended = False  # Set once the end of the clip has been read
+        self.thread = threading.Thread(target=self._run, name="clip-reader", daemon=True)
+        self.thread.start()
+
+    @property
+    def frame_shape(self):
+        if self.size:
+            return (self.size[1], self.size[0], 3)
+        return (self.video_node.height, self.video_node.width, 3)
+
+    def _put(self, item) -> bool:
+        """Queue an item, giving up if the reader is closed."""
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        if self.video_node.images is not None:
+            self._run_images()
+            return
+        cap = cv2.VideoCapture(self.video_node.video_path)
+        try:
+            if not cap.isOpened():
+                logger.error(f"Could not open video for reading: {self.video_node.video_path}")
+                return
+
+            position = 0  # Source frame the capture reads next
+            output_frame = 0
+            duration = self.video_node.get_duration()
+            source_shape = (self.video_node.height, self.video_node.width, 3)
+            while not self.stop_event.is_set():
+                local_time = self.start_time + output_frame / self.fps
+                if local_time >= duration:
+                    break
+                wanted = self.video_node.source_frame_index(local_time)
+
+                if wanted < position or wanted - position > self.MAX_GRAB_AHEAD:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, wanted)
+                    position = wanted
+                while position < wanted:
+                    cap.grab()
+                    position += 1
+
+                ret, frame = cap.read(self.scratch.acquire(source_shape))
+                if not ret:
+                    break
+                position += 1
+
+                out = self.pool.acquire(self.frame_shape)
+                if self.size and frame.shape[:2] != self.frame_shape[:2]:
+                    frame = cv2.resize(frame, self.size, dst=self.scratch.acquire(self.frame_shape),
+                                       interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+                if not self._put(out):
+                    return
+                output_frame += 1
+        except Exception as e:
+            logger.error(f"Error reading {self.video_node.video_path}: {e}")
+        finally:
+            cap.release()
+            self._put(None)  # End of clip
+
+    def _run_images(self):
+        """Read an image sequence, whose frames are decoded in parallel on the image pool."""
+        reader = SequenceReader(self.video_node.images, size=self.size)
+        try:
+            output_frame = 0
+            duration = self.video_node.get_duration()
+            while not self.stop_event.is_set():
+                local_time = self.start_time + output_frame / self.fps
+                if local_time >= duration:
+                    break
+                frame = reader.read(self.video_node.source_frame_index(local_time))
+                if frame is None:
+                    break
+                out = self.pool.acquire(self.frame_shape)
+                if frame.shape != out.shape:
+                    cv2.resize(frame, self.size or (out.shape[1], out.shape[0]), dst=out,
+                               interpolation=cv2.INTER_AREA)
+                else:
+                    np.copyto(out, frame)
+                if not self._put(out):
+                    return
+                output_frame += 1
+        except Exception as e:
+            logger.error(f"Error reading {self.video_node.video_path}: {e}")
+        finally:
+            reader.close()
+            self._put(None)  # End of clip
+
+    def read(self, timeout: float = None):
+        """Get the next frame, or None at the end of the clip or on timeout (see ``ended``)."""
+        if self.ended or self.stop_event.is_set():
+            return None
+        try:
+            frame = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if frame is None:
+            self.ended = True
+        return frame
+
+    def close(self):
+        """Stop the read-ahead thread."""
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,241 @@
+from functools import partial
+import numpy as np
+import cv2
+
+from .frame_pool import FramePool
+from .transitions import blend_frames
+
+BLEND_MODES = ('normal', 'add', 'multiply', 'screen')
+
+
+class Layer:
+    """One track's contribution to an output frame.
+
+    Args:
+        frame: RGB frame (height, width, 3) as uint8
+        opacity: Overall opacity from 0 to 1
+        blend_mode: One of BLEND_MODES
+        x, y: Position of the frame's top-left corner in the output
+        alpha: Optional per-pixel alpha (height, width) as uint8
+    """
+
+    def __init__(self, frame: np.ndarray, opacity: float = 1.0, blend_mode: str = 'normal',
+                 x: int = 0, y: int = 0, alpha: np.ndarray = None):
+        if blend_mode not in BLEND_MODES:
+            raise ValueError(f"Invalid blend mode: {blend_mode}")
+        self.frame = frame
+        self.opacity = max(0.0, min(1.0, opacity))
+        self.blend_mode = blend_mode
+        self.x = x
+        self.y = y
+        self.alpha = alpha
+
+    @property
+    def is_opaque(self) -> bool:
+        """Whether the layer completely hides what is below it within its bounds."""
+        return self.opacity >= 1.0 and self.blend_mode == 'normal' and self.alpha is None
+
+    def clipped_rect(self, width: int, height: int):
+        """Bounds of the layer within the output as (x0, y0, x1, y1), possibly empty."""
+        h, w = self.frame.shape[:2]
+        return (max(0, self.x), max(0, self.y),
+                min(width, self.x + w), min(height, self.y + h))
+
+
+class Compositor:
+    """Stacks layers into a reused output frame.
+
+    Layers below one that is opaque over their whole area are skipped, and
+    partially transparent layers are blended only within their bounding box.
+    All intermediate buffers are allocated once for the output size, so the
+    result is the same array every call and stays valid until the next one.
+    """
+
+    def __init__(self, width: int, height: int, background=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.background = np.array(background, dtype=np.uint8)
+        self.out = np.empty((height, width, 3), dtype=np.uint8)
+        self._source = np.empty((height, width, 3), dtype=np.float32)
+        self._dest = np.empty((height, width, 3), dtype=np.float32)
+        self._weights = np.empty((height, width), dtype=np.float32)
+        self._product = None  # Only allocated once a screen blend is used
+
+    def visible_layers(self, layers):
+        """Drop layers (bottom to top order) that are empty, transparent or covered by an opaque layer above."""
+        visible = []
+        covering = []  # Rects of opaque layers above the current one
+        for layer in reversed(layers):
+            x0, y0, x1, y1 = layer.clipped_rect(self.width, self.height)
+            if x1 <= x0 or y1 <= y0 or layer.opacity <= 0.0:
+                continue
+            if any(cx0 <= x0 and cy0 <= y0 and cx1 >= x1 and cy1 >= y1
+                   for cx0, cy0, cx1, cy1 in covering):
+                continue
+            visible.append(layer)
+            if layer.is_opaque:
+                covering.append((x0, y0, x1, y1))
+        visible.reverse()
+        return visible
+
+    def composite(self, layers) -> np.ndarray:
+        """Composite layers given bottom to top; returns the reused output frame."""
+        layers = self.visible_layers(layers)
+        if not (layers and layers[0].is_opaque and
+                layers[0].clipped_rect(self.width, self.height) == (0, 0, self.width, self.height)):
+            self.out[...] = self.background
+
+        for layer in layers:
+            self.blend(layer)
+        return self.out
+
+    def blend(self, layer: Layer):
+        """Blend one layer onto the output within its bounding box."""
+        x0, y0, x1, y1 = layer.clipped_rect(self.width, self.height)
+        src = layer.frame[y0 - layer.y:y1 - layer.y, x0 - layer.x:x1 - layer.x]
+        dst = self.out[y0:y1, x0:x1]
+
+        if layer.is_opaque:
+            np.copyto(dst, src)
+            return
+
+        full_frame = (x0, y0, x1, y1) == (0, 0, self.width, self.height)
+        if full_frame and layer.blend_mode == 'normal' and layer.alpha is None:
+            # Uniform opacity over the whole frame: blend in place
+            cv2.addWeighted(src, layer.opacity, self.out, 1.0 - layer.opacity, 0, dst=self.out)
+            return
+
+        height, width = y1 - y0, x1 - x0
+        s = self._source[:height, :width]
+        d = self._dest[:height, :width]
+        np.copyto(s, src)
+        np.copyto(d, dst)
+
+        # Blend mode result into s
+        if layer.blend_mode == 'add':
+            s += d
+        elif layer.blend_mode == 'multiply':
+            s *= d
+            s *= 1.0 / 255.0
+        elif layer.blend_mode == 'screen':
+            # 255 - (255 - s)(255 - d) / 255 == s + d - s * d / 255
+            if self._product is None:
+                self._product = np.empty((self.height, self.width, 3), dtype=np.float32)
+            product = self._product[:height, :width]
+            np.multiply(s, d, out=product)
+            product *= 1.0 / 255.0
+            s += d
+            s -= product
+
+        # Mix the result over the destination by opacity (and alpha)
+        s -= d
+        if layer.alpha is not None:
+            w = self._weights[:height, :width]
+            np.multiply(layer.alpha[y0 - layer.y:y1 - layer.y, x0 - layer.x:x1 - layer.x],
+                        layer.opacity / 255.0, out=w, dtype=np.float32)
+            s *= w[:, :, np.newaxis]
+        else:
+            s *= layer.opacity
+        d += s
+        np.clip(d, 0, 255, out=d)
+        d += 0.5  # Round when truncating back to uint8
+        np.copyto(dst, d, casting='unsafe')
+
+
+class TrackCompositor:
+    """Composites the timeline clips active at a time, one layer per track.
+
+    Higher tracks are drawn over lower ones using each node's opacity and
+    blend mode. Tracks are visited top-down and decoded lazily, so tracks
+    below a full-frame opaque clip are never decoded. Inside a transition
+    both clips are rendered and blended into the incoming clip's layer.
+    Clips larger than the output are rendered at the scale that fits them,
+    effects included, so their geometry matches a full-size render; frames
+    still at the source's native size are scaled to fit the output.
+    """
+
+    def __init__(self, width: int, height: int, frame_source=None):
+        self.compositor = Compositor(width, height)
+        # Callable (node, local time, render scale) -> RGB frame
+        self.frame_source = frame_source or (
+            lambda node, time_pos, render_scale: node.get_frame_at_time(time_pos, render_scale))
+        # track -> FramePool for its scaled frames; two live at once inside a transition
+        self.track_buffers = {}
+
+    def render_scale(self, node) -> float:
+        """Scale at which a node's frames fit the output, at most 1."""
+        if not node.width or not node.height:
+            return 1.0
+        return min(1.0, self.compositor.width / node.width, self.compositor.height / node.height)
+
+    def fit(self, frame: np.ndarray, node) -> np.ndarray:
+        """Scale a frame at the node's native size to fit the output."""
+        height, width = frame.shape[:2]
+        if (height, width) != (node.height, node.width):
+            return frame
+        out_width, out_height = self.compositor.width, self.compositor.height
+        scale = min(out_width / width, out_height / height)
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        if size == (width, height):
+            return frame
+        pool = self.track_buffers.setdefault(node.track, FramePool(depth=2))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        return cv2.resize(frame, size, dst=pool.acquire((size[1], size[0], 3)),
+                          interpolation=interpolation)
+
+    def _frame(self, node, local_time: float):
+        frame = self.frame_source(node, local_time, self.render_scale(node))
+        return None if frame is None else self.fit(frame, node)
+
+    def _layers(self, clips):
+        """Layers, bottom to top, of (node, render callable) pairs; clips below a full-frame opaque one are not rendered."""
+        out_width, out_height = self.compositor.width, self.compositor.height
+        layers = []
+        for node, frame in sorted(clips, key=lambda clip: clip[0].track, reverse=True):
+            if node.opacity <= 0.0:
+                continue
+            frame = frame()
+            if frame is None:
+                continue
+            height, width = frame.shape[:2]
+            layer = Layer(frame, node.opacity, node.blend_mode,
+                          x=(out_width - width) // 2, y=(out_height - height) // 2)
+            layers.append(layer)
+            if layer.is_opaque and layer.clipped_rect(out_width, out_height) == (0, 0, out_width, out_height):
+                break  # Everything below is hidden
+        layers.reverse()
+        return layers
+
+    def composite(self, frames) -> np.ndarray:
+        """Composite already rendered (node, frame) pairs, one per track; returns the reused output frame.
+
+        Frames at a node's native size are fitted to the output; others
+        are centred as they are.
+        """
+        return self.compositor.composite(self._layers(
+            [(node, partial(self.fit, frame, node)) for node, frame in frames if frame is not None]))
+
+    def render(self, sequences, time_pos: float) -> np.ndarray:
+        """Composite the clips of ClipSequences at a timeline time."""
+        clips = []
+        for sequence in sequences:
+            found = sequence.find(time_pos)
+            if found is not None:
+                index, node, start_time = found
+                clips.append((node, partial(self._sequence_frame, sequence, index, time_pos)))
+        return self.compositor.composite(self._layers(clips))
+
+    def _sequence_frame(self, sequence, index: int, time_pos: float):
+        """A sequence's frame at a time, blending the previous clip in while its transition plays."""
+        node, start_time, advance, duration = sequence.entry(index)
+        frame = self._frame(node, time_pos - start_time)
+        if frame is None or index == 0:
+            return frame
+        previous, previous_start, previous_advance, previous_duration = sequence.entry(index - 1)
+        stop = previous_start + previous_duration
+        if previous.transition_out is None or time_pos >= stop:
+            return frame
+        frame_a = self._frame(previous, time_pos - previous_start)
+        if frame_a is None:
+            return frame
+        return blend_frames(previous.transition_out, frame_a, frame, (time_pos - start_time) / (stop - start_time))
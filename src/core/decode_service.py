@@ -0,0 +1,295 @@
+import os
+import logging
+import itertools
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFrameRing:
+    """Fixed-size frame slots in one block of shared memory.
+
+    The process that creates the ring owns the block and unlinks it on
+    close; other processes attach by name. A slot is wrapped as a NumPy
+    array in place, so a frame decoded into it in one process is read in
+    another without being copied or pickled.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, name: str = None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self.shm = _attach(name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def frame(self, slot: int, shape) -> np.ndarray:
+        """A uint8 array of the given shape over a slot's memory."""
+        if np.prod(shape) > self.slot_bytes:
+            raise ValueError(f"frame of shape {tuple(shape)} does not fit a {self.slot_bytes} byte slot")
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def close(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            # Arrays still wrap the block; it is unmapped once they are gone
+            logger.debug("Shared frame ring closed while frames were still referenced")
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _attach(name: str):
+    """Attach to an existing block, untracked where Python allows it.
+
+    Spawned workers share the creating process's resource tracker, so a
+    worker must not unregister the block: that would drop the creator's
+    registration too. Before Python 3.13 attaching registers the name
+    again, which the tracker ignores.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _decode_worker(ring_name: str, slots: int, slot_bytes: int, requests, results):
+    """Worker process: decode requested frames straight into ring slots.
+
+    Requests are ('open', stream, path, width, height, fps),
+    ('read', stream, frame_number, slot, ticket) and ('close', stream);
+    None stops the worker. Each read answers
+    (stream, frame_number, slot, ok, ticket) on the worker's own
+    ``results`` pipe, so a worker killed mid-write cannot block the others.
+    """
+    from .preview_reader import PreviewReader
+
+    ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+    readers = {}
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            kind, stream = request[0], request[1]
+            if kind == 'open':
+                readers[stream] = PreviewReader(*request[2:])
+            elif kind == 'close':
+                reader = readers.pop(stream, None)
+                if reader is not None:
+                    reader.close()
+            elif kind == 'read':
+                frame_number, slot, ticket = request[2:]
+                reader = readers.get(stream)
+                ok = False
+                if reader is not None:
+                    out = ring.frame(slot, reader.frame_shape)
+                    ok = reader.read_frame(frame_number, out=out) is not None
+                    del out
+                results.send((stream, frame_number, slot, ok, ticket))
+    except (KeyboardInterrupt, EOFError, BrokenPipeError):
+        pass
+    finally:
+        for reader in readers.values():
+            reader.close()
+        ring.close()
+        results.close()
+
+
+class DecodeService:
+    """Decodes preview frames in worker processes into a shared frame ring.
+
+    Each stream (one video at one preview size) is pinned to a worker, so
+    its frames are decoded in order by a single sequential PreviewReader
+    and many streams play on several cores at once. Only slot numbers
+    travel between processes; ``frame`` wraps a filled slot as an array
+    without copying. A slot stays reserved from ``request`` until the
+    consumer calls ``release``, so the ring bounds the frames in flight.
+
+    A worker that dies is noticed when its results pipe closes. It is
+    replaced and its streams reopened; frames it still owed are reported
+    as failed, so their slots are not lost.
+    """
+
+    def __init__(self, slot_bytes: int, slots: int = 32, workers: int = None):
+        if workers is None:
+            workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+        # Spawned workers do not inherit the GUI's threads or locks
+        self.context = multiprocessing.get_context('spawn')
+        self.ring = SharedFrameRing(slots, slot_bytes)
+        self.free_slots = list(range(slots))
+        self.lock = threading.Lock()
+        self.streams = {}  # stream -> (worker index, frame shape)
+        self.stream_sources = {}  # stream -> (video_path, width, height, fps), to reopen it
+        self.in_flight = {}  # slot -> (worker index, stream, frame_number, ticket)
+        self.lost = deque()  # (stream, frame_number) owed by workers that died
+        self.views = {}    # (slot, shape) -> array over the slot
+        self._stream_ids = itertools.count()
+        self._tickets = itertools.count()
+        self.requests = []
+        self.results = []  # Per worker: the receiving end of its results pipe
+        self.processes = []
+        self.closing = False
+        try:
+            for index in range(workers):
+                self.requests.append(self.context.Queue())
+                self.results.append(None)
+                self.processes.append(self._start_worker(index))
+        except Exception:
+            self.shutdown()
+            raise
+
+    def _start_worker(self, index: int):
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=_decode_worker, name=f"decode-{index}", daemon=True,
+                                       args=(self.ring.name, self.ring.slots, self.ring.slot_bytes,
+                                             self.requests[index], sender))
+        try:
+            process.start()
+        finally:
+            sender.close()  # Only the worker writes, so its exit closes the pipe
+        self.results[index] = receiver
+        return process
+
+    def open(self, video_path: str, width: int, height: int, fps: float) -> int:
+        """Start a stream of a video decoded at (width, height); returns its id."""
+        if width * height * 3 > self.ring.slot_bytes:
+            raise ValueError(f"{width}x{height} frames do not fit the decode ring's slots")
+        stream = next(self._stream_ids)
+        worker = stream % len(self.requests)
+        with self.lock:
+            self.streams[stream] = (worker, (height, width, 3))
+            self.stream_sources[stream] = (video_path, width, height, fps)
+            self.requests[worker].put(('open', stream, video_path, width, height, fps))
+        return stream
+
+    def request(self, stream: int, frame_number: int) -> bool:
+        """Ask for a frame of a stream; False when the stream is unknown or the ring is full."""
+        entry = self.streams.get(stream)
+        if entry is None:
+            return False
+        with self.lock:
+            if not self.free_slots:
+                return False
+            slot = self.free_slots.pop()
+            ticket = next(self._tickets)
+            self.in_flight[slot] = (entry[0], stream, frame_number, ticket)
+            self.requests[entry[0]].put(('read', stream, frame_number, slot, ticket))
+        return True
+
+    def next_result(self, timeout: float = None):
+        """The next decoded (stream, frame_number, slot), or None on timeout.
+
+        A frame that failed to decode, or was owed by a worker that died, is
+        reported with slot None; its slot has already been released.
+        """
+        if self.lost:
+            stream, frame_number = self.lost.popleft()
+            return stream, frame_number, None
+        pipes = [pipe for pipe in self.results if pipe is not None]
+        for pipe in wait(pipes, timeout):
+            try:
+                stream, frame_number, slot, ok, ticket = pipe.recv()
+                break
+            except (EOFError, OSError):
+                # The worker behind this pipe is exiting
+                self.processes[self.results.index(pipe)].join(timeout=1.0)
+                self.check_workers()
+        else:
+            if self.lost:
+                stream, frame_number = self.lost.popleft()
+                return stream, frame_number, None
+            return None
+        with self.lock:
+            entry = self.in_flight.get(slot)
+            if entry is None or entry[3] != ticket:
+                return None  # Already reclaimed from a worker that died
+            del self.in_flight[slot]
+            if not ok:
+                self.free_slots.append(slot)
+                slot = None
+        return stream, frame_number, slot
+
+    def check_workers(self):
+        """Replace workers that died, reclaiming the slots of the frames they owed."""
+        for index, process in enumerate(self.processes):
+            if self.closing or process.is_alive():
+                continue
+            process.join()
+            logger.warning(f"Decode worker {index} exited (code {process.exitcode}); restarting it")
+            self.results[index].close()
+            self.results[index] = None
+            with self.lock:
+                # A fresh queue, so requests the dead worker never took are not replayed
+                self.requests[index] = self.context.Queue()
+                for stream, (worker, shape) in self.streams.items():
+                    if worker == index:
+                        self.requests[index].put(('open', stream) + self.stream_sources[stream])
+                for slot, (worker, stream, frame_number, ticket) in list(self.in_flight.items()):
+                    if worker == index:
+                        del self.in_flight[slot]
+                        self.free_slots.append(slot)
+                        self.lost.append((stream, frame_number))
+            try:
+                self.processes[index] = self._start_worker(index)
+            except Exception as e:
+                logger.error(f"Error restarting decode worker {index}: {e}")
+
+    def frame(self, stream: int, slot: int) -> np.ndarray:
+        """The frame in a slot filled for a stream, as an array over shared memory.
+
+        Arrays are cached per slot and shape, so the same slot always gives
+        the same array object.
+        """
+        key = (slot, self.streams[stream][1])
+        view = self.views.get(key)
+        if view is None:
+            view = self.ring.frame(*key)
+            self.views[key] = view
+        return view
+
+    def release(self, slot: int):
+        """Hand a slot back for new frames once its contents are no longer shown."""
+        with self.lock:
+            self.free_slots.append(slot)
+
+    def close_stream(self, stream: int):
+        """Stop a stream; results already in flight for it still arrive and must be released."""
+        with self.lock:
+            entry = self.streams.pop(stream, None)
+            self.stream_sources.pop(stream, None)
+            if entry is not None:
+                self.requests[entry[0]].put(('close', stream))
+
+    def shutdown(self):
+        """Stop the workers and free the shared memory."""
+        self.closing = True
+        for requests in self.requests:
+            try:
+                requests.put(None)
+            except (OSError, ValueError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        for pipe in self.results:
+            if pipe is not None:
+                pipe.close()
+        self.results = []
+        self.views.clear()
+        self.ring.close()
@@ -1,13 +1,31 @@
 from .base_effect import BaseEffect
+from .keyframes import Keyframe, Curve
 from .color_effects import BrightnessEffect, ContrastEffect, SaturationEffect
 from .transform_effects import RotateEffect, ScaleEffect, CropEffect
+from .chain import apply_chain
+
+EFFECT_TYPES = {cls.__name__: cls for cls in (
+    BrightnessEffect, ContrastEffect, SaturationEffect,
+    RotateEffect, ScaleEffect, CropEffect
+)}
+
+
+def effect_from_dict(data: dict) -> BaseEffect:
+    """Recreate a serialized effect."""
+    return EFFECT_TYPES[data['type']].from_dict(data)
+
 
 __all__ = [
     'BaseEffect',
+    'Keyframe',
+    'Curve',
     'BrightnessEffect',
     'ContrastEffect',
     'SaturationEffect',
     'RotateEffect',
     'ScaleEffect',
-    'CropEffect'
+    'CropEffect',
+    'apply_chain',
+    'EFFECT_TYPES',
+    'effect_from_dict'
 ]
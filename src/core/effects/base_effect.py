@@ -1,13 +1,28 @@
 from abc import ABC, abstractmethod
+import copy
 import numpy as np
 import uuid
 
+from .keyframes import Curve
+
 class BaseEffect(ABC):
-    """Base class for all video effects."""
+    """Base class for all video effects.
+    
+    Numeric parameters can be animated by giving them a keyframe Curve in
+    ``curves``; ``evaluated`` gives the effect as it is at a clip time.
+    
+    Sizes are (width, height) and regions (x1, y1, x2, y2) in pixels. The
+    region methods let a chain process only the pixels that survive to
+    its output (see chain.apply_chain); the defaults need the whole input
+    unless the effect is ``pointwise``.
+    """
+    
+    pointwise = False  # Each output pixel depends only on the same input pixel
     
     def __init__(self):
         self.id = str(uuid.uuid4())
         self.enabled = True
+        self.curves = {}  # Parameter name -> Curve
     
     @abstractmethod
     def apply(self, frame: np.ndarray) -> np.ndarray:
@@ -21,14 +36,80 @@ class BaseEffect(ABC):
         """
         pass
     
+    def output_size(self, size: tuple) -> tuple:
+        """Size of the output for an input of ``size``."""
+        return size
+    
+    def input_region(self, region: tuple, size: tuple) -> tuple:
+        """Region of an input of ``size`` needed to produce ``region`` of the output."""
+        if self.pointwise:
+            return region
+        return (0, 0) + tuple(size)
+    
+    def apply_region(self, frame: np.ndarray, in_region: tuple, region: tuple, size: tuple) -> np.ndarray:
+        """Produce ``region`` of the output from ``frame``, the ``in_region`` part of the input."""
+        if self.pointwise:
+            return self.apply(frame)
+        x1, y1, x2, y2 = region
+        return self.apply(frame)[y1:y2, x1:x2]
+    
+    def commutes_with_resample(self) -> bool:
+        """Whether resampling before or after this effect gives the same result.
+        
+        True for point-wise effects that are linear over the whole 0-255
+        range (no clipping), up to rounding.
+        """
+        return False
+    
+    def animate(self, param: str, curve: Curve):
+        """Drive a parameter with a keyframe curve (None makes it static again)."""
+        if not hasattr(self, param):
+            raise ValueError(f"{self.__class__.__name__} has no parameter {param}")
+        if curve is None or not len(curve):
+            self.curves.pop(param, None)
+        else:
+            self.curves[param] = curve
+    
+    def is_animated(self) -> bool:
+        return bool(self.curves)
+    
+    def with_values(self, values: dict) -> 'BaseEffect':
+        """A shallow copy with the given parameter values, sharing curves and caches."""
+        effect = copy.copy(self)
+        for param, value in values.items():
+            setattr(effect, param, value)
+        return effect
+    
+    def evaluated(self, time: float) -> 'BaseEffect':
+        """The effect with its animated parameters at a clip time.
+        
+        Returns self when nothing is animated. The effect itself is not
+        modified, so frames at different times can be processed concurrently.
+        """
+        if not self.curves:
+            return self
+        return self.with_values({param: curve.value_at(time) for param, curve in self.curves.items()})
+    
+    def evaluated_batch(self, times) -> list:
+        """The effect at many clip times, sampling each curve in one vectorised call."""
+        times = np.asarray(times, dtype=np.float64)
+        if not self.curves:
+            return [self] * len(times)
+        samples = {param: curve.sample(times).tolist() for param, curve in self.curves.items()}
+        return [self.with_values({param: values[i] for param, values in samples.items()})
+                for i in range(len(times))]
+    
     @abstractmethod
     def to_dict(self) -> dict:
         """Convert the effect to a dictionary for serialization."""
-        return {
+        data = {
             'id': self.id,
             'type': self.__class__.__name__,
             'enabled': self.enabled
         }
+        if self.curves:
+            data['curves'] = {param: curve.to_dict() for param, curve in self.curves.items()}
+        return data
     
     @classmethod
     @abstractmethod
@@ -37,4 +118,5 @@ class BaseEffect(ABC):
         effect = cls()
         effect.id = data['id']
         effect.enabled = data['enabled']
+        effect.curves = {param: Curve.from_dict(curve) for param, curve in data.get('curves', {}).items()}
         return effect
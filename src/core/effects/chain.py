@@ -0,0 +1,72 @@
+import numpy as np
+
+from .transform_effects import ScaleEffect
+
+
+def reorder_chain(effects: list) -> list:
+    """Move point-wise effects after the downscales that follow them, where that is safe.
+
+    A point-wise effect that is linear over the whole range commutes with
+    resampling, so running it after a downscale gives the same frame while
+    touching fewer pixels. Other effects keep their order.
+    """
+    order = list(effects)
+    moved = True
+    while moved:
+        moved = False
+        for i in range(len(order) - 1):
+            effect, following = order[i], order[i + 1]
+            if (effect.pointwise and effect.commutes_with_resample() and
+                    isinstance(following, ScaleEffect) and following.is_downscale()):
+                order[i], order[i + 1] = following, effect
+                moved = True
+    return order
+
+
+def plan_regions(effects: list, size: tuple):
+    """Input and output regions of each effect, or None if some stage is empty.
+
+    Sizes are propagated forwards, then the region needed for the whole
+    output is propagated backwards, so each effect only produces the
+    pixels later effects read. Returns (sizes, regions) where effect i
+    turns ``regions[i]`` of an input of ``sizes[i]`` into ``regions[i + 1]``.
+    """
+    sizes = [tuple(size)]
+    for effect in effects:
+        sizes.append(tuple(effect.output_size(sizes[-1])))
+        if min(sizes[-1]) <= 0:
+            return None
+
+    regions = [(0, 0) + sizes[-1]]
+    for effect, in_size in zip(reversed(effects), reversed(sizes[:-1])):
+        region = tuple(effect.input_region(regions[0], in_size))
+        if region[2] <= region[0] or region[3] <= region[1]:
+            return None
+        regions.insert(0, region)
+    return sizes, regions
+
+
+def apply_chain(frame: np.ndarray, effects: list) -> np.ndarray:
+    """Apply effects in order, processing only the pixels that reach the output.
+
+    Crops and downscales at the end of a chain shrink the region every
+    earlier effect works on, so a tight crop of a 4K frame costs roughly
+    in proportion to the cropped area. The result matches applying the
+    effects one by one, up to interpolation rounding.
+    """
+    effects = reorder_chain([effect for effect in effects if effect.enabled])
+    if not effects:
+        return frame
+    height, width = frame.shape[:2]
+    plan = plan_regions(effects, (width, height))
+    if plan is None:
+        for effect in effects:
+            frame = effect.apply(frame)
+        return frame
+
+    sizes, regions = plan
+    x1, y1, x2, y2 = regions[0]
+    frame = frame[y1:y2, x1:x2]
+    for i, effect in enumerate(effects):
+        frame = effect.apply_region(frame, regions[i], regions[i + 1], sizes[i])
+    return frame
@@ -2,21 +2,54 @@ import numpy as np
 import cv2
 from .base_effect import BaseEffect
 
+RAMP = np.arange(256, dtype=np.float32)
+
+
+class LookupTable:
+    """A 256-entry table for a point-wise effect, rebuilt only when its value changes.
+    
+    Copies of an effect made by ``evaluated`` share the table, so an
+    animated parameter that holds still between keyframes costs no rebuilds.
+    """
+    
+    def __init__(self, build):
+        self.build = build
+        self.entry = (None, None)  # (value, table), replaced as a whole
+    
+    def get(self, value: float) -> np.ndarray:
+        cached_value, table = self.entry
+        if cached_value != value:
+            table = self.build(value)
+            self.entry = (value, table)
+        return table
+
+
 class BrightnessEffect(BaseEffect):
     """Adjust the brightness of a frame."""
     
+    pointwise = True
+    
     def __init__(self, value: float = 0.0):
         super().__init__()
         self.value = max(-1.0, min(1.0, value))
+        self.lut = LookupTable(self.build_lut)
+    
+    @staticmethod
+    def build_lut(value: float) -> np.ndarray:
+        if value > 0:
+            table = RAMP + value * 255
+        else:
+            table = RAMP * (1 + value)
+        return np.clip(np.rint(table), 0, 255).astype(np.uint8)
     
     def apply(self, frame: np.ndarray) -> np.ndarray:
         if not self.enabled:
             return frame
             
-        if self.value > 0:
-            return cv2.addWeighted(frame, 1, np.zeros_like(frame), 0, self.value * 255)
-        else:
-            return cv2.addWeighted(frame, 1 + self.value, np.zeros_like(frame), 0, 0)
+        return cv2.LUT(frame, self.lut.get(max(-1.0, min(1.0, self.value))))
+    
+    def commutes_with_resample(self) -> bool:
+        return self.value <= 0  # Darkening is a plain multiply
     
     def to_dict(self) -> dict:
         data = super().to_dict()
@@ -32,15 +65,25 @@ class BrightnessEffect(BaseEffect):
 class ContrastEffect(BaseEffect):
     """Adjust the contrast of a frame."""
     
+    pointwise = True
+    
     def __init__(self, value: float = 1.0):
         super().__init__()
         self.value = max(0.0, min(3.0, value))
+        self.lut = LookupTable(self.build_lut)
+    
+    @staticmethod
+    def build_lut(value: float) -> np.ndarray:
+        return np.clip(np.rint(RAMP * value), 0, 255).astype(np.uint8)
     
     def apply(self, frame: np.ndarray) -> np.ndarray:
         if not self.enabled:
             return frame
             
-        return cv2.convertScaleAbs(frame, alpha=self.value, beta=0)
+        return cv2.LUT(frame, self.lut.get(max(0.0, min(3.0, self.value))))
+    
+    def commutes_with_resample(self) -> bool:
+        return self.value <= 1  # Reducing contrast never clips
     
     def to_dict(self) -> dict:
         data = super().to_dict()
@@ -56,18 +99,24 @@ class ContrastEffect(BaseEffect):
 class SaturationEffect(BaseEffect):
     """Adjust the saturation of a frame."""
     
+    pointwise = True
+    
     def __init__(self, value: float = 1.0):
         super().__init__()
         self.value = max(0.0, min(3.0, value))
+        self.lut = LookupTable(self.build_lut)
+    
+    @staticmethod
+    def build_lut(value: float) -> np.ndarray:
+        return np.clip(RAMP * value, 0, 255).astype(np.uint8)
     
     def apply(self, frame: np.ndarray) -> np.ndarray:
         if not self.enabled:
             return frame
             
-        hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV).astype(np.float32)
-        hsv[:, :, 1] *= self.value
-        hsv[:, :, 1] = np.clip(hsv[:, :, 1], 0, 255)
-        return cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2RGB)
+        hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+        hsv[:, :, 1] = self.lut.get(max(0.0, min(3.0, self.value)))[hsv[:, :, 1]]
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
     
     def to_dict(self) -> dict:
         data = super().to_dict()
@@ -0,0 +1,127 @@
+import bisect
+import numpy as np
+
+INTERPOLATIONS = ('linear', 'bezier', 'hold')
+EASE_IN_OUT = (0.42, 0.0, 0.58, 1.0)
+BEZIER_ITERATIONS = 8  # Newton steps when solving a Bézier segment for its time
+
+
+class Keyframe:
+    """A parameter value at a time, and how to move on to the next keyframe.
+
+    ``ease`` holds the two inner control points (x1, y1, x2, y2) of a
+    cubic Bézier from (0, 0) to (1, 1), in the segment's normalised time and
+    value, as in CSS ``cubic-bezier``; it is only used with 'bezier'.
+    """
+
+    def __init__(self, time: float, value: float, interpolation: str = 'linear', ease=EASE_IN_OUT):
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Invalid interpolation: {interpolation}")
+        self.time = float(time)
+        self.value = float(value)
+        self.interpolation = interpolation
+        self.ease = tuple(ease)
+
+    def to_dict(self) -> dict:
+        return {
+            'time': self.time,
+            'value': self.value,
+            'interpolation': self.interpolation,
+            'ease': list(self.ease)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Keyframe':
+        return cls(data['time'], data['value'], data.get('interpolation', 'linear'),
+                   data.get('ease', EASE_IN_OUT))
+
+
+def _bezier(p1: np.ndarray, p2: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """One coordinate of the cubic Bézier (0, p1, p2, 1) at parameter s."""
+    inv = 1.0 - s
+    return 3.0 * inv * inv * s * p1 + 3.0 * inv * s * s * p2 + s * s * s
+
+
+def _bezier_slope(p1: np.ndarray, p2: np.ndarray, s: np.ndarray) -> np.ndarray:
+    inv = 1.0 - s
+    return 3.0 * inv * inv * p1 + 6.0 * inv * s * (p2 - p1) + 3.0 * s * s * (1.0 - p2)
+
+
+class Curve:
+    """Keyframe animation of one effect parameter.
+
+    Keyframes are mirrored into arrays, so ``sample`` evaluates any number
+    of times in a handful of NumPy operations: one binary search for the
+    segments, and a fixed number of Newton steps for Bézier segments.
+    Before the first and after the last keyframe the value holds.
+    """
+
+    def __init__(self, keyframes=()):
+        self.keyframes = []
+        for keyframe in keyframes:
+            self.add(keyframe)
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    def add(self, keyframe: Keyframe):
+        """Add a keyframe, replacing one at the same time."""
+        times = [k.time for k in self.keyframes]
+        index = bisect.bisect_left(times, keyframe.time)
+        if index < len(times) and times[index] == keyframe.time:
+            self.keyframes[index] = keyframe
+        else:
+            self.keyframes.insert(index, keyframe)
+        self._rebuild()
+
+    def remove(self, time: float):
+        self.keyframes = [k for k in self.keyframes if k.time != time]
+        self._rebuild()
+
+    def _rebuild(self):
+        keys = self.keyframes
+        self.times = np.array([k.time for k in keys], dtype=np.float64)
+        self.values = np.array([k.value for k in keys], dtype=np.float64)
+        self.modes = np.array([INTERPOLATIONS.index(k.interpolation) for k in keys], dtype=np.int8)
+        self.eases = np.array([k.ease for k in keys], dtype=np.float64).reshape(len(keys), 4)
+
+    def sample(self, times) -> np.ndarray:
+        """Parameter values at an array of times."""
+        times = np.asarray(times, dtype=np.float64)
+        if not self.keyframes:
+            raise ValueError("Cannot sample a curve without keyframes")
+        if len(self.keyframes) == 1:
+            return np.full(times.shape, self.values[0])
+
+        # Segment of each time; times outside the keyframes clamp to the ends
+        index = np.clip(np.searchsorted(self.times, times, side='right') - 1, 0, len(self.times) - 2)
+        t0, t1 = self.times[index], self.times[index + 1]
+        v0, v1 = self.values[index], self.values[index + 1]
+        u = np.clip((times - t0) / (t1 - t0), 0.0, 1.0)
+
+        modes = self.modes[index]
+        # Held values jump at the next keyframe (u reaches 1 only at or past the last one)
+        eased = np.where((modes == INTERPOLATIONS.index('hold')) & (u < 1.0), 0.0, u)
+        bezier = modes == INTERPOLATIONS.index('bezier')
+        if bezier.any():
+            x1, y1, x2, y2 = self.eases[index[bezier]].T
+            target = u[bezier]
+            s = target.copy()
+            for _ in range(BEZIER_ITERATIONS):
+                slope = _bezier_slope(x1, x2, s)
+                s -= (_bezier(x1, x2, s) - target) / np.where(np.abs(slope) < 1e-6, 1e-6, slope)
+                np.clip(s, 0.0, 1.0, out=s)
+            eased[bezier] = _bezier(y1, y2, s)
+
+        return v0 + (v1 - v0) * eased
+
+    def value_at(self, time: float) -> float:
+        """Parameter value at one time."""
+        return float(self.sample(np.array([time]))[0])
+
+    def to_dict(self) -> dict:
+        return {'keyframes': [k.to_dict() for k in self.keyframes]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Curve':
+        return cls(Keyframe.from_dict(k) for k in data['keyframes'])
@@ -0,0 +1,49 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+MIN_TILE_ROWS = 64          # Thinner bands cost more in overlap than they save
+MIN_TILED_PIXELS = 1 << 20  # Outputs smaller than this are rendered in one call
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def tile_pool() -> ThreadPoolExecutor:
+    """The thread pool shared by all tiled effects, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="effect-tile")
+        return _pool
+
+
+def apply_tiled(effect, frame: np.ndarray, in_region: tuple, region: tuple, size: tuple, render):
+    """Produce ``region`` of an effect's output in horizontal bands on the tile pool.
+
+    Each band asks the effect for the input it needs (its resampling
+    kernel's overlap included) and is rendered straight into its rows of
+    one preallocated output by ``render(frame, in_region, region, size, dst)``.
+    Small outputs are rendered in a single call.
+    """
+    x1, y1, x2, y2 = region
+    rows, columns = y2 - y1, x2 - x1
+    bands = min(os.cpu_count() or 1, rows // MIN_TILE_ROWS)
+    # Tile workers never wait on their own pool
+    nested = threading.current_thread().name.startswith("effect-tile")
+    if bands < 2 or rows * columns < MIN_TILED_PIXELS or nested:
+        return render(frame, in_region, region, size, None)
+
+    out = np.empty((rows, columns) + frame.shape[2:], dtype=frame.dtype)
+    bounds = np.linspace(y1, y2, bands + 1).astype(int).tolist()
+
+    def render_band(top, bottom):
+        band = (x1, top, x2, bottom)
+        bx1, by1, bx2, by2 = effect.input_region(band, size)
+        band_input = frame[by1 - in_region[1]:by2 - in_region[1], bx1 - in_region[0]:bx2 - in_region[0]]
+        render(band_input, (bx1, by1, bx2, by2), band, size, out[top - y1:bottom - y1])
+
+    for future in [tile_pool().submit(render_band, top, bottom) for top, bottom in zip(bounds, bounds[1:])]:
+        future.result()
+    return out
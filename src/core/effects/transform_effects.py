@@ -1,6 +1,7 @@
 import numpy as np
 import cv2
 from .base_effect import BaseEffect
+from .tiling import apply_tiled
 
 class RotateEffect(BaseEffect):
     """Rotate the frame by a specified angle."""
@@ -9,11 +10,9 @@ class RotateEffect(BaseEffect):
         super().__init__()
         self.angle = angle
     
-    def apply(self, frame: np.ndarray) -> np.ndarray:
-        if not self.enabled or self.angle == 0:
-            return frame
-            
-        height, width = frame.shape[:2]
+    def matrix(self, size: tuple):
+        """Rotation matrix and output size for an input of ``size``."""
+        width, height = size
         center = (width // 2, height // 2)
         
         # Get rotation matrix
@@ -28,9 +27,49 @@ class RotateEffect(BaseEffect):
         # Adjust matrix
         matrix[0, 2] += (new_width / 2) - center[0]
         matrix[1, 2] += (new_height / 2) - center[1]
+        return matrix, (new_width, new_height)
+    
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        if not self.enabled or self.angle == 0:
+            return frame
+            
+        height, width = frame.shape[:2]
+        new_width, new_height = self.output_size((width, height))
         
-        # Apply rotation
-        return cv2.warpAffine(frame, matrix, (new_width, new_height))
+        # Apply rotation, in parallel bands for large frames
+        return self.apply_region(frame, (0, 0, width, height), (0, 0, new_width, new_height), (width, height))
+    
+    def output_size(self, size: tuple) -> tuple:
+        if self.angle == 0:
+            return size
+        return self.matrix(size)[1]
+    
+    def input_region(self, region: tuple, size: tuple) -> tuple:
+        if self.angle == 0:
+            return region
+        # Map the region's corners back into the input, plus the bilinear footprint
+        inverse = cv2.invertAffineTransform(self.matrix(size)[0])
+        x1, y1, x2, y2 = region
+        corners = np.array([[x1, y1, 1], [x2, y1, 1], [x1, y2, 1], [x2, y2, 1]], dtype=np.float64)
+        points = corners @ inverse.T
+        width, height = size
+        return (max(0, int(np.floor(points[:, 0].min())) - 2),
+                max(0, int(np.floor(points[:, 1].min())) - 2),
+                min(width, int(np.ceil(points[:, 0].max())) + 2),
+                min(height, int(np.ceil(points[:, 1].max())) + 2))
+    
+    def apply_region(self, frame: np.ndarray, in_region: tuple, region: tuple, size: tuple) -> np.ndarray:
+        if self.angle == 0:
+            return frame
+        matrix = self.matrix(size)[0]
+        
+        def render(frame, in_region, region, size, dst):
+            # Shift the matrix so it maps the input region onto the output region
+            shifted = matrix.copy()
+            shifted[:, 2] += matrix[:, :2] @ np.array(in_region[:2], dtype=np.float64) - np.array(region[:2])
+            return cv2.warpAffine(frame, shifted, (region[2] - region[0], region[3] - region[1]), dst=dst)
+        
+        return apply_tiled(self, frame, in_region, region, size, render)
     
     def to_dict(self) -> dict:
         data = super().to_dict()
@@ -52,12 +91,60 @@ class ScaleEffect(BaseEffect):
         self.scale_y = max(0.1, scale_y)
     
     def apply(self, frame: np.ndarray) -> np.ndarray:
-        if not self.enabled or (self.scale_x == 1.0 and self.scale_y == 1.0):
+        if not self.enabled or self.is_identity():
             return frame
             
         height, width = frame.shape[:2]
-        new_size = (int(width * self.scale_x), int(height * self.scale_y))
-        return cv2.resize(frame, new_size, interpolation=cv2.INTER_LANCZOS4)
+        new_width, new_height = self.output_size((width, height))
+        return self.apply_region(frame, (0, 0, width, height), (0, 0, new_width, new_height), (width, height))
+    
+    def is_identity(self) -> bool:
+        return self.scale_x == 1.0 and self.scale_y == 1.0
+    
+    def is_downscale(self) -> bool:
+        return self.scale_x * self.scale_y < 1.0
+    
+    def output_size(self, size: tuple) -> tuple:
+        if self.is_identity():
+            return size
+        width, height = size
+        return (int(width * self.scale_x), int(height * self.scale_y))
+    
+    def input_region(self, region: tuple, size: tuple) -> tuple:
+        if self.is_identity():
+            return region
+        out_width, out_height = self.output_size(size)
+        if region == (0, 0, out_width, out_height):
+            return (0, 0) + tuple(size)
+        # Source pixels under the 8x8 Lanczos kernel of each edge output pixel
+        width, height = size
+        ratio_x, ratio_y = width / out_width, height / out_height
+        x1, y1, x2, y2 = region
+        return (max(0, int(np.floor((x1 + 0.5) * ratio_x - 0.5)) - 3),
+                max(0, int(np.floor((y1 + 0.5) * ratio_y - 0.5)) - 3),
+                min(width, int(np.floor((x2 - 0.5) * ratio_x - 0.5)) + 5),
+                min(height, int(np.floor((y2 - 0.5) * ratio_y - 0.5)) + 5))
+    
+    def apply_region(self, frame: np.ndarray, in_region: tuple, region: tuple, size: tuple) -> np.ndarray:
+        if self.is_identity():
+            return frame
+        return apply_tiled(self, frame, in_region, region, size, self.render_region)
+    
+    def render_region(self, frame: np.ndarray, in_region: tuple, region: tuple, size: tuple, dst=None):
+        """Resample ``region`` of the output from the ``in_region`` part of the input."""
+        out_width, out_height = self.output_size(size)
+        if region == (0, 0, out_width, out_height):
+            return cv2.resize(frame, (out_width, out_height), dst=dst, interpolation=cv2.INTER_LANCZOS4)
+        # Resample only the region, with resize's pixel-centre mapping
+        ratio_x, ratio_y = size[0] / out_width, size[1] / out_height
+        x1, y1, x2, y2 = region
+        matrix = np.array([
+            [ratio_x, 0.0, (x1 + 0.5) * ratio_x - 0.5 - in_region[0]],
+            [0.0, ratio_y, (y1 + 0.5) * ratio_y - 0.5 - in_region[1]]
+        ])
+        return cv2.warpAffine(frame, matrix, (x2 - x1, y2 - y1), dst=dst,
+                              flags=cv2.INTER_LANCZOS4 | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_REPLICATE)
     
     def to_dict(self) -> dict:
         data = super().to_dict()
@@ -84,18 +171,43 @@ class CropEffect(BaseEffect):
         self.width = max(0.0, min(1.0 - self.x, width))
         self.height = max(0.0, min(1.0 - self.y, height))
     
-    def apply(self, frame: np.ndarray) -> np.ndarray:
-        if not self.enabled or (self.x == 0 and self.y == 0 and self.width == 1 and self.height == 1):
-            return frame
-            
-        h, w = frame.shape[:2]
+    def bounds(self, size: tuple) -> tuple:
+        """Pixel region kept from an input of ``size``."""
+        w, h = size
         x1 = int(w * self.x)
         y1 = int(h * self.y)
         x2 = int(w * (self.x + self.width))
         y2 = int(h * (self.y + self.height))
+        return x1, y1, x2, y2
+    
+    def is_identity(self) -> bool:
+        return self.x == 0 and self.y == 0 and self.width == 1 and self.height == 1
+    
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        if not self.enabled or self.is_identity():
+            return frame
+            
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = self.bounds((w, h))
         
         return frame[y1:y2, x1:x2]
     
+    def output_size(self, size: tuple) -> tuple:
+        if self.is_identity():
+            return size
+        x1, y1, x2, y2 = self.bounds(size)
+        return (x2 - x1, y2 - y1)
+    
+    def input_region(self, region: tuple, size: tuple) -> tuple:
+        if self.is_identity():
+            return region
+        left, top = self.bounds(size)[:2]
+        x1, y1, x2, y2 = region
+        return (x1 + left, y1 + top, x2 + left, y2 + top)
+    
+    def apply_region(self, frame: np.ndarray, in_region: tuple, region: tuple, size: tuple) -> np.ndarray:
+        return frame  # The input region is exactly the kept pixels
+    
     def to_dict(self) -> dict:
         data = super().to_dict()
         data.update({
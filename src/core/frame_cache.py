@@ -0,0 +1,339 @@
+import os
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import cv2
+import numpy as np
+
+from .cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+FRAMES_PER_FILE = 256    # Most frames in one spill file; whole files are evicted
+SPILL_FILE_BYTES = 64 << 20  # Larger frames get fewer per file, down to one
+MAX_PENDING_SPILLS = 64  # Frames waiting for the spill thread; older ones are dropped
+
+
+def frames_per_file(shape) -> int:
+    """Slots in a spill file of frames of a shape, keeping files near SPILL_FILE_BYTES."""
+    frame_bytes = int(np.prod(shape))
+    return max(1, min(FRAMES_PER_FILE, SPILL_FILE_BYTES // frame_bytes))
+
+
+class _SpillFile:
+    """A memory-mapped block of raw frames with a filled flag each."""
+
+    def __init__(self, frames: np.ndarray, filled: np.ndarray, paths):
+        self.frames = frames  # (frames_per_file, height, width, 3) uint8 memmap
+        self.filled = filled  # (frames_per_file,) uint8 memmap
+        self.paths = paths
+        self.nbytes = sum(path.stat().st_size for path in paths)  # On disk, headers included
+
+    def flush(self):
+        self.frames.flush()
+        self.filled.flush()
+
+
+class DiskFrameStore:
+    """Second cache tier: decoded frames in memory-mapped raw frame files.
+
+    Frames of one media at one shape are grouped by frame number into
+    files of ``frames_per_file`` slots (up to FRAMES_PER_FILE, fewer for
+    large frames so one file stays a small part of the budget), named by
+    the media fingerprint, so a clip scrubbed in an earlier session is read
+    back at memory-map speed.
+    The file modification time records use, and when the store grows past
+    ``max_bytes`` the least recently used files are deleted whole.
+
+    Pixels are written before a slot's flag, and the flags file is
+    renamed into place only once the frames file exists, so a crash never
+    leaves a flagged slot with missing pixels. Frames larger than
+    ``max_frame_size`` (width, height) are stored downscaled and scaled
+    back up when read. The store is safe to use from several threads.
+    """
+
+    def __init__(self, root=None, max_bytes: int = 2 << 30, max_frame_size=None):
+        self.root = Path(root) if root is not None else cache_dir('frames')
+        self.max_bytes = max_bytes
+        self.max_frame_size = max_frame_size
+        self.open_files = {}  # base name -> _SpillFile
+        self.usage = {}       # base name -> (last use, bytes) of every file on disk
+        self.lock = threading.Lock()
+        for path in self.root.glob('*.npy'):
+            if path.name.endswith('.filled.npy'):
+                continue
+            base = path.name[:-len('.npy')]
+            filled_path = self.root / (base + '.filled.npy')
+            try:
+                if base.endswith('.filled.tmp') or not filled_path.exists():
+                    # Left behind by a crash while the file was being created
+                    path.unlink()
+                    continue
+                stat = path.stat()
+                self.usage[base] = (stat.st_mtime, stat.st_size + filled_path.stat().st_size)
+            except OSError:
+                continue
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for used, size in self.usage.values())
+
+    def stored_shape(self, shape):
+        """Shape a frame of the given shape is stored at."""
+        height, width = shape[:2]
+        if self.max_frame_size is None:
+            return tuple(shape)
+        scale = min(1.0, self.max_frame_size[0] / width, self.max_frame_size[1] / height)
+        return (max(1, int(height * scale)), max(1, int(width * scale))) + tuple(shape[2:])
+
+    def _base(self, media: str, shape, frame_number: int) -> str:
+        height, width = shape[:2]
+        return f"{media}-{width}x{height}-{frame_number // frames_per_file(shape)}"
+
+    def _open(self, base: str, shape, create: bool):
+        spill = self.open_files.get(base)
+        if spill is not None:
+            return spill
+        frames_path = self.root / (base + '.npy')
+        filled_path = self.root / (base + '.filled.npy')
+        try:
+            if base in self.usage:
+                spill = _SpillFile(np.load(frames_path, mmap_mode='r+'),
+                                   np.load(filled_path, mmap_mode='r+'), (frames_path, filled_path))
+                if spill.frames.shape != (frames_per_file(shape),) + tuple(shape):
+                    raise ValueError(f"unexpected frame layout in {frames_path}")
+            elif create:
+                count = frames_per_file(shape)
+                np.lib.format.open_memmap(frames_path, mode='w+', dtype=np.uint8,
+                                          shape=(count,) + tuple(shape)).flush()
+                tmp_path = self.root / (base + '.filled.tmp.npy')
+                np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=(count,)).flush()
+                os.replace(tmp_path, filled_path)
+                spill = _SpillFile(np.load(frames_path, mmap_mode='r+'),
+                                   np.load(filled_path, mmap_mode='r+'), (frames_path, filled_path))
+                self._evict(self.max_bytes - spill.nbytes)
+            else:
+                return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable frame spill file {base}: {e}")
+            self._delete(base)
+            return None
+        self.open_files[base] = spill
+        self._touch(base)
+        return spill
+
+    def _touch(self, base: str):
+        """Mark a file as just used (on disk when the store is closed)."""
+        self.usage[base] = (time.time(), self.open_files[base].nbytes)
+
+    def _delete(self, base: str):
+        spill = self.open_files.pop(base, None)
+        if spill is not None:
+            spill.flush()
+        self.usage.pop(base, None)
+        for suffix in ('.npy', '.filled.npy'):
+            try:
+                os.remove(self.root / (base + suffix))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f"Error deleting frame spill file {base}{suffix}: {e}")
+
+    def _evict(self, budget: int):
+        """Delete least recently used files until the store fits ``budget`` bytes."""
+        total = self.total_bytes
+        for base in sorted(self.usage, key=lambda name: self.usage[name][0]):
+            if total <= budget:
+                break
+            total -= self.usage[base][1]
+            self._delete(base)
+
+    def get(self, media: str, frame_number: int, shape):
+        """A stored frame scaled to ``shape``, or None."""
+        stored = self.stored_shape(shape)
+        base = self._base(media, stored, frame_number)
+        with self.lock:
+            if base not in self.open_files and base not in self.usage:
+                return None
+            spill = self._open(base, stored, create=False)
+            if spill is None:
+                return None
+            slot = frame_number % frames_per_file(stored)
+            if not spill.filled[slot]:
+                return None
+            self._touch(base)
+            frame = spill.frames[slot]
+            if stored != tuple(shape):
+                return cv2.resize(frame, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR)
+            return np.array(frame)
+
+    def put(self, media: str, frame_number: int, frame: np.ndarray):
+        """Store a frame (downscaled if it exceeds the size limit)."""
+        stored = self.stored_shape(frame.shape)
+        base = self._base(media, stored, frame_number)
+        with self.lock:
+            spill = self._open(base, stored, create=True)
+            if spill is None:
+                return
+            self._touch(base)
+            slot = frame_number % frames_per_file(stored)
+            if stored != frame.shape:
+                cv2.resize(frame, (stored[1], stored[0]), dst=spill.frames[slot], interpolation=cv2.INTER_AREA)
+            else:
+                spill.frames[slot] = frame
+            spill.filled[slot] = 1
+
+    def close(self):
+        """Flush open files and record their last use as modification times."""
+        with self.lock:
+            for base, spill in self.open_files.items():
+                spill.flush()
+                try:
+                    used = self.usage[base][0]
+                    os.utime(spill.paths[0], (used, used))
+                except (OSError, KeyError):
+                    pass
+            self.open_files.clear()
+
+
+class FrameCache:
+    """Size-bounded LRU of decoded frames in RAM, spilling to an optional DiskFrameStore.
+
+    Frames are keyed by media fingerprint, frame number and shape. Frames
+    evicted from RAM are handed to a spill thread that writes them to the
+    store instead of dropping them, so callers never wait for the disk;
+    store hits are promoted back into RAM. Returned arrays belong to the
+    cache and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int = 256 << 20, store: DiskFrameStore = None):
+        self.max_bytes = max_bytes
+        self.store = store
+        self.frames = OrderedDict()  # (media, frame_number, shape) -> frame
+        self.nbytes = 0
+        self.pending = OrderedDict()  # Evicted frames waiting to be spilled, by key
+        self.spill_queue = queue.Queue()
+        self.spill_thread = None  # Started with the first spill
+        self.lock = threading.Lock()
+
+    def get(self, media: str, frame_number: int, shape):
+        key = (media, frame_number, tuple(shape))
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+                return frame
+            frame = self.pending.pop(key, None)
+            if frame is not None:
+                self._insert(key, frame)
+                return frame
+            if self.store is None:
+                return None
+        try:
+            frame = self.store.get(media, frame_number, shape)
+        except Exception as e:
+            logger.error(f"Error reading spilled frame {frame_number}: {e}")
+            return None
+        if frame is not None:
+            with self.lock:
+                if key not in self.frames:
+                    self._insert(key, frame)
+        return frame
+
+    def put(self, media: str, frame_number: int, frame: np.ndarray):
+        """Cache a copy of a frame."""
+        key = (media, frame_number, frame.shape)
+        with self.lock:
+            if key in self.frames:
+                self.frames.move_to_end(key)
+                return
+            self._insert(key, frame.copy())
+
+    def _insert(self, key, frame: np.ndarray):
+        self.frames[key] = frame
+        self.nbytes += frame.nbytes
+        while self.nbytes > self.max_bytes and len(self.frames) > 1:
+            evicted_key, evicted = self.frames.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self._queue_spill(evicted_key, evicted)
+
+    def _queue_spill(self, key, frame: np.ndarray):
+        if self.store is None:
+            return
+        self.pending[key] = frame
+        if len(self.pending) > MAX_PENDING_SPILLS:
+            self.pending.popitem(last=False)  # The disk is behind; drop the oldest
+        if self.spill_thread is None:
+            self.spill_thread = threading.Thread(target=self._spill_worker, name="frame-spill", daemon=True)
+            self.spill_thread.start()
+        self.spill_queue.put(key)
+
+    def _spill_worker(self):
+        """Thread: write queued frames to the store."""
+        while True:
+            key = self.spill_queue.get()
+            try:
+                if key is None:
+                    return
+                with self.lock:
+                    frame = self.pending.get(key)
+                if frame is None:
+                    continue  # Promoted back into RAM or dropped meanwhile
+                self._spill(key, frame)
+                with self.lock:
+                    if self.pending.get(key) is frame:
+                        del self.pending[key]
+            finally:
+                self.spill_queue.task_done()
+
+    def _spill(self, key, frame: np.ndarray):
+        media, frame_number, shape = key
+        try:
+            self.store.put(media, frame_number, frame)
+        except Exception as e:
+            logger.error(f"Error spilling frame {frame_number} to disk: {e}")
+
+    def wait_for_spills(self):
+        """Block until every frame queued so far is written."""
+        if self.spill_thread is not None:
+            self.spill_queue.join()
+
+    def close(self):
+        """Spill every frame still in RAM so the next session finds it on disk."""
+        with self.lock:
+            frames = list(self.frames.items())
+            self.frames.clear()
+            self.nbytes = 0
+            thread, self.spill_thread = self.spill_thread, None
+        if thread is not None:
+            self.spill_queue.put(None)  # After the spills already queued
+            thread.join()
+        if self.store is not None:
+            for key, frame in frames:
+                self._spill(key, frame)
+            self.store.close()
+        self.pending.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def preview_frame_cache() -> FrameCache:
+    """The frame cache shared by all node previews, created on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FrameCache(store=DiskFrameStore())
+        return _cache
+
+
+def close_preview_frame_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
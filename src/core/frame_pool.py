@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class FramePool:
+    """Recycles preallocated frame buffers per shape.
+
+    Each shape owns a small ring of buffers that are handed out in turn, so a
+    buffer is only written again after ``depth - 1`` newer buffers of the same
+    shape have been acquired. With the default depth of two, the frame being
+    displayed stays untouched while the next one is decoded into the other
+    buffer, and steady-state playback allocates no pixel memory at all.
+    """
+
+    def __init__(self, depth: int = 2):
+        self.depth = max(1, depth)
+        self._rings = {}  # (shape, dtype) -> [buffers, next index]
+
+    def acquire(self, shape, dtype=np.uint8, exclude: np.ndarray = None) -> np.ndarray:
+        """Get the next buffer of the given shape, allocating the ring on first use.
+
+        A buffer passed as ``exclude`` (typically the one on screen) is skipped
+        as long as the ring has another buffer to offer.
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = [[np.empty(shape, dtype=dtype) for _ in range(self.depth)], 0]
+            self._rings[key] = ring
+
+        buffers, index = ring
+        if buffers[index] is exclude and self.depth > 1:
+            index = (index + 1) % self.depth
+        ring[1] = (index + 1) % self.depth
+        return buffers[index]
+
+    def buffers(self):
+        """Iterate over every buffer currently owned by the pool."""
+        for buffers, _ in self._rings.values():
+            yield from buffers
+
+    def clear(self):
+        """Drop all buffers; callers must release anything wrapping them first."""
+        self._rings.clear()
@@ -0,0 +1,210 @@
+import uuid
+
+
+class GraphError(ValueError):
+    """Raised for invalid graph edits such as cycles or unknown ports."""
+
+
+class GraphNode:
+    """Base class for nodes in the evaluation graph.
+
+    Subclasses declare their ports in ``input_ports`` / ``output_ports`` and
+    implement ``evaluate``. Upstream results may be shared by several
+    consumers, so nodes must treat their input frames as read-only.
+    """
+
+    input_ports = ()
+    output_ports = ('output',)
+    time_dependent = False  # Output changes with time even for identical inputs
+
+    def __init__(self, name: str = None):
+        self.id = str(uuid.uuid4())
+        self.name = name or self.__class__.__name__
+        self.version = 0
+
+    def invalidate(self):
+        """Mark the node's parameters as changed so cached results are dropped."""
+        self.version += 1
+
+    def state_key(self):
+        """Hashable summary of the node's parameters; cached results are reused while it is unchanged."""
+        return self.version
+
+    def required_inputs(self, time: float):
+        """Input ports needed to produce the output at the given time."""
+        return self.input_ports
+
+    def input_time(self, port: str, time: float) -> float:
+        """Time at which an input is pulled to produce the output at ``time``."""
+        return time
+
+    def evaluate(self, time: float, inputs: dict) -> dict:
+        """Compute the outputs at a time from the required inputs.
+
+        Args:
+            time: Time position in seconds
+            inputs: Input port -> upstream value (None if unconnected)
+
+        Returns:
+            Output port -> value
+        """
+        raise NotImplementedError
+
+
+class Graph:
+    """A DAG of GraphNodes evaluated by pulling frames from an output node.
+
+    Evaluating a node first walks its topologically sorted plan backwards to
+    find which (node, time) pairs are actually needed, then computes those
+    forwards, each at most once, so shared upstream results are reused by all
+    consumers. Every result gets a token; a node whose parameters, time
+    dependency and input tokens match the previous evaluation reuses its
+    cached output without running, which skips unchanged subgraphs entirely.
+    Not thread-safe.
+    """
+
+    def __init__(self):
+        self.nodes = {}  # id -> GraphNode
+        self.edges = {}  # (dst id, input port) -> (src id, output port)
+        self.structure_version = 0
+        self._plans = {}  # target id -> (structure version, ordered node ids)
+        self._cache = {}  # node id -> {key: (token, outputs)} from the last evaluation
+        self._next_token = 0
+
+    def add_node(self, node: GraphNode) -> GraphNode:
+        """Add a node to the graph."""
+        self.nodes[node.id] = node
+        self._structure_changed()
+        return node
+
+    def remove_node(self, node: GraphNode):
+        """Remove a node and every edge touching it."""
+        self.nodes.pop(node.id, None)
+        self.edges = {
+            dst: src for dst, src in self.edges.items()
+            if dst[0] != node.id and src[0] != node.id
+        }
+        self._cache.pop(node.id, None)
+        self._structure_changed()
+
+    def connect(self, src: GraphNode, dst: GraphNode, port: str = 'input', src_port: str = 'output'):
+        """Feed an output of ``src`` into an input of ``dst``, replacing any existing edge."""
+        if src.id not in self.nodes or dst.id not in self.nodes:
+            raise GraphError("Both nodes must be added to the graph before connecting them")
+        if port not in dst.input_ports:
+            raise GraphError(f"{dst.name} has no input port '{port}'")
+        if src_port not in src.output_ports:
+            raise GraphError(f"{src.name} has no output port '{src_port}'")
+        if src.id == dst.id or dst.id in self.upstream(src):
+            raise GraphError(f"Connecting {src.name} to {dst.name} would create a cycle")
+
+        self.edges[(dst.id, port)] = (src.id, src_port)
+        self._structure_changed()
+
+    def disconnect(self, dst: GraphNode, port: str = 'input'):
+        """Remove the edge feeding an input port."""
+        if self.edges.pop((dst.id, port), None) is not None:
+            self._structure_changed()
+
+    def upstream(self, node: GraphNode) -> set:
+        """Ids of all nodes the given node (transitively) depends on."""
+        seen = set()
+        stack = [node.id]
+        while stack:
+            node_id = stack.pop()
+            for port in self.nodes[node_id].input_ports:
+                edge = self.edges.get((node_id, port))
+                if edge is not None and edge[0] not in seen:
+                    seen.add(edge[0])
+                    stack.append(edge[0])
+        return seen
+
+    def plan(self, target: GraphNode):
+        """Topologically sorted ids of the target and its ancestors (inputs first)."""
+        cached = self._plans.get(target.id)
+        if cached is not None and cached[0] == self.structure_version:
+            return cached[1]
+
+        order = []
+        visited = set()
+        stack = [(target.id, False)]
+        while stack:
+            node_id, expanded = stack.pop()
+            if expanded:
+                order.append(node_id)
+                continue
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            stack.append((node_id, True))
+            for port in reversed(self.nodes[node_id].input_ports):
+                edge = self.edges.get((node_id, port))
+                if edge is not None and edge[0] not in visited:
+                    stack.append((edge[0], False))
+
+        self._plans[target.id] = (self.structure_version, order)
+        return order
+
+    def evaluate(self, target: GraphNode, time: float, port: str = 'output'):
+        """Pull the value of an output port at the given time."""
+        order = self.plan(target)
+
+        # Walk backwards to find which (node, time) pairs the target needs
+        requests = {target.id: {time}}
+        for node_id in reversed(order):
+            times = requests.get(node_id)
+            if not times:
+                continue
+            node = self.nodes[node_id]
+            for t in times:
+                for input_port in node.required_inputs(t):
+                    edge = self.edges.get((node_id, input_port))
+                    if edge is not None:
+                        requests.setdefault(edge[0], set()).add(node.input_time(input_port, t))
+
+        # Evaluate forwards, reusing results whose inputs and state are unchanged
+        tokens = {}
+        results = {}
+        cache = {}
+        for node_id in order:
+            times = requests.get(node_id)
+            if not times:
+                continue
+            node = self.nodes[node_id]
+            previous = self._cache.get(node_id, {})
+            current = cache.setdefault(node_id, {})
+            for t in sorted(times):
+                inputs = {}
+                input_tokens = []
+                for input_port in node.required_inputs(t):
+                    edge = self.edges.get((node_id, input_port))
+                    if edge is None:
+                        inputs[input_port] = None
+                        input_tokens.append((input_port, None))
+                        continue
+                    src_id, src_port = edge
+                    src_key = (src_id, node.input_time(input_port, t))
+                    inputs[input_port] = results[src_key][src_port]
+                    input_tokens.append((input_port, src_port, tokens[src_key]))
+
+                key = (node.state_key(), t if node.time_dependent else None, tuple(input_tokens))
+                entry = current.get(key) or previous.get(key)
+                if entry is None:
+                    entry = (self._new_token(), node.evaluate(t, inputs))
+                current[key] = entry
+                tokens[(node_id, t)] = entry[0]
+                results[(node_id, t)] = entry[1]
+
+        self._cache.update(cache)
+        return results[(target.id, time)][port]
+
+    def clear_cache(self):
+        """Drop all cached results."""
+        self._cache.clear()
+
+    def _new_token(self) -> int:
+        self._next_token += 1
+        return self._next_token
+
+    def _structure_changed(self):
+        self.structure_version += 1
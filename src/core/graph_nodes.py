@@ -0,0 +1,172 @@
+import bisect
+import cv2
+import numpy as np
+
+from .graph import GraphNode
+
+
+def match_size(frame: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Resize a frame to the size of a reference frame if they differ."""
+    if frame.shape[:2] == reference.shape[:2]:
+        return frame
+    height, width = reference.shape[:2]
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+
+class SourceNode(GraphNode):
+    """Produces the frames of a VideoNode (with its trims, speed and effects)."""
+
+    time_dependent = True
+
+    def __init__(self, video_node, name: str = None, render_scale: float = 1.0):
+        super().__init__(name or video_node.video_path)
+        self.video_node = video_node
+        self.render_scale = render_scale  # Below 1 for previews; see VideoNode.get_frame_at_time
+        self.video_node.state_changed.connect(self.invalidate)
+
+    def state_key(self):
+        return (self.version, self.render_scale,
+                tuple(repr(effect.to_dict()) for effect in self.video_node.effects))
+
+    def evaluate(self, time, inputs):
+        return {'output': self.video_node.get_frame_at_time(time, self.render_scale)}
+
+
+class EffectNode(GraphNode):
+    """Applies a BaseEffect to its input frame."""
+
+    input_ports = ('input',)
+
+    def __init__(self, effect, name: str = None):
+        super().__init__(name or effect.__class__.__name__)
+        self.effect = effect
+
+    @property
+    def time_dependent(self):
+        return self.effect.is_animated()
+
+    def state_key(self):
+        return (self.version, repr(self.effect.to_dict()))
+
+    def evaluate(self, time, inputs):
+        frame = inputs['input']
+        return {'output': None if frame is None else self.effect.evaluated(time).apply(frame)}
+
+
+class TransitionNode(GraphNode):
+    """Blends from one input to another over a time window.
+
+    Outside the window only the active side is pulled.
+    """
+
+    input_ports = ('from', 'to')
+    time_dependent = True
+
+    def __init__(self, start: float = 0.0, duration: float = 1.0, transition=None, name: str = None):
+        super().__init__(name)
+        self.start = start
+        self.duration = max(1e-6, duration)
+        self.transition = transition  # A transitions.Transition; crossfade if None
+
+    def state_key(self):
+        transition = repr(self.transition.to_dict()) if self.transition else None
+        return (self.version, self.start, self.duration, transition)
+
+    def progress(self, time: float) -> float:
+        """Position within the transition, from 0 (all 'from') to 1 (all 'to')."""
+        return min(1.0, max(0.0, (time - self.start) / self.duration))
+
+    def required_inputs(self, time):
+        progress = self.progress(time)
+        if progress <= 0.0:
+            return ('from',)
+        if progress >= 1.0:
+            return ('to',)
+        return self.input_ports
+
+    def blend(self, frame_a: np.ndarray, frame_b: np.ndarray, progress: float) -> np.ndarray:
+        """Mix two frames of equal size with the node's transition."""
+        if self.transition is not None:
+            return self.transition.render(frame_a, frame_b, progress)
+        return cv2.addWeighted(frame_a, 1.0 - progress, frame_b, progress, 0)
+
+    def evaluate(self, time, inputs):
+        progress = self.progress(time)
+        frame_a, frame_b = inputs.get('from'), inputs.get('to')
+        if progress <= 0.0 or frame_b is None:
+            return {'output': frame_a}
+        if progress >= 1.0 or frame_a is None:
+            return {'output': frame_b}
+        return {'output': self.blend(frame_a, match_size(frame_b, frame_a), progress)}
+
+
+class CompositeNode(GraphNode):
+    """Lays a foreground over a background with a given opacity.
+
+    A fully opaque foreground hides the background, which is then not pulled.
+    """
+
+    input_ports = ('background', 'foreground')
+
+    def __init__(self, opacity: float = 1.0, name: str = None):
+        super().__init__(name)
+        self.opacity = max(0.0, min(1.0, opacity))
+
+    def state_key(self):
+        return (self.version, self.opacity)
+
+    def required_inputs(self, time):
+        if self.opacity >= 1.0:
+            return ('foreground',)
+        if self.opacity <= 0.0:
+            return ('background',)
+        return self.input_ports
+
+    def evaluate(self, time, inputs):
+        background, foreground = inputs.get('background'), inputs.get('foreground')
+        if background is None or self.opacity >= 1.0:
+            return {'output': foreground}
+        if foreground is None or self.opacity <= 0.0:
+            return {'output': background}
+        foreground = match_size(foreground, background)
+        return {'output': cv2.addWeighted(foreground, self.opacity, background, 1.0 - self.opacity, 0)}
+
+
+class SequenceNode(GraphNode):
+    """Plays its inputs one after another, like clips chained on the canvas.
+
+    Each input is pulled at the time local to its own clip, and only the clip
+    under the requested time is pulled.
+    """
+
+    def __init__(self, clips, name: str = None):
+        super().__init__(name)
+        self.clips = list(clips)  # Objects with get_duration(), e.g. VideoNodes
+        self.input_ports = tuple(f'clip{i}' for i in range(len(self.clips)))
+
+    def starts(self):
+        """Start time of every clip within the sequence."""
+        starts = []
+        position = 0.0
+        for clip in self.clips:
+            starts.append(position)
+            position += clip.get_duration()
+        return starts
+
+    def state_key(self):
+        return (self.version, tuple(clip.get_duration() for clip in self.clips))
+
+    def active_clip(self, time: float) -> int:
+        """Index of the clip playing at the given time."""
+        return max(0, bisect.bisect_right(self.starts(), time) - 1)
+
+    def required_inputs(self, time):
+        if not self.clips:
+            return ()
+        return (self.input_ports[self.active_clip(time)],)
+
+    def input_time(self, port, time):
+        return time - self.starts()[self.input_ports.index(port)]
+
+    def evaluate(self, time, inputs):
+        return {'output': next(iter(inputs.values()), None)}
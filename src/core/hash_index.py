@@ -0,0 +1,144 @@
+import itertools
+import numpy as np
+
+# Set bits of every byte value, for vectorised popcounts
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def hamming_distances(hashes: np.ndarray, query: int) -> np.ndarray:
+    """Hamming distance between each 64-bit hash and a query hash."""
+    diff = np.bitwise_xor(hashes, np.uint64(query))
+    return POPCOUNT[diff.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class FrameHashIndex:
+    """Index of 64-bit frame hashes answering Hamming-radius queries.
+
+    Hashes of all clips are packed into flat arrays. Queries use multi-index
+    hashing: each hash is split into CHUNKS 16-bit keys, and if two hashes
+    are within distance r, some chunk of them differs in at most
+    r // CHUNKS bits. Each chunk has a sorted key table, so the candidates
+    are a few binary searches away and only those are checked by popcount.
+    Radii too large for that to pay off use a vectorised linear scan.
+    Tables are rebuilt lazily after clips are added or removed.
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = 16
+    MAX_CHUNK_RADIUS = 2  # Beyond this the probes cost more than a scan
+
+    def __init__(self):
+        self.clips = {}  # path -> (times, hashes)
+        self.dirty = True
+        self.paths = []
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.clip_ids = np.zeros(0, dtype=np.int32)
+        self.times = np.zeros(0, dtype=np.float32)
+        self.tables = []  # Per chunk: (sorted keys, positions in the packed arrays)
+        self._flips = {}  # radius -> XOR masks flipping up to that many key bits
+
+    def __len__(self):
+        return sum(len(hashes) for times, hashes in self.clips.values())
+
+    def __contains__(self, path):
+        return path in self.clips
+
+    def add_clip(self, path: str, times: np.ndarray, hashes: np.ndarray):
+        """Add (or replace) the sampled frame hashes of a clip."""
+        self.clips[path] = (np.asarray(times, dtype=np.float32), np.asarray(hashes, dtype=np.uint64))
+        self.dirty = True
+
+    def remove_clip(self, path: str):
+        if self.clips.pop(path, None) is not None:
+            self.dirty = True
+
+    def build(self):
+        """Pack the clips and sort the chunk tables."""
+        self.paths = list(self.clips)
+        if self.paths:
+            self.times = np.concatenate([self.clips[p][0] for p in self.paths])
+            self.hashes = np.concatenate([self.clips[p][1] for p in self.paths])
+            self.clip_ids = np.repeat(np.arange(len(self.paths), dtype=np.int32),
+                                      [len(self.clips[p][1]) for p in self.paths])
+        else:
+            self.times = np.zeros(0, dtype=np.float32)
+            self.hashes = np.zeros(0, dtype=np.uint64)
+            self.clip_ids = np.zeros(0, dtype=np.int32)
+
+        mask = np.uint64((1 << self.CHUNK_BITS) - 1)
+        self.tables = []
+        for chunk in range(self.CHUNKS):
+            keys = ((self.hashes >> np.uint64(chunk * self.CHUNK_BITS)) & mask).astype(np.uint16)
+            order = np.argsort(keys, kind='stable')
+            self.tables.append((keys[order], order))
+        self.dirty = False
+
+    def flip_masks(self, radius: int) -> np.ndarray:
+        """XOR masks of all chunk keys within ``radius`` bits of a key."""
+        masks = self._flips.get(radius)
+        if masks is None:
+            values = [0]
+            for count in range(1, radius + 1):
+                for bits in itertools.combinations(range(self.CHUNK_BITS), count):
+                    values.append(sum(1 << bit for bit in bits))
+            masks = np.array(values, dtype=np.uint16)
+            self._flips[radius] = masks
+        return masks
+
+    def candidates(self, query: int, radius: int) -> np.ndarray:
+        """Positions of hashes sharing a chunk within radius // CHUNKS bits of the query."""
+        masks = self.flip_masks(radius // self.CHUNKS)
+        found = []
+        for chunk, (keys, order) in enumerate(self.tables):
+            key = (query >> (chunk * self.CHUNK_BITS)) & ((1 << self.CHUNK_BITS) - 1)
+            probes = np.bitwise_xor(masks, np.uint16(key))
+            lo = np.searchsorted(keys, probes, side='left')
+            hi = np.searchsorted(keys, probes, side='right')
+            found.extend(order[start:end] for start, end in zip(lo.tolist(), hi.tolist()) if end > start)
+        if not found:
+            return np.zeros(0, dtype=np.intp)
+        return np.unique(np.concatenate(found))
+
+    def query(self, query: int, radius: int = 8, limit: int = None):
+        """Frames within ``radius`` bits of a hash as (path, time, distance), nearest first."""
+        if self.dirty:
+            self.build()
+        query = int(query)
+        if radius // self.CHUNKS > self.MAX_CHUNK_RADIUS:
+            positions = np.arange(len(self.hashes))
+        else:
+            positions = self.candidates(query, radius)
+        distances = hamming_distances(self.hashes[positions], query)
+        keep = distances <= radius
+        positions, distances = positions[keep], distances[keep]
+        order = np.argsort(distances, kind='stable')[:limit]
+        return [(self.paths[self.clip_ids[p]], float(self.times[p]), int(d))
+                for p, d in zip(positions[order].tolist(), distances[order].tolist())]
+
+    def similar_clips(self, path: str, start_time: float = 0.0, end_time: float = None,
+                      radius: int = 8, limit: int = 10):
+        """Other clips sharing frames with a clip's time range.
+
+        Returns (path, matching frames, best distance) tuples, the clips with
+        most matches first.
+        """
+        if path not in self.clips:
+            return []
+        times, hashes = self.clips[path]
+        in_range = times >= start_time
+        if end_time is not None:
+            in_range &= times <= end_time
+
+        matches = {}  # path -> [matching query frames, best distance]
+        for query in hashes[in_range].tolist():
+            best = {}
+            for other, time_pos, distance in self.query(query, radius):
+                if other != path and distance < best.get(other, radius + 1):
+                    best[other] = distance
+            for other, distance in best.items():
+                entry = matches.setdefault(other, [0, distance])
+                entry[0] += 1
+                entry[1] = min(entry[1], distance)
+
+        ranked = sorted(matches.items(), key=lambda item: (-item[1][0], item[1][1]))
+        return [(other, count, distance) for other, (count, distance) in ranked[:limit]]
@@ -0,0 +1,278 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+def _value_size(value) -> int:
+    """Rough memory held by a recorded value (shallow; shared items are not counted)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(sys.getsizeof(item) for item in value if isinstance(item, (str, float, int)))
+    return size
+
+
+class Command:
+    """One undoable edit as a compact delta.
+
+    ``changes`` maps (target_id, attribute) to (old, new) values; only the
+    attributes an edit touched are stored, and values are shared with the
+    live objects rather than copied. Lists are recorded as tuples.
+    """
+
+    OVERHEAD = 200  # Approximate bytes per command besides its values
+
+    def __init__(self, changes=None, label: str = '', merge_key=None):
+        self.changes = dict(changes or {})
+        self.label = label
+        self.merge_key = merge_key
+        self.timestamp = time.monotonic()
+        self.size = self.measure()
+
+    def measure(self) -> int:
+        return self.OVERHEAD + sum(_value_size(old) + _value_size(new) + 100
+                                   for old, new in self.changes.values())
+
+    def merge(self, changes: dict):
+        """Fold later changes in, keeping the oldest 'old' of each key."""
+        for key, (old, new) in changes.items():
+            if key in self.changes:
+                old = self.changes[key][0]
+            self.changes[key] = (old, new)
+        self.size = self.measure()
+
+    def is_noop(self) -> bool:
+        return all(old == new for old, new in self.changes.values())
+
+    def to_dict(self) -> dict:
+        """Convert the command to a dictionary; values must be serializable."""
+        return {
+            'label': self.label,
+            'changes': [[target_id, attr, old, new]
+                        for (target_id, attr), (old, new) in self.changes.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Command':
+        changes = {(target_id, attr): (old, new) for target_id, attr, old, new in data['changes']}
+        return cls(changes, data.get('label', ''))
+
+
+class History:
+    """Undo/redo history of attribute edits with coalescing, checkpoints and a memory budget.
+
+    Versions are numbered from 0 (the state when the history started); the
+    command at index ``v - base`` takes version v to v + 1. Edits with the
+    same ``merge_key`` arriving within ``coalesce_window`` seconds (drags,
+    spin boxes) are merged into one command.
+
+    Every ``checkpoint_interval`` versions a squashed delta of the whole
+    span is kept, so ``goto`` crosses long distances a span at a time. When
+    the recorded commands and checkpoints exceed ``max_bytes`` the oldest
+    commands are dropped; a checkpoint that does not fit is used but not kept.
+
+    Args:
+        resolve: Callable mapping a target id to its object (or None if gone)
+        apply: Callable (target, attribute, value) that sets a value; defaults
+            to setattr, with tuples converted back to lists
+    """
+
+    def __init__(self, resolve, apply=None, checkpoint_interval: int = 64,
+                 max_bytes: int = 8 * 1024 * 1024, coalesce_window: float = 0.5):
+        self.resolve = resolve
+        self.apply = apply or self.default_apply
+        self.checkpoint_interval = checkpoint_interval
+        self.max_bytes = max_bytes
+        self.coalesce_window = coalesce_window
+        self.commands = []
+        self.base = 0      # Version before the first kept command
+        self.version = 0   # Current version
+        self.total_bytes = 0  # Commands plus kept checkpoints
+        self.applying = False  # Set while undoing/redoing so edits are not recorded
+        self.listeners = []    # Callables invoked after the version changes
+        self._checkpoints = {}  # Span index -> squashed Command
+        self._group = None
+        self._last_merge = None  # (merge_key, time) of the last recorded command
+
+    @staticmethod
+    def default_apply(target, attr, value):
+        setattr(target, attr, list(value) if isinstance(value, tuple) else value)
+
+    @property
+    def end(self) -> int:
+        """Newest version that can be redone to."""
+        return self.base + len(self.commands)
+
+    def can_undo(self) -> bool:
+        return self.version > self.base
+
+    def can_redo(self) -> bool:
+        return self.version < self.end
+
+    def undo_label(self) -> str:
+        return self.commands[self.version - self.base - 1].label if self.can_undo() else ''
+
+    def redo_label(self) -> str:
+        return self.commands[self.version - self.base].label if self.can_redo() else ''
+
+    def record(self, target_id, attr, old, new, label: str = '', merge_key=None):
+        """Record that one attribute of a target changed."""
+        self.record_changes({(target_id, attr): (old, new)}, label, merge_key)
+
+    def record_changes(self, changes: dict, label: str = '', merge_key=None):
+        """Record an edit given as {(target_id, attribute): (old, new)}."""
+        if self.applying or not changes:
+            return
+        if self._group is not None:
+            self._group.merge(changes)
+            return
+
+        now = time.monotonic()
+        if (merge_key is not None and self.can_undo() and not self.can_redo() and
+                self._last_merge is not None and self._last_merge[0] == merge_key and
+                now - self._last_merge[1] <= self.coalesce_window):
+            last = self.commands[-1]
+            self.total_bytes -= last.size
+            last.merge(changes)
+            self._last_merge = (merge_key, now)
+            self._drop_checkpoints(self.version - 1)
+            if last.is_noop():
+                # The edits cancelled out, e.g. a drag back to the start
+                self.commands.pop()
+                self.version -= 1
+                self._last_merge = None
+            else:
+                self.total_bytes += last.size
+            self._notify()
+            return
+
+        self._push(Command(changes, label, merge_key))
+        self._last_merge = (merge_key, now) if merge_key is not None else None
+
+    @contextmanager
+    def group(self, label: str = ''):
+        """Record every edit made inside the block as a single command."""
+        if self._group is not None:
+            yield
+            return
+        self._group = Command(label=label)
+        try:
+            yield
+        finally:
+            command, self._group = self._group, None
+            if command.changes and not command.is_noop():
+                self._push(command)
+                self._last_merge = None
+
+    def _push(self, command: Command):
+        if command.is_noop():
+            return
+        # A new edit discards the redo branch
+        if self.can_redo():
+            for dropped in self.commands[self.version - self.base:]:
+                self.total_bytes -= dropped.size
+            del self.commands[self.version - self.base:]
+            self._drop_checkpoints(self.version)
+        self.commands.append(command)
+        self.total_bytes += command.size
+        self.version += 1
+        self._trim()
+        self._notify()
+
+    def _trim(self):
+        """Drop the oldest commands while over budget (always keeping the newest)."""
+        drop = 0
+        while self.total_bytes > self.max_bytes and drop < len(self.commands) - 1:
+            self.total_bytes -= self.commands[drop].size
+            # The span holding the dropped version can no longer be squashed
+            checkpoint = self._checkpoints.pop((self.base + drop) // self.checkpoint_interval, None)
+            if checkpoint is not None:
+                self.total_bytes -= checkpoint.size
+            drop += 1
+        if drop:
+            del self.commands[:drop]
+            self.base += drop
+
+    def _drop_checkpoints(self, version: int):
+        """Forget checkpoints of spans reaching past ``version``, whose commands changed."""
+        interval = self.checkpoint_interval
+        for span in [span for span in self._checkpoints if (span + 1) * interval > version]:
+            self.total_bytes -= self._checkpoints.pop(span).size
+
+    def checkpoint(self, span: int):
+        """Squashed command of versions [span * interval, (span + 1) * interval), if all kept."""
+        checkpoint = self._checkpoints.get(span)
+        if checkpoint is None:
+            start = span * self.checkpoint_interval
+            stop = start + self.checkpoint_interval
+            if start < self.base or stop > self.end:
+                return None
+            checkpoint = Command(label='checkpoint')
+            for command in self.commands[start - self.base:stop - self.base]:
+                checkpoint.merge(command.changes)
+            if self.total_bytes + checkpoint.size <= self.max_bytes:
+                self._checkpoints[span] = checkpoint
+                self.total_bytes += checkpoint.size
+        return checkpoint
+
+    def _apply(self, command: Command, forward: bool):
+        for (target_id, attr), (old, new) in command.changes.items():
+            target = self.resolve(target_id)
+            if target is not None:
+                self.apply(target, attr, new if forward else old)
+
+    def undo(self) -> bool:
+        if not self.can_undo():
+            return False
+        self.goto(self.version - 1)
+        return True
+
+    def redo(self) -> bool:
+        if not self.can_redo():
+            return False
+        self.goto(self.version + 1)
+        return True
+
+    def goto(self, version: int):
+        """Move to any kept version, crossing whole checkpoint spans where possible."""
+        version = max(self.base, min(version, self.end))
+        interval = self.checkpoint_interval
+        self.applying = True
+        try:
+            while self.version != version:
+                if self.version < version:
+                    span = self.version // interval
+                    checkpoint = (self.checkpoint(span) if self.version % interval == 0 and
+                                  self.version + interval <= version else None)
+                    if checkpoint is not None:
+                        self._apply(checkpoint, True)
+                        self.version += interval
+                    else:
+                        self._apply(self.commands[self.version - self.base], True)
+                        self.version += 1
+                else:
+                    span = self.version // interval - 1
+                    checkpoint = (self.checkpoint(span) if self.version % interval == 0 and
+                                  self.version - interval >= version else None)
+                    if checkpoint is not None:
+                        self._apply(checkpoint, False)
+                        self.version -= interval
+                    else:
+                        self._apply(self.commands[self.version - self.base - 1], False)
+                        self.version -= 1
+        finally:
+            self.applying = False
+        self._last_merge = None
+        self._notify()
+
+    def clear(self):
+        """Forget all history; the current state becomes version 0."""
+        self.commands = []
+        self.base = self.version = 0
+        self.total_bytes = 0
+        self._checkpoints = {}
+        self._last_merge = None
+        self._notify()
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
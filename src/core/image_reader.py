@@ -0,0 +1,223 @@
+import os
+import re
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+READ_AHEAD = 8  # Frames decoded ahead of the one being read
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.exr', '.ppm', '.pnm', '.npy')
+
+_NUMBERED = re.compile(r'^(.*?)([0-9]+)(\.[A-Za-z0-9]+)$')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def image_pool() -> ThreadPoolExecutor:
+    """The thread pool shared by all image sequence readers, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="image-decode")
+        return _pool
+
+
+def _map_ppm(path: str):
+    """Memory-map the pixels of a binary 8-bit PPM, or None for other variants."""
+    with open(path, 'rb') as f:
+        header = f.read(512)
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while header[pos:pos + 1].isspace():
+            pos += 1
+        if header[pos:pos + 1] == b'#':
+            pos = header.index(b'\n', pos) + 1
+            continue
+        end = pos
+        while end < len(header) and not header[end:end + 1].isspace():
+            end += 1
+        if end == pos:
+            return None
+        fields.append(header[pos:end])
+        pos = end
+    if fields[0] != b'P6' or int(fields[3]) > 255:
+        return None
+    width, height = int(fields[1]), int(fields[2])
+    # A single whitespace byte separates the header from the pixels
+    return np.memmap(path, dtype=np.uint8, mode='r', offset=pos + 1, shape=(height, width, 3))
+
+
+def _to_rgb(frame: np.ndarray) -> np.ndarray:
+    """Bring a loaded array to 8-bit RGB."""
+    if frame.dtype != np.uint8:
+        frame = np.clip(frame, 0, 255).astype(np.uint8)
+    if frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+    if frame.shape[2] == 4:
+        return frame[:, :, :3]
+    return frame
+
+
+class ImageSequence:
+    """A still image or a numbered image sequence, indexed from one directory listing.
+
+    Scanned as a sequence, any file such as ``shot_0001.png`` finds every
+    file with the same prefix and extension and a number in between, in
+    numeric order. Only names are read while indexing, so sequences of
+    many thousands of frames index in one ``scandir``.
+    """
+
+    def __init__(self, directory: str, names):
+        self.directory = directory
+        self.names = list(names)
+
+    @classmethod
+    def scan(cls, path: str, sequence: bool = True) -> 'ImageSequence':
+        """Index the sequence a file belongs to, or just the file if ``sequence`` is False."""
+        directory, name = os.path.split(os.path.abspath(path))
+        match = _NUMBERED.match(name) if sequence else None
+        if match is None:
+            return cls(directory, [name])
+        prefix, digits, suffix = match.groups()
+        numbered = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                candidate = entry.name
+                if candidate.startswith(prefix) and candidate.endswith(suffix):
+                    middle = candidate[len(prefix):len(candidate) - len(suffix)]
+                    if middle and middle.isascii() and middle.isdigit():
+                        numbered.append((int(middle), candidate))
+        numbered.sort()
+        return cls(directory, [candidate for number, candidate in numbered])
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def is_still(self) -> bool:
+        return len(self.names) == 1
+
+    def path(self, index: int) -> str:
+        return os.path.join(self.directory, self.names[index])
+
+    def read(self, index: int):
+        """Frame ``index`` as RGB, or None if it cannot be read.
+
+        Uncompressed files are returned as read-only memory maps, so their
+        pixels are only paged in when used.
+        """
+        path = self.path(index)
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            if extension == '.npy':
+                return _to_rgb(np.load(path, mmap_mode='r'))
+            if extension in ('.ppm', '.pnm'):
+                frame = _map_ppm(path)
+                if frame is not None:
+                    return frame
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        except (OSError, ValueError, IndexError) as e:
+            logger.error(f"Error reading image {path}: {e}")
+            return None
+        if frame is None:
+            logger.error(f"Could not read image {path}")
+            return None
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+class SequenceReader:
+    """Reads frames of an ImageSequence with read-ahead on the shared image pool.
+
+    After each read, the next ``read_ahead`` frames in the direction and
+    stride of travel are decoded in parallel, so playback at any speed,
+    forwards or backwards, finds its frames ready. Frames are shrunk to
+    ``size`` (width, height) on the pool when given.
+    """
+
+    def __init__(self, sequence: ImageSequence, size=None, read_ahead: int = READ_AHEAD):
+        self.sequence = sequence
+        self.size = size
+        self.read_ahead = read_ahead
+        self.pending = {}  # index -> Future
+        self.last = None
+        self.lock = threading.Lock()
+
+    def _load(self, index: int):
+        frame = self.sequence.read(index)
+        if frame is None or self.size is None or (frame.shape[1], frame.shape[0]) == tuple(self.size):
+            return frame
+        return cv2.resize(frame, tuple(self.size), interpolation=cv2.INTER_AREA)
+
+    def read(self, index: int):
+        """Frame ``index`` (read-only), or None if it is out of range or unreadable."""
+        if not 0 <= index < len(self.sequence):
+            return None
+        with self.lock:
+            step = 1 if self.last is None or index == self.last else index - self.last
+            if abs(step) > self.read_ahead:
+                step = 1 if step > 0 else -1  # A jump, not a stride
+            self.last = index
+
+            future = self.pending.pop(index, None)
+            if future is None:
+                future = image_pool().submit(self._load, index)
+            ahead = [index + step * i for i in range(1, self.read_ahead + 1)]
+            ahead = [i for i in ahead if 0 <= i < len(self.sequence)]
+            for stale in [i for i in self.pending if i not in ahead]:
+                self.pending.pop(stale).cancel()
+            for i in ahead:
+                if i not in self.pending:
+                    self.pending[i] = image_pool().submit(self._load, i)
+
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error decoding {self.sequence.path(index)}: {e}")
+            return None
+
+    def close(self):
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+            self.last = None
+
+
+class ImagePreviewReader:
+    """PreviewReader counterpart for image sequences (see VideoNode.open_preview_reader)."""
+
+    def __init__(self, sequence: ImageSequence, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.position = 0
+        self.reader = SequenceReader(sequence, size=(width, height))
+
+    @property
+    def frame_shape(self):
+        return (self.height, self.width, 3)
+
+    def read(self, out: np.ndarray = None):
+        frame = self.reader.read(self.position)
+        if frame is None:
+            return None
+        if out is None:
+            out = np.empty(self.frame_shape, dtype=np.uint8)
+        np.copyto(out, frame)
+        self.position += 1
+        return out
+
+    def seek(self, frame_number: int):
+        self.position = max(0, int(frame_number))
+
+    def read_frame(self, frame_number: int, out: np.ndarray = None):
+        self.seek(frame_number)
+        return self.read(out)
+
+    def close(self):
+        self.reader.close()
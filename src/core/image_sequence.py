@@ -0,0 +1,86 @@
+from .video_node import VideoNode
+from .image_reader import ImageSequence, SequenceReader, ImagePreviewReader
+
+DEFAULT_FPS = 24.0     # Frame rate of a sequence until the user sets one
+STILL_DURATION = 5.0   # Seconds a still image lasts on the timeline
+
+
+class ImageSequenceNode(VideoNode):
+    """A source node for a still image or a numbered image sequence.
+
+    A numbered file is only read as part of a sequence when ``sequence``
+    is set; otherwise it is a still, like any other image. Sequences play
+    at ``frame_rate`` frames per second; a still lasts ``still_duration``
+    seconds. Only the first frame is opened when the
+    node is created; the rest are decoded on demand. Image nodes have no
+    audio.
+    """
+
+    has_audio = False
+
+    def __init__(self, video_path: str = None, probe: bool = True,
+                 frame_rate: float = DEFAULT_FPS, still_duration: float = STILL_DURATION,
+                 sequence: bool = False):
+        super().__init__(video_path, probe=False)
+        self.sequence = sequence
+        self.frame_rate = frame_rate
+        self.still_duration = still_duration
+        self.images = None
+        self.frame_reader = None  # SequenceReader for get_frame, opened on first use
+        if probe and not self.error:
+            self.load_video_info()
+
+    def load_video_info(self):
+        """Index the sequence and read the frame size from its first image."""
+        try:
+            self.images = ImageSequence.scan(self.video_path, self.sequence)
+            first = self.images.read(0)
+            if first is None:
+                self.error = f"Could not open image: {self.video_path}"
+                self.logger.error(self.error)
+                return
+            self.height, self.width = first.shape[:2]
+            self.fps = self.frame_rate
+            if self.images.is_still:
+                self.frame_count = 1
+                self.duration = self.still_duration
+            else:
+                self.frame_count = len(self.images)
+                self.duration = self.frame_count / self.fps
+            if self.end_time is None:
+                self.end_time = self.duration
+        except Exception as e:
+            self.error = f"Error loading image info: {str(e)}"
+            self.logger.error(self.error)
+            self.frame_count = 0
+            self.width = 0
+            self.height = 0
+
+    def get_frame(self, frame_number):
+        """Get a frame of the sequence (read-only for memory-mapped formats)."""
+        if self.error or self.images is None:
+            return None
+        if self.frame_reader is None:
+            self.frame_reader = SequenceReader(self.images)
+        return self.frame_reader.read(frame_number)
+
+    def open_preview_reader(self, width: int, height: int):
+        return ImagePreviewReader(self.images, width, height)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data['kind'] = 'image_sequence'
+        data['sequence'] = self.sequence
+        data['frame_rate'] = self.frame_rate
+        data['still_duration'] = self.still_duration
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict, probe: bool = True) -> 'ImageSequenceNode':
+        node = super().from_dict(data, probe=False)
+        node.sequence = data.get('sequence', True)  # Older projects always scanned for sequences
+        node.frame_rate = data.get('frame_rate', DEFAULT_FPS)
+        node.still_duration = data.get('still_duration', STILL_DURATION)
+        if probe and not node.error:
+            node.load_video_info()
+        return node
@@ -0,0 +1,40 @@
+import bisect
+import itertools
+
+
+class IntervalIndex:
+    """Static index of (start, end, item) intervals answering overlap queries.
+
+    Intervals are sorted by start alongside a running maximum of their
+    ends. That maximum never decreases, so both ends of the range of
+    candidates are found by binary search and only the intervals in
+    between are checked. For timeline clips, which rarely nest, a query
+    costs O(log n + k) for k results. Intervals are half-open [start, end).
+    """
+
+    def __init__(self, intervals=()):
+        entries = sorted(intervals, key=lambda entry: entry[0])
+        self.starts = [start for start, end, item in entries]
+        self.ends = [end for start, end, item in entries]
+        self.items = [item for start, end, item in entries]
+        self.max_ends = list(itertools.accumulate(self.ends, max))
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def end(self) -> float:
+        """End of the latest interval (0 when empty)."""
+        return self.max_ends[-1] if self.max_ends else 0.0
+
+    def overlapping(self, start: float, end: float) -> list:
+        """Items whose intervals overlap [start, end), in order of start."""
+        first = bisect.bisect_right(self.max_ends, start)
+        last = bisect.bisect_left(self.starts, end)
+        return [self.items[i] for i in range(first, last) if self.ends[i] > start]
+
+    def at(self, time_pos: float) -> list:
+        """Items whose intervals contain a time, in order of start."""
+        first = bisect.bisect_right(self.max_ends, time_pos)
+        last = bisect.bisect_right(self.starts, time_pos)
+        return [self.items[i] for i in range(first, last) if self.ends[i] > time_pos]
@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _process_alive(pid) -> bool:
+    """Whether a process id belongs to a running process."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Running, but owned by someone else
+    except OSError:
+        return False
+    return True
+
+
+class Journal:
+    """Append-only autosave log with periodic snapshots for crash recovery.
+
+    Each edit is appended as one small JSON line by a background thread, so
+    the cost of autosaving is proportional to the edit, not the project.
+    Lines are flushed to the OS at once but fsynced at most every
+    ``fsync_interval`` seconds. Once ``compact_every`` records have piled
+    up, ``compact_if_due`` (called periodically by the owner) takes a full
+    snapshot from ``snapshot_provider`` after ``idle_delay`` seconds without
+    edits, so building it never delays an edit; the snapshot is written
+    atomically and the log truncated by the writer thread. Records carry
+    sequence numbers, so a crash between the two steps only leaves records
+    that recovery skips.
+
+    The directory holds nothing after a clean ``close`` followed by
+    ``discard``; anything found by ``recover`` comes from a crashed session.
+    A session claims the directory with ``acquire`` first, so a second
+    running instance never mistakes a live journal for a crashed one.
+    """
+
+    SNAPSHOT_NAME = 'snapshot.json'
+    LOG_NAME = 'journal.log'
+    LOCK_NAME = 'lock'
+
+    def __init__(self, directory, fsync_interval: float = 1.0, compact_every: int = 500,
+                 snapshot_provider=None, idle_delay: float = 2.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.directory / self.SNAPSHOT_NAME
+        self.log_path = self.directory / self.LOG_NAME
+        self.lock_path = self.directory / self.LOCK_NAME
+        self.locked = False
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.snapshot_provider = snapshot_provider  # Callable returning the full project
+        self.idle_delay = idle_delay
+        self.seq = 0  # Sequence number of the last record
+        self.records_since_snapshot = 0
+        self.last_append = 0.0  # Monotonic time of the last record
+        self.queue = queue.Queue()
+        self.thread = None
+
+    def acquire(self) -> bool:
+        """Claim the directory for this process; False while another live process holds it.
+
+        A lock left by a process that is gone (a crashed session) is taken over.
+        """
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if _process_alive(self._lock_owner()):
+                    return False
+                try:
+                    os.remove(self.lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            self.locked = True
+            return True
+        return False
+
+    def release(self):
+        """Give up the directory claimed by ``acquire``."""
+        if self.locked:
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+            self.locked = False
+
+    def _lock_owner(self):
+        try:
+            with open(self.lock_path) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def recover(self):
+        """Read what a previous session left behind.
+
+        Returns (project snapshot or None, records newer than the snapshot).
+        A torn last line, from a crash mid-write, is ignored.
+        """
+        snapshot, snapshot_seq = None, 0
+        try:
+            with open(self.snapshot_path) as f:
+                data = json.load(f)
+            snapshot, snapshot_seq = data['project'], data['seq']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not read autosave snapshot: {e}")
+
+        records = []
+        try:
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of the log
+                    if record.get('seq', 0) > snapshot_seq:
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Could not read autosave journal: {e}")
+
+        self.seq = max([snapshot_seq] + [record['seq'] for record in records])
+        return snapshot, records
+
+    def start(self):
+        """Start the writer thread; records are appended after any existing ones."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="autosave-journal", daemon=True)
+            self.thread.start()
+
+    def append(self, record: dict):
+        """Queue a change record; never blocks on disk."""
+        self.seq += 1
+        self.queue.put(('record', dict(record, seq=self.seq)))
+        self.records_since_snapshot += 1
+        self.last_append = time.monotonic()
+
+    def compact_if_due(self):
+        """Snapshot through ``snapshot_provider`` if enough records piled up and edits have paused.
+
+        Returns whether a snapshot was taken.
+        """
+        if (self.snapshot_provider is None or not self.compact_every or
+                self.records_since_snapshot < self.compact_every or
+                time.monotonic() - self.last_append < self.idle_delay):
+            return False
+        self.compact(self.snapshot_provider())
+        return True
+
+    def compact(self, project: dict):
+        """Replace the log with a snapshot of the full project."""
+        self.queue.put(('snapshot', {'seq': self.seq, 'project': project}))
+        self.records_since_snapshot = 0
+
+    def flush(self):
+        """Block until everything queued is written and synced to disk."""
+        self.queue.put(('sync', None))
+        self.queue.join()
+
+    def close(self, project: dict = None):
+        """Write everything (optionally a final snapshot) and stop the writer."""
+        if project is not None:
+            self.compact(project)
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def discard(self):
+        """Delete the autosave files, e.g. after a clean exit."""
+        for path in (self.snapshot_path, self.log_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.seq = 0
+        self.records_since_snapshot = 0
+
+    def _write_snapshot(self, data: dict):
+        tmp_path = self.snapshot_path.with_name(self.SNAPSHOT_NAME + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _run(self):
+        """Writer thread: append records, batch fsyncs, write snapshots."""
+        log = open(self.log_path, 'a')
+        dirty = False
+        last_sync = time.monotonic()
+        try:
+            while True:
+                timeout = None
+                if dirty:
+                    timeout = max(0.0, last_sync + self.fsync_interval - time.monotonic())
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    # Idle with unsynced writes: sync the batch now
+                    os.fsync(log.fileno())
+                    dirty = False
+                    last_sync = time.monotonic()
+                    continue
+
+                try:
+                    if item is None:
+                        break
+                    kind, data = item
+                    if kind == 'record':
+                        log.write(json.dumps(data) + '\n')
+                        log.flush()
+                        dirty = True
+                    elif kind == 'snapshot':
+                        self._write_snapshot(data)
+                        log.seek(0)
+                        log.truncate()
+                        dirty = True
+                        last_sync = 0.0  # Sync the truncation right away
+
+                    if dirty and (kind == 'sync' or time.monotonic() - last_sync >= self.fsync_interval):
+                        os.fsync(log.fileno())
+                        dirty = False
+                        last_sync = time.monotonic()
+                except Exception as e:
+                    logger.error(f"Error writing autosave journal: {e}")
+                finally:
+                    self.queue.task_done()
+        finally:
+            if dirty:
+                log.flush()
+                os.fsync(log.fileno())
+            log.close()
@@ -0,0 +1,115 @@
+import os
+import logging
+import numpy as np
+import ffmpeg
+
+from .cache import cache_dir, media_fingerprint
+from .preview_reader import _read_exact
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8      # 8 x 8 low-frequency DCT coefficients -> 64-bit hashes
+DCT_SIZE = 32      # Frames are decoded straight to DCT_SIZE x DCT_SIZE grey
+SAMPLE_INTERVAL = 1.0
+BLOCK_FRAMES = 256
+
+_dct_matrices = {}
+
+
+def dct_matrix(size: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix, so that D @ X @ D.T is the 2-D DCT of X."""
+    matrix = _dct_matrices.get(size)
+    if matrix is None:
+        k = np.arange(size)[:, np.newaxis]
+        n = np.arange(size)[np.newaxis, :]
+        matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2.0 / size)
+        matrix[0] /= np.sqrt(2.0)
+        matrix = matrix.astype(np.float32)
+        _dct_matrices[size] = matrix
+    return matrix
+
+
+def phash_frames(frames: np.ndarray) -> np.ndarray:
+    """64-bit perceptual hashes of a batch of (n, DCT_SIZE, DCT_SIZE) grey frames.
+
+    Each bit tells whether a low-frequency DCT coefficient is above the
+    median of those coefficients (DC excluded), which survives re-encoding,
+    rescaling and small colour changes.
+    """
+    count = len(frames)
+    dct = dct_matrix(frames.shape[1])
+    coeffs = dct @ frames.astype(np.float32) @ dct.T
+    low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(count, HASH_SIZE * HASH_SIZE)
+    medians = np.median(low[:, 1:], axis=1)
+    bits = low > medians[:, np.newaxis]
+    return np.packbits(bits, axis=1).view('>u8').astype(np.uint64).ravel()
+
+
+def sample_clip_hashes(video_path: str, interval: float = SAMPLE_INTERVAL, stop_event=None):
+    """Hash one frame every ``interval`` seconds of a clip.
+
+    ffmpeg drops the frames in between and delivers the rest already
+    reduced to DCT_SIZE x DCT_SIZE grey, so the cost is dominated by decoding.
+    Returns (times, hashes) arrays, empty if decoding failed, or None if
+    stopped through ``stop_event``.
+    """
+    process = (
+        ffmpeg.input(video_path)
+        .filter('fps', fps=1.0 / interval)
+        .filter('scale', DCT_SIZE, DCT_SIZE, flags='area')
+        .output('pipe:', format='rawvideo', pix_fmt='gray', an=None, sn=None)
+        .global_args('-nostdin', '-loglevel', 'error')
+        .run_async(pipe_stdout=True)
+    )
+    frames = np.empty((BLOCK_FRAMES, DCT_SIZE, DCT_SIZE), dtype=np.uint8)
+    hashes = []
+    finished = False
+    try:
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            count = 0
+            while count < BLOCK_FRAMES and _read_exact(process.stdout, memoryview(frames[count]).cast('B')):
+                count += 1
+            if count:
+                hashes.append(phash_frames(frames[:count]))
+            if count < BLOCK_FRAMES:
+                finished = True
+                break
+    finally:
+        process.stdout.close()
+        if not finished:
+            process.kill()
+        process.wait()
+    if process.returncode != 0:
+        logger.warning(f"Hashing {video_path} failed (ffmpeg exit code {process.returncode})")
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.uint64)
+
+    hashes = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+    times = (np.arange(len(hashes), dtype=np.float32) * interval).astype(np.float32)
+    return times, hashes
+
+
+def clip_hashes(video_path: str, interval: float = SAMPLE_INTERVAL, stop_event=None):
+    """Sampled (times, hashes) of a clip, cached per media fingerprint.
+
+    A failed analysis comes back empty and is not cached, so it is retried.
+    """
+    path = os.path.join(cache_dir('phash'), f"{media_fingerprint(video_path)}.npz")
+    try:
+        with np.load(path) as data:
+            if float(data['interval']) == interval:
+                return data['times'], data['hashes']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    result = sample_clip_hashes(video_path, interval, stop_event)
+    if result is None:
+        return None
+    times, hashes = result
+    if len(hashes) == 0:
+        return times, hashes
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, times=times, hashes=hashes, interval=np.float64(interval))
+    os.replace(tmp_path, path)
+    return times, hashes
@@ -0,0 +1,189 @@
+import os
+import queue
+import logging
+import threading
+import numpy as np
+
+from .clip_reader import ClipReader
+from .effects import apply_chain
+
+logger = logging.getLogger(__name__)
+
+_END = object()  # Marks the end of the items on a queue
+EFFECT_BATCH = 64  # Frames whose effect parameters are sampled together
+
+
+class _Failure:
+    """Carries an exception raised by a stage to the consumer."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class Pipeline:
+    """Runs items through a chain of stages on worker threads, yielding results in order.
+
+    ``source`` is iterated on a feeder thread; each stage is a
+    (callable, workers) pair whose callable maps an item to the item for
+    the next stage. Stages are linked by bounded queues, so a fast stage
+    waits for a slow one instead of piling up work, and CPU-heavy stages
+    can have several workers: OpenCV and NumPy release the GIL, so they
+    really run in parallel. Results are put back in source order; at most
+    ``max_in_flight`` items exist between the source and the consumer.
+
+    An exception raised by a stage stops the pipeline and is re-raised by
+    the iterator. Call ``close`` (or exhaust the iterator) to stop the
+    threads.
+    """
+
+    def __init__(self, source, stages, queue_size: int = 4, max_in_flight: int = None):
+        self.stages = [(func, max(1, workers)) for func, workers in stages]
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(len(self.stages) + 1)]
+        self.stop_event = threading.Event()
+        total_workers = sum(workers for _, workers in self.stages)
+        self.window = threading.Semaphore(max_in_flight or total_workers + queue_size * len(self.queues))
+        self.threads = []
+        self._remaining = [workers for _, workers in self.stages]  # Live workers per stage
+        self._lock = threading.Lock()
+
+        self._start(threading.Thread(target=self._feed, args=(source,), name="pipeline-source", daemon=True))
+        for index, (func, workers) in enumerate(self.stages):
+            for _ in range(workers):
+                self._start(threading.Thread(target=self._work, args=(index, func),
+                                             name=f"pipeline-stage-{index}", daemon=True))
+
+    def _start(self, thread: threading.Thread):
+        self.threads.append(thread)
+        thread.start()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Queue an item, giving up if the pipeline is closed."""
+        while not self.stop_event.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """Take an item, or None if the pipeline is closed."""
+        while not self.stop_event.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _feed(self, source):
+        try:
+            for index, item in enumerate(source):
+                while not self.window.acquire(timeout=0.1):
+                    if self.stop_event.is_set():
+                        return
+                if not self._put(self.queues[0], (index, item)):
+                    return
+        except Exception as e:
+            logger.error(f"Pipeline source failed: {e}")
+            self._put(self.queues[-1], (None, _Failure(e)))
+            return
+        finally:
+            if hasattr(source, 'close'):
+                source.close()
+        self._put(self.queues[0], _END)
+
+    def _work(self, stage: int, func):
+        inbox, outbox = self.queues[stage], self.queues[stage + 1]
+        while True:
+            entry = self._get(inbox)
+            if entry is None:
+                return
+            if entry is _END:
+                # Let the other workers of this stage see the end too
+                self._put(inbox, _END)
+                with self._lock:
+                    self._remaining[stage] -= 1
+                    last = self._remaining[stage] == 0
+                if last:
+                    self._put(outbox, _END)
+                return
+
+            index, item = entry
+            try:
+                result = func(item)
+            except Exception as e:
+                logger.error(f"Pipeline stage {stage} failed on item {index}: {e}")
+                self._put(self.queues[-1], (index, _Failure(e)))
+                return
+            if not self._put(outbox, (index, result)):
+                return
+
+    def __iter__(self):
+        pending = {}  # index -> result that arrived before its turn
+        next_index = 0
+        try:
+            while True:
+                while next_index in pending:
+                    result = pending.pop(next_index)
+                    next_index += 1
+                    self.window.release()
+                    yield result
+                entry = self._get(self.queues[-1])
+                if entry is None or entry is _END:
+                    return
+                index, result = entry
+                if isinstance(result, _Failure):
+                    raise result.error
+                pending[index] = result
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop every thread of the pipeline."""
+        self.stop_event.set()
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+
+
+def render_clip(video_node, fps: float, start_time: float = 0.0, size=None,
+                convert=None, workers: int = None, end_time: float = None):
+    """Frames of a clip with its effects applied, rendered by a Pipeline.
+
+    Decoding stays sequential on a ClipReader; the effect chain runs on
+    several workers, then ``convert`` (e.g. wrapping frames for display or
+    encoding) if given. Yields (local_time, frame) in playback order, each
+    frame a new array, until ``end_time`` or the end of the clip. Animated
+    effect parameters are sampled EFFECT_BATCH frames at a time.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+
+    def decode():
+        reader = ClipReader(video_node, fps, start_time=start_time, size=size)
+        try:
+            index = 0
+            chains = []
+            while True:
+                local_time = start_time + index / fps
+                if end_time is not None and local_time >= end_time:
+                    return
+                frame = reader.read()
+                if frame is None:
+                    return
+                if index % EFFECT_BATCH == 0:
+                    times = start_time + np.arange(index, index + EFFECT_BATCH) / fps
+                    chains = video_node.effect_chains(times)
+                # The reader recycles its buffers, and frames outlive the next read here
+                yield local_time, frame.copy(), chains[index % EFFECT_BATCH]
+                index += 1
+        finally:
+            reader.close()
+
+    def apply_effects(item):
+        local_time, frame, chain = item
+        return local_time, apply_chain(frame, chain)
+
+    stages = [(apply_effects, workers)]
+    if convert is not None:
+        stages.append((lambda item: (item[0], convert(item[1])), max(1, workers // 2)))
+    return Pipeline(decode(), stages)
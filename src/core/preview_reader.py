@@ -0,0 +1,158 @@
+import logging
+import subprocess
+import cv2
+import numpy as np
+import ffmpeg
+
+from .frame_pool import FramePool
+
+logger = logging.getLogger(__name__)
+
+
+def fit_size(frame_width: int, frame_height: int, box_width: int, box_height: int):
+    """Get the largest (width, height) with the frame's aspect ratio that fits the box."""
+    scale = min(box_width / frame_width, box_height / frame_height)
+    return max(1, int(frame_width * scale)), max(1, int(frame_height * scale))
+
+
+def fit_into(frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Scale a frame to fit ``out``, centred on black, and return ``out``."""
+    if frame.shape == out.shape:
+        np.copyto(out, frame)
+        return out
+    box_height, box_width = out.shape[:2]
+    width, height = fit_size(frame.shape[1], frame.shape[0], box_width, box_height)
+    x, y = (box_width - width) // 2, (box_height - height) // 2
+    out.fill(0)
+    out[y:y + height, x:x + width] = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    return out
+
+
+def _read_exact(stream, view: memoryview) -> bool:
+    """Fill a buffer from a pipe, returning False on a short read (end of stream)."""
+    filled = 0
+    total = len(view)
+    while filled < total:
+        count = stream.readinto(view[filled:])
+        if not count:
+            return False
+        filled += count
+    return True
+
+
+class PreviewReader:
+    """Sequential reader that decodes frames directly at preview resolution.
+
+    Frames are requested from ffmpeg already scaled and converted to RGB, so
+    only width * height * 3 bytes per frame ever reach Python. Reading frames
+    in order keeps a single decoder running; any other frame restarts the
+    decoder with an accurate input seek. When the ffmpeg binary is not
+    available, OpenCV is used instead and the frame is shrunk before colour
+    conversion so that only the resize touches the full-resolution image.
+    """
+
+    def __init__(self, video_path: str, width: int, height: int, fps: float):
+        self.video_path = video_path
+        self.width = width
+        self.height = height
+        self.fps = fps if fps > 0 else 30.0
+        self.position = 0  # Index of the next frame the decoder delivers
+        self.process = None
+        self.capture = None
+        self.use_ffmpeg = True
+        self.scratch = FramePool(depth=1)  # Intermediate buffers for the OpenCV fallback
+
+    @property
+    def frame_shape(self):
+        return (self.height, self.width, 3)
+
+    def _start(self):
+        """Start a decoder positioned at the current frame."""
+        if self.use_ffmpeg:
+            try:
+                # Seek half a frame early so rounding never skips the wanted frame
+                seek = max(0.0, (self.position - 0.5) / self.fps)
+                stream = ffmpeg.input(self.video_path, ss=seek) if self.position > 0 else ffmpeg.input(self.video_path)
+                self.process = (
+                    stream
+                    .filter('scale', self.width, self.height, flags='area')
+                    .output('pipe:', format='rawvideo', pix_fmt='rgb24', an=None, sn=None)
+                    .global_args('-nostdin', '-loglevel', 'error')
+                    .run_async(pipe_stdout=True)
+                )
+                return
+            except (FileNotFoundError, OSError) as e:
+                logger.warning(f"ffmpeg unavailable, falling back to OpenCV preview decoding: {e}")
+                self.use_ffmpeg = False
+
+        self.capture = cv2.VideoCapture(self.video_path)
+        if self.position > 0:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, self.position)
+
+    def _read_ffmpeg(self, out: np.ndarray) -> bool:
+        if _read_exact(self.process.stdout, memoryview(out).cast('B')):
+            return True
+        self.close()
+        return False
+
+    def _read_capture(self, out: np.ndarray) -> bool:
+        if not self.capture.isOpened():
+            return False
+        source_shape = (int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                        int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        ret, frame = self.capture.read(self.scratch.acquire(source_shape))
+        if not ret:
+            return False
+        small = cv2.resize(frame, (self.width, self.height),
+                           dst=self.scratch.acquire(self.frame_shape),
+                           interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=out)
+        return True
+
+    def read(self, out: np.ndarray = None):
+        """Read the next frame as an RGB array of preview size, or None at the end.
+
+        When ``out`` is given the frame is decoded into it without allocating.
+        """
+        if out is None:
+            out = np.empty(self.frame_shape, dtype=np.uint8)
+
+        try:
+            if self.process is None and self.capture is None:
+                self._start()
+            ok = self._read_ffmpeg(out) if self.process is not None else self._read_capture(out)
+        except Exception as e:
+            logger.error(f"Error reading preview frame {self.position} from {self.video_path}: {e}")
+            self.close()
+            return None
+
+        if not ok:
+            return None
+        self.position += 1
+        return out
+
+    def seek(self, frame_number: int):
+        """Position the reader so the next read returns the given frame."""
+        frame_number = max(0, int(frame_number))
+        if frame_number != self.position:
+            self.close()
+            self.position = frame_number
+
+    def read_frame(self, frame_number: int, out: np.ndarray = None):
+        """Read a specific frame, reusing the running decoder when possible."""
+        self.seek(frame_number)
+        return self.read(out)
+
+    def close(self):
+        """Stop the decoder; the next read restarts it at the current position."""
+        if self.process is not None:
+            try:
+                self.process.stdout.close()
+                self.process.kill()
+                self.process.wait()
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.debug(f"Error stopping preview decoder: {e}")
+            self.process = None
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
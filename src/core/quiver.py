@@ -0,0 +1,87 @@
+import os
+import logging
+import cv2
+
+from .preview_reader import fit_size
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+def scan_quiver_stats(quiver_dir, extensions=VIDEO_EXTENSIONS) -> dict:
+    """Map every media file below a directory to its (size, mtime_ns).
+
+    Uses os.scandir so the directory entries supply the stat results; the
+    media files themselves are never opened.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    state = {}
+    stack = [str(quiver_dir)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(extensions):
+                        stat = entry.stat()
+                        state[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            logger.warning(f"Could not scan {directory}: {e}")
+    return state
+
+
+def probe_media(video_path: str, poster_width: int, poster_height: int) -> dict:
+    """Read a clip's properties and its first frame with a single open.
+
+    The poster frame is shrunk to fit the given box before colour conversion
+    and returned as an RGB array. Safe to call from worker threads.
+    """
+    info = {
+        'path': video_path,
+        'frame_count': 0,
+        'fps': 0,
+        'width': 0,
+        'height': 0,
+        'duration': 0,
+        'poster': None,
+        'error': None,
+    }
+
+    if not os.path.exists(video_path):
+        info['error'] = f"Video file not found: {video_path}"
+        return info
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            info['error'] = f"Could not open video: {video_path}"
+            return info
+
+        info['frame_count'] = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        info['fps'] = cap.get(cv2.CAP_PROP_FPS)
+        info['width'] = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        info['height'] = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if info['fps'] > 0:
+            info['duration'] = info['frame_count'] / info['fps']
+        else:
+            info['error'] = f"Invalid FPS for video: {video_path}"
+            return info
+
+        ret, frame = cap.read()
+        if ret:
+            size = fit_size(frame.shape[1], frame.shape[0], poster_width, poster_height)
+            small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            info['poster'] = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        return info
+
+    except Exception as e:
+        info['error'] = f"Error probing video: {str(e)}"
+        logger.error(info['error'])
+        return info
+    finally:
+        cap.release()
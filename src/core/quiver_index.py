@@ -0,0 +1,120 @@
+import os
+import json
+import logging
+import cv2
+
+from .cache import cache_dir, path_key, media_fingerprint, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Probe fields persisted for each file; the poster frame is stored separately
+INFO_FIELDS = ('frame_count', 'fps', 'width', 'height', 'duration', 'error')
+
+
+class QuiverIndex:
+    """Persistent record of the media in a quiver directory.
+
+    Each entry stores a file's size, mtime, probe metadata and a reference to
+    its poster frame on disk. Comparing a fresh directory scan against the
+    index yields exactly the files that were added, removed or changed, and
+    everything else can be restored from the index without opening media.
+    """
+
+    def __init__(self, quiver_dir, index_dir=None):
+        self.quiver_dir = str(quiver_dir)
+        self.index_dir = index_dir or cache_dir('quiver', path_key(quiver_dir))
+        self.index_path = os.path.join(self.index_dir, 'index.json')
+        self.poster_dir = os.path.join(self.index_dir, 'posters')
+        os.makedirs(self.poster_dir, exist_ok=True)
+        self.entries = {}  # path -> entry dict
+        self.dirty = False
+
+    def load(self):
+        """Load the index from disk; a missing or stale index starts empty."""
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.entries = data.get('entries', {})
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable quiver index {self.index_path}: {e}")
+            self.entries = {}
+        self.dirty = False
+
+    def save(self):
+        """Write the index if it changed since the last save."""
+        if not self.dirty:
+            return
+        write_json_atomic(self.index_path, {'version': INDEX_VERSION, 'entries': self.entries})
+        self.dirty = False
+
+    def diff(self, state: dict):
+        """Compare a scan (path -> (size, mtime_ns)) with the index.
+
+        Returns (added, removed, changed, unchanged) lists of paths.
+        """
+        added, changed, unchanged = [], [], []
+        for path, (size, mtime_ns) in state.items():
+            entry = self.entries.get(path)
+            if entry is None:
+                added.append(path)
+            elif entry['size'] != size or entry['mtime_ns'] != mtime_ns:
+                changed.append(path)
+            else:
+                unchanged.append(path)
+        removed = [path for path in self.entries if path not in state]
+        return sorted(added), sorted(removed), sorted(changed), sorted(unchanged)
+
+    def update(self, path, size: int, mtime_ns: int, info: dict):
+        """Record a fresh probe of a file, replacing any previous entry."""
+        self.remove(path)
+        fingerprint = media_fingerprint(path, size, mtime_ns)
+        poster_name = None
+        poster = info.get('poster')
+        if poster is not None:
+            poster_name = f"{fingerprint}.png"
+            try:
+                cv2.imwrite(os.path.join(self.poster_dir, poster_name),
+                            cv2.cvtColor(poster, cv2.COLOR_RGB2BGR))
+            except Exception as e:
+                logger.warning(f"Could not store poster for {path}: {e}")
+                poster_name = None
+
+        self.entries[path] = {
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'info': {field: info.get(field) for field in INFO_FIELDS},
+            'poster': poster_name,
+        }
+        self.dirty = True
+
+    def remove(self, path):
+        """Forget a file and delete its poster."""
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return
+        if entry.get('poster'):
+            try:
+                os.remove(os.path.join(self.poster_dir, entry['poster']))
+            except OSError:
+                pass
+        self.dirty = True
+
+    def media_info(self, path):
+        """Rebuild a probe info dict from the index, or None if the file is unknown."""
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+
+        info = dict(entry['info'])
+        info['path'] = path
+        info['poster'] = None
+        if entry.get('poster'):
+            poster = cv2.imread(os.path.join(self.poster_dir, entry['poster']))
+            if poster is not None:
+                info['poster'] = cv2.cvtColor(poster, cv2.COLOR_BGR2RGB)
+        return info
@@ -0,0 +1,199 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import ffmpeg
+
+from .cache import cache_dir, media_fingerprint
+from .preview_reader import _read_exact
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_WIDTH = 64
+ANALYSIS_HEIGHT = 36
+BLOCK_FRAMES = 256        # Frames scored together in one batch
+MIN_SEGMENT_FRAMES = 1500 # Shorter files are not worth splitting across workers
+HIST_LEVELS = 8           # Quantisation levels per channel (8 ** 3 joint bins)
+HIST_BINS = HIST_LEVELS ** 3
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def block_features(frames: np.ndarray):
+    """Joint RGB histograms (n, HIST_BINS) and luma planes (n, h, w) of a frame block."""
+    count = len(frames)
+    shift = 8 - int(np.log2(HIST_LEVELS))
+    q = (frames >> shift).astype(np.uint32)
+    bins = (q[..., 0] * HIST_LEVELS + q[..., 1]) * HIST_LEVELS + q[..., 2]
+    bins = bins.reshape(count, -1)
+    # Offset each frame into its own bin range so one bincount covers the block
+    bins += (np.arange(count, dtype=np.uint32) * HIST_BINS)[:, np.newaxis]
+    hists = np.bincount(bins.ravel(), minlength=count * HIST_BINS).reshape(count, HIST_BINS)
+    luma = frames.astype(np.float32) @ LUMA_WEIGHTS
+    return hists.astype(np.float32), luma
+
+
+def block_scores(hists: np.ndarray, luma: np.ndarray):
+    """Scores between consecutive frames of a block (one fewer than frames).
+
+    The histogram score is the fraction of pixels whose colour bin changed
+    (0-1); the pixel score is the mean absolute luma change (0-1).
+    """
+    pixels = luma.shape[1] * luma.shape[2]
+    hist_scores = np.abs(np.diff(hists, axis=0)).sum(axis=1) * (0.5 / pixels)
+    pixel_scores = np.abs(np.diff(luma, axis=0)).mean(axis=(1, 2)) * (1.0 / 255.0)
+    return hist_scores, pixel_scores
+
+
+def detect_cuts(hist_scores: np.ndarray, pixel_scores: np.ndarray, hist_threshold: float = 0.4,
+                pixel_threshold: float = 0.08, min_shot_frames: int = 12):
+    """Frame indices where new shots begin.
+
+    ``scores[i]`` compares frame i with frame i - 1. A cut needs both scores
+    over their thresholds; of cuts closer than ``min_shot_frames`` the
+    first is kept, which suppresses flashes and fast pans.
+    """
+    candidates = np.flatnonzero((hist_scores > hist_threshold) & (pixel_scores > pixel_threshold))
+    cuts = []
+    last = 0
+    for frame in candidates.tolist():
+        if frame - last >= min_shot_frames:
+            cuts.append(frame)
+            last = frame
+    return cuts
+
+
+def shots_from_cuts(cuts, frame_count: int, fps: float):
+    """Convert cut frames to (start_time, end_time) shots covering the clip."""
+    bounds = [0] + list(cuts) + [frame_count]
+    return [(start / fps, end / fps) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+class SceneDetector:
+    """Scores every frame of a clip for shot changes and caches the scores.
+
+    The clip is split into segments analysed in parallel, each by its own
+    ffmpeg decoder that downscales to ANALYSIS_WIDTH x ANALYSIS_HEIGHT before
+    frames reach Python. Frames are scored in blocks of BLOCK_FRAMES with
+    batched NumPy. Scores are stored per media fingerprint, so changing the
+    thresholds never decodes the clip again.
+    """
+
+    def __init__(self, video_path: str, fps: float, frame_count: int, workers: int = None):
+        self.video_path = video_path
+        self.fps = fps
+        self.frame_count = frame_count
+        self.workers = workers or min(8, os.cpu_count() or 1)
+
+    def cache_path(self) -> str:
+        return os.path.join(cache_dir('scenes'), media_fingerprint(self.video_path) + '.npz')
+
+    def load_scores(self):
+        """Cached (hist_scores, pixel_scores), or None."""
+        try:
+            with np.load(self.cache_path()) as data:
+                if tuple(data['size']) != (ANALYSIS_WIDTH, ANALYSIS_HEIGHT):
+                    return None
+                return data['hist'], data['pixel']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save_scores(self, hist_scores, pixel_scores):
+        path = self.cache_path()
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, hist=hist_scores, pixel=pixel_scores,
+                 size=np.array([ANALYSIS_WIDTH, ANALYSIS_HEIGHT]))
+        os.replace(tmp_path, path)
+
+    def scores(self, stop_event=None):
+        """Per-frame (hist_scores, pixel_scores), analysing the clip if not cached.
+
+        Returns None if stopped through ``stop_event``.
+        """
+        cached = self.load_scores()
+        if cached is not None:
+            return cached
+
+        hist_scores = np.zeros(self.frame_count, dtype=np.float32)
+        pixel_scores = np.zeros(self.frame_count, dtype=np.float32)
+        segments = max(1, min(self.workers, self.frame_count // MIN_SEGMENT_FRAMES))
+        bounds = np.linspace(0, self.frame_count, segments + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=segments, thread_name_prefix="scene-detect") as pool:
+            futures = [pool.submit(self._score_segment, start, end, hist_scores, pixel_scores, stop_event)
+                       for start, end in zip(bounds, bounds[1:])]
+            complete = all([future.result() for future in futures])
+        if stop_event is not None and stop_event.is_set():
+            return None
+
+        if complete:
+            self.save_scores(hist_scores, pixel_scores)
+        return hist_scores, pixel_scores
+
+    def _score_segment(self, start: int, end: int, hist_scores, pixel_scores, stop_event):
+        """Worker: score frames [start, end), decoding from one frame earlier.
+
+        Returns False if decoding failed or ended before ``end``, so incomplete
+        scores are not cached.
+        """
+        first = max(0, start - 1)  # The previous frame is needed for the first score
+        seek = max(0.0, (first - 0.5) / self.fps)
+        stream = ffmpeg.input(self.video_path, ss=seek) if first > 0 else ffmpeg.input(self.video_path)
+        process = (
+            stream
+            .filter('scale', ANALYSIS_WIDTH, ANALYSIS_HEIGHT, flags='fast_bilinear')
+            .output('pipe:', format='rawvideo', pix_fmt='rgb24', an=None, sn=None,
+                    vframes=end - first)
+            .global_args('-nostdin', '-loglevel', 'error')
+            .run_async(pipe_stdout=True)
+        )
+        frames = np.empty((BLOCK_FRAMES + 1, ANALYSIS_HEIGHT, ANALYSIS_WIDTH, 3), dtype=np.uint8)
+        position = first
+        try:
+            # Slot 0 carries the last frame of the previous block over
+            have_previous = False
+            while position < end:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                count = 0
+                offset = 1 if have_previous else 0
+                while count < BLOCK_FRAMES and position + count < end:
+                    if not _read_exact(process.stdout, memoryview(frames[offset + count]).cast('B')):
+                        break
+                    count += 1
+                if count == 0:
+                    logger.warning(f"Scene detection of {self.video_path} ended at frame {position} of {end}")
+                    return False
+
+                total = offset + count
+                hists, luma = block_features(frames[:total])
+                block_hist, block_pixel = block_scores(hists, luma)
+                # Score i of the block compares frame i + 1 with frame i
+                first_scored = position - offset + 1
+                hist_scores[first_scored:first_scored + len(block_hist)] = block_hist
+                pixel_scores[first_scored:first_scored + len(block_pixel)] = block_pixel
+
+                position += count
+                frames[0] = frames[total - 1]
+                have_previous = True
+        except Exception as e:
+            logger.error(f"Error detecting scenes in {self.video_path}: {e}")
+            return False
+        finally:
+            process.stdout.close()
+            if position < end:
+                process.kill()  # Stopped or failed; the remaining output is not wanted
+            process.wait()
+        if process.returncode != 0:
+            logger.warning(f"Scene detection of {self.video_path} failed (ffmpeg exit code {process.returncode})")
+            return False
+        return True
+
+    def shots(self, hist_threshold: float = 0.4, pixel_threshold: float = 0.08,
+              min_shot_length: float = 0.5, stop_event=None):
+        """Detected shots as (start_time, end_time) source times, or None if stopped."""
+        scores = self.scores(stop_event)
+        if scores is None:
+            return None
+        hist_scores, pixel_scores = scores
+        cuts = detect_cuts(hist_scores, pixel_scores, hist_threshold, pixel_threshold,
+                           max(1, int(round(min_shot_length * self.fps))))
+        return shots_from_cuts(cuts, self.frame_count, self.fps)
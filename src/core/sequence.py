@@ -0,0 +1,181 @@
+import random
+
+_random = random.Random()
+
+
+class _Entry:
+    """Immutable treap node: one clip plus totals over its subtree."""
+
+    __slots__ = ('item', 'advance', 'duration', 'priority', 'left', 'right', 'count', 'total')
+
+    def __init__(self, item, advance, duration, priority, left=None, right=None):
+        self.item = item
+        self.advance = advance      # Time from this clip's start to the next one's
+        self.duration = duration    # Length of the clip itself
+        self.priority = priority
+        self.left = left
+        self.right = right
+        self.count = 1 + _count(left) + _count(right)
+        self.total = advance + _total(left) + _total(right)
+
+    def with_children(self, left, right) -> '_Entry':
+        return _Entry(self.item, self.advance, self.duration, self.priority, left, right)
+
+
+def _count(entry) -> int:
+    return entry.count if entry is not None else 0
+
+
+def _total(entry) -> float:
+    return entry.total if entry is not None else 0.0
+
+
+def _merge(left, right):
+    """Concatenate two treaps (every item of ``left`` first)."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        return left.with_children(left.left, _merge(left.right, right))
+    return right.with_children(_merge(left, right.left), right.right)
+
+
+def _split(entry, count: int):
+    """Split a treap into its first ``count`` items and the rest."""
+    if entry is None:
+        return None, None
+    left_count = _count(entry.left)
+    if count <= left_count:
+        first, rest = _split(entry.left, count)
+        return first, entry.with_children(rest, entry.right)
+    first, rest = _split(entry.right, count - left_count - 1)
+    return entry.with_children(entry.left, first), rest
+
+
+class ClipSequence:
+    """A sequence of clips laid end to end, as a persistent implicit treap.
+
+    Each clip has an ``advance`` (its duration minus the overlap with the
+    next clip's transition) and a ``duration``; a clip starts at the sum of
+    the advances before it. Subtrees keep clip counts and advance totals,
+    so finding the clip at a time or position and inserting, deleting or
+    trimming with ripple take O(log n). Edits return a new sequence and
+    share all untouched nodes with the old one, so a sequence handed to a
+    renderer is a snapshot that later edits never change.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+
+    @classmethod
+    def from_items(cls, items):
+        """Build from (item, advance, duration) triples in O(n)."""
+        spine = []  # Right spine of the treap being built
+        for item, advance, duration in items:
+            entry = _Entry(item, advance, duration, _random.random())
+            # Spine nodes of lower priority become the new entry's left subtree,
+            # each taking the one popped before it as its right child
+            last = None
+            while spine and spine[-1].priority < entry.priority:
+                popped = spine.pop()
+                last = popped.with_children(popped.left, last)
+            spine.append(entry.with_children(last, None))
+        while len(spine) > 1:
+            last = spine.pop()
+            spine[-1] = spine[-1].with_children(spine[-1].left, last)
+        return cls(spine[0] if spine else None)
+
+    def __len__(self):
+        return _count(self.root)
+
+    @property
+    def duration(self) -> float:
+        """End of the last clip."""
+        if self.root is None:
+            return 0.0
+        item, start, advance, duration = self.entry(len(self) - 1)
+        return start + duration
+
+    def entry(self, index: int):
+        """(item, start, advance, duration) of the clip at a position."""
+        if not 0 <= index < len(self):
+            raise IndexError("clip index out of range")
+        entry = self.root
+        start = 0.0
+        while True:
+            left_count = _count(entry.left)
+            if index < left_count:
+                entry = entry.left
+            elif index == left_count:
+                return entry.item, start + _total(entry.left), entry.advance, entry.duration
+            else:
+                start += _total(entry.left) + entry.advance
+                index -= left_count + 1
+                entry = entry.right
+
+    def find(self, time_pos: float):
+        """(index, item, start) of the last clip starting at or before a time, or None.
+
+        During a transition this is the incoming clip. Times past the end of
+        the last clip give None.
+        """
+        if self.root is None or time_pos < 0:
+            return None
+        entry = self.root
+        index = 0
+        start = 0.0
+        found = None
+        while entry is not None:
+            entry_start = start + _total(entry.left)
+            if time_pos < entry_start:
+                entry = entry.left
+            else:
+                found = (index + _count(entry.left), entry, entry_start)
+                index += _count(entry.left) + 1
+                start = entry_start + entry.advance
+                entry = entry.right
+        position, entry, entry_start = found
+        if time_pos >= entry_start + entry.duration:
+            return None
+        return position, entry.item, entry_start
+
+    def insert(self, index: int, item, advance: float, duration: float) -> 'ClipSequence':
+        """Insert a clip before position ``index``, rippling later clips."""
+        first, rest = _split(self.root, index)
+        entry = _Entry(item, advance, duration, _random.random())
+        return ClipSequence(_merge(_merge(first, entry), rest))
+
+    def delete(self, index: int) -> 'ClipSequence':
+        """Remove the clip at a position, rippling later clips back."""
+        first, rest = _split(self.root, index)
+        removed, rest = _split(rest, 1)
+        if removed is None:
+            raise IndexError("clip index out of range")
+        return ClipSequence(_merge(first, rest))
+
+    def update(self, index: int, advance: float = None, duration: float = None, item=None) -> 'ClipSequence':
+        """Change a clip's timing (e.g. after a trim), rippling later clips."""
+        first, rest = _split(self.root, index)
+        old, rest = _split(rest, 1)
+        if old is None:
+            raise IndexError("clip index out of range")
+        entry = _Entry(old.item if item is None else item,
+                       old.advance if advance is None else advance,
+                       old.duration if duration is None else duration,
+                       old.priority)
+        return ClipSequence(_merge(_merge(first, entry), rest))
+
+    def __iter__(self):
+        """(item, start) of every clip in order."""
+        stack = []
+        entry = self.root
+        start = 0.0
+        while stack or entry is not None:
+            while entry is not None:
+                stack.append(entry)
+                entry = entry.left
+            entry = stack.pop()
+            yield entry.item, start
+            start += entry.advance
+            entry = entry.right
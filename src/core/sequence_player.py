@@ -0,0 +1,149 @@
+import math
+import logging
+
+from .pipeline import render_clip
+from .preview_reader import fit_size
+from .transitions import blend_frames
+
+logger = logging.getLogger(__name__)
+
+
+class _ClipPlayback:
+    """A clip's slot in the sequence and the pipeline rendering it."""
+
+    def __init__(self, index: int, node, start: float, advance: float, duration: float,
+                 first_frame: int, fps: float, size):
+        self.index = index
+        self.node = node
+        self.start = start
+        self.end = start + advance  # The next clip takes over here
+        self.stop = start + duration  # Past a transition into the next clip, the clip ends here
+        self.first_frame = first_frame
+        self.last_frame = None  # Most recent frame, held if the decoder ends early
+        local_start = first_frame / fps - start
+        self.pipeline = render_clip(node, fps, start_time=local_start, size=size,
+                                    end_time=local_start + (self.frame_count(fps) - 0.5) / fps)
+        self.frames = iter(self.pipeline)
+
+    def frame_count(self, fps: float) -> int:
+        """Output frames whose times fall within the clip, transition included."""
+        return max(0, math.ceil(self.stop * fps - 1e-9) - self.first_frame)
+
+    def read(self):
+        item = next(self.frames, None)
+        if item is not None:
+            self.last_frame = item[1]
+        return self.last_frame
+
+    def close(self):
+        self.pipeline.close()
+
+
+class SequencePlayer:
+    """Frames of a ClipSequence at a fixed rate, cutting between clips without a stall.
+
+    Output frame k shows time k / fps. Each clip renders exactly the
+    output frames falling within it through a render_clip pipeline, so
+    cuts land on the right frame whichever files the clips come from.
+    ``preroll`` seconds before a cut the next clip's pipeline is opened,
+    so its decoder has sought and buffered frames by the time they are
+    needed. Where a clip's transition overlaps the next clip, the
+    outgoing pipeline keeps running until the clip ends and both sides
+    are blended by the transition.
+
+    Frames are fitted to ``max_size`` (width, height) per clip, keeping
+    each clip's aspect ratio.
+    """
+
+    def __init__(self, sequence, fps: float, max_size=None, start_time: float = 0.0,
+                 preroll: float = 1.0):
+        self.sequence = sequence  # A ClipSequence snapshot; later edits do not affect it
+        self.fps = fps
+        self.max_size = max_size
+        self.preroll = preroll
+        self.current = None
+        self.upcoming = None
+        self.outgoing = None  # The previous clip, while its transition plays
+        self.frame_index = 0
+        self.seek(start_time)
+
+    @property
+    def time(self) -> float:
+        """Time of the frame ``read`` returns next."""
+        return self.frame_index / self.fps
+
+    def seek(self, time_pos: float):
+        """Continue from the frame at a time (closing any open clips)."""
+        self.close()
+        self.frame_index = max(0, int(round(time_pos * self.fps)))
+
+    def _open(self, index: int, first_frame: int):
+        node, start, advance, duration = self.sequence.entry(index)
+        size = None
+        if self.max_size and node.width and node.height:
+            size = fit_size(node.width, node.height, *self.max_size)
+        return _ClipPlayback(index, node, start, advance, duration, first_frame, self.fps, size)
+
+    def _close_outgoing(self):
+        if self.outgoing is not None:
+            self.outgoing.close()
+            self.outgoing = None
+
+    def read(self):
+        """The next (time, node, frame), or None past the end of the sequence.
+
+        During a transition ``node`` is the incoming clip.
+        """
+        time_pos = self.frame_index / self.fps
+        if self.current is None or time_pos >= self.current.end:
+            found = self.sequence.find(time_pos)
+            if found is None:
+                return None
+            index = found[0]
+            self._close_outgoing()
+            if self.current is not None:
+                # A clip with a transition keeps playing under the next one
+                if self.current.index == index - 1 and time_pos < self.current.stop:
+                    self.outgoing = self.current
+                else:
+                    self.current.close()
+            elif index > 0 and time_pos < sum(self.sequence.entry(index - 1)[1::2]):
+                # Started inside a transition
+                self.outgoing = self._open(index - 1, self.frame_index)
+            if self.upcoming is not None and self.upcoming.index == index:
+                self.current, self.upcoming = self.upcoming, None
+            else:
+                if self.upcoming is not None:
+                    self.upcoming.close()
+                    self.upcoming = None
+                self.current = self._open(index, self.frame_index)
+
+        # Pre-roll the next clip ahead of the cut
+        next_index = self.current.index + 1
+        if (self.upcoming is None and next_index < len(self.sequence) and
+                time_pos >= self.current.end - self.preroll):
+            next_start = self.sequence.entry(next_index)[1]
+            try:
+                self.upcoming = self._open(next_index, math.ceil(next_start * self.fps - 1e-9))
+            except Exception as e:
+                logger.error(f"Error opening the next clip for playback: {e}")
+
+        if self.outgoing is not None and time_pos >= self.outgoing.stop:
+            self._close_outgoing()
+
+        frame = self.current.read()
+        if self.outgoing is not None:
+            frame_a = self.outgoing.read()
+            transition = self.outgoing.node.transition_out
+            if frame is not None and frame_a is not None and transition is not None:
+                progress = (time_pos - self.current.start) / (self.outgoing.stop - self.current.start)
+                frame = blend_frames(transition, frame_a, frame, progress)
+        self.frame_index += 1
+        return time_pos, self.current.node, frame
+
+    def close(self):
+        """Stop the open pipelines."""
+        for playback in (self.current, self.upcoming, self.outgoing):
+            if playback is not None:
+                playback.close()
+        self.current = self.upcoming = self.outgoing = None
@@ -0,0 +1,224 @@
+import os
+import json
+import math
+import logging
+import numpy as np
+import ffmpeg
+
+from .cache import cache_dir, media_fingerprint, write_json_atomic
+from .preview_reader import _read_exact, fit_size
+
+logger = logging.getLogger(__name__)
+
+THUMB_HEIGHT = 54        # Pixel height of every stored thumbnail
+MAX_THUMB_WIDTH = 128    # Bound for very wide sources
+MIN_STEP = 0.5           # Finest spacing between thumbnails, in seconds
+MAX_THUMBS = 2048        # Finest level never holds more thumbnails than this
+COARSEST_THUMBS = 8      # The coarsest level has at most this many
+SEEK_THUMBS = 32         # Levels up to this many thumbnails in total are built by seeking
+
+
+class ThumbnailPyramid:
+    """Filmstrip thumbnails of a clip at several densities, packed in an on-disk atlas.
+
+    Level 0 is the coarsest; each further level halves the spacing, down
+    to the finest step, so the thumbnails of a level are every other one
+    of the next. All thumbnails share one memory-mapped atlas of
+    (slots, height, width, 3) RGB pixels with a ``filled`` flag per slot,
+    so a partly built pyramid can be drawn and resumed, and drawing only
+    touches the pages of the thumbnails on screen.
+    """
+
+    def __init__(self, atlas: np.ndarray, filled: np.ndarray, levels, media_path: str):
+        self.atlas = atlas      # (slots, height, width, 3) uint8 memmap
+        self.filled = filled    # (slots,) uint8 memmap: 0 missing, 1 written, 2 no frame there
+        self.levels = levels    # [(offset, count, step)] coarse to fine
+        self.media_path = media_path
+
+    @property
+    def thumb_size(self):
+        """(width, height) of every thumbnail."""
+        return self.atlas.shape[2], self.atlas.shape[1]
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.filled.all())
+
+    @classmethod
+    def cache_paths(cls, media_path: str):
+        """Paths of the atlas, the filled flags and the metadata in the cache."""
+        base = os.path.join(cache_dir('thumbnails'), media_fingerprint(media_path))
+        return base + '.npy', base + '.filled.npy', base + '.json'
+
+    @staticmethod
+    def plan_levels(duration: float):
+        """Level layout [(offset, count, step)] for a clip, coarse to fine."""
+        step = max(MIN_STEP, duration / MAX_THUMBS)
+        steps = [step]
+        while math.ceil(duration / steps[-1]) > COARSEST_THUMBS:
+            steps.append(steps[-1] * 2)
+        levels = []
+        offset = 0
+        for step in reversed(steps):
+            count = max(1, math.ceil(duration / step))
+            levels.append((offset, count, step))
+            offset += count
+        return levels
+
+    @classmethod
+    def load(cls, media_path: str):
+        """Open a cached (possibly partial) pyramid, or None if there is none."""
+        atlas_path, filled_path, meta_path = cls.cache_paths(media_path)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            atlas = np.load(atlas_path, mmap_mode='r+')
+            filled = np.load(filled_path, mmap_mode='r+')
+            return cls(atlas, filled, [tuple(level) for level in meta['levels']], media_path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def create(cls, media_path: str, duration: float, width: int, height: int):
+        """Open the cached pyramid of a clip, or allocate an empty one."""
+        pyramid = cls.load(media_path)
+        if pyramid is not None:
+            return pyramid
+        thumb_width, thumb_height = fit_size(width, height, MAX_THUMB_WIDTH, THUMB_HEIGHT)
+        levels = cls.plan_levels(duration)
+        slots = levels[-1][0] + levels[-1][1]
+        atlas_path, filled_path, meta_path = cls.cache_paths(media_path)
+        np.lib.format.open_memmap(atlas_path, mode='w+', dtype=np.uint8,
+                                  shape=(slots, thumb_height, thumb_width, 3)).flush()
+        np.lib.format.open_memmap(filled_path, mode='w+', dtype=np.uint8, shape=(slots,)).flush()
+        # The metadata is written last, so its presence means the arrays are valid
+        write_json_atomic(meta_path, {'levels': levels})
+        return cls.load(media_path)
+
+    def level_for(self, seconds_per_thumb: float) -> int:
+        """Coarsest level with at least one thumbnail per ``seconds_per_thumb``."""
+        best = 0
+        for index, (offset, count, step) in enumerate(self.levels):
+            if step <= seconds_per_thumb:
+                return index
+            best = index
+        return best
+
+    def thumbnail(self, time_pos: float, seconds_per_thumb: float):
+        """Slot of the best available thumbnail for a source time, or None.
+
+        Uses the level matching the spacing, falling back to coarser levels
+        while it is still being built.
+        """
+        for level in range(self.level_for(seconds_per_thumb), -1, -1):
+            offset, count, step = self.levels[level]
+            slot = offset + max(0, min(count - 1, int(time_pos / step)))
+            if self.filled[slot] == 1:
+                return slot
+        return None
+
+    def build(self, stop_event=None, progress=None):
+        """Decode the missing thumbnails, coarse levels first.
+
+        Coarse levels are filled by seeking to each thumbnail; the rest come
+        from one sequential pass at the finest spacing, which lands on every
+        level's times. ``progress`` is called after each batch so drawing can
+        refresh. Returns False if stopped through ``stop_event``.
+        """
+        seek_levels = []
+        total = 0
+        for level in self.levels:
+            total += level[1]
+            if total > SEEK_THUMBS:
+                break
+            seek_levels.append(level)
+
+        for offset, count, step in seek_levels:
+            for index in range(count):
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                if not self.filled[offset + index]:
+                    self._decode_at(index * step, offset + index)
+            self._flush()
+            if progress:
+                progress()
+
+        if self.complete:
+            return True
+        stopped = not self._decode_sequential(stop_event, progress)
+        self._flush()
+        if progress:
+            progress()
+        return not stopped
+
+    def _store(self, slot: int, frame: np.ndarray):
+        self.atlas[slot] = frame
+        self.filled[slot] = 1
+
+    def _flush(self):
+        self.atlas.flush()
+        self.filled.flush()
+
+    def _decode_at(self, time_pos: float, slot: int):
+        """Decode the frame at a time (to the nearest keyframe) into a slot."""
+        width, height = self.thumb_size
+        try:
+            data, _ = (
+                ffmpeg.input(self.media_path, ss=time_pos)
+                .filter('scale', width, height, flags='area')
+                .output('pipe:', format='rawvideo', pix_fmt='rgb24', vframes=1, an=None, sn=None)
+                .global_args('-nostdin', '-loglevel', 'error')
+                .run(capture_stdout=True)
+            )
+        except ffmpeg.Error as e:
+            logger.error(f"Error decoding thumbnail at {time_pos:.2f}s of {self.media_path}: {e}")
+            return
+        if len(data) >= width * height * 3:
+            self._store(slot, np.frombuffer(data, np.uint8, width * height * 3).reshape(height, width, 3))
+
+    def _decode_sequential(self, stop_event, progress) -> bool:
+        """Fill every level from one pass over the clip at the finest spacing."""
+        width, height = self.thumb_size
+        finest_offset, finest_count, finest_step = self.levels[-1]
+        process = (
+            ffmpeg.input(self.media_path)
+            .filter('fps', fps=1.0 / finest_step)
+            .filter('scale', width, height, flags='area')
+            .output('pipe:', format='rawvideo', pix_fmt='rgb24', an=None, sn=None)
+            .global_args('-nostdin', '-loglevel', 'error')
+            .run_async(pipe_stdout=True)
+        )
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        ended = False
+        try:
+            for index in range(finest_count):
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                if not _read_exact(process.stdout, memoryview(frame).cast('B')):
+                    ended = True
+                    break
+                # Finest index i is index i / 2^k of the level k steps coarser
+                for level in range(len(self.levels) - 1, -1, -1):
+                    offset, count, step = self.levels[level]
+                    stride = 1 << (len(self.levels) - 1 - level)
+                    if index % stride:
+                        break
+                    slot = offset + index // stride
+                    if not self.filled[slot]:
+                        self._store(slot, frame)
+                if progress and index and index % 64 == 0:
+                    progress()
+        finally:
+            process.stdout.close()
+            if not ended:
+                process.kill()
+            process.wait()
+        if ended:
+            if process.returncode == 0:
+                # Past the last frame; mark the rest so it is not decoded again
+                self.filled[self.filled == 0] = 2
+            else:
+                # Left unfilled, so the next build tries again
+                logger.warning(f"Thumbnail decoding of {self.media_path} failed "
+                               f"(ffmpeg exit code {process.returncode})")
+        return True
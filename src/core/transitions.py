@@ -0,0 +1,184 @@
+import uuid
+import numpy as np
+import cv2
+
+from .frame_pool import FramePool
+
+
+class Transition:
+    """Base class for transitions between two overlapping clips.
+
+    The incoming clip starts ``duration`` seconds before the outgoing clip
+    ends. ``render`` blends one frame of each side into an output buffer.
+    """
+
+    def __init__(self, duration: float = 1.0):
+        self.id = str(uuid.uuid4())
+        self.duration = max(0.0, duration)
+
+    def overlap(self, duration_a: float, duration_b: float) -> float:
+        """Length of the overlap, limited by the clips on either side."""
+        return max(0.0, min(self.duration, duration_a, duration_b))
+
+    def render(self, frame_a: np.ndarray, frame_b: np.ndarray, progress: float,
+               out: np.ndarray = None) -> np.ndarray:
+        """Blend two equally sized frames at a progress from 0 (all A) to 1 (all B).
+
+        Args:
+            frame_a: Frame of the outgoing clip
+            frame_b: Frame of the incoming clip
+            progress: Position within the transition
+            out: Optional destination buffer; may not alias either input
+
+        Returns:
+            The blended frame (``out`` when given)
+        """
+        if out is None:
+            out = np.empty_like(frame_a)
+        np.copyto(out, frame_b if progress >= 0.5 else frame_a)
+        return out
+
+    def to_dict(self) -> dict:
+        """Convert the transition to a dictionary for serialization."""
+        return {
+            'id': self.id,
+            'type': self.__class__.__name__,
+            'duration': self.duration
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Transition':
+        """Create a transition from a dictionary."""
+        transition = cls(duration=data['duration'])
+        transition.id = data['id']
+        return transition
+
+
+class CutTransition(Transition):
+    """A hard cut; clips do not overlap."""
+
+    def __init__(self, duration: float = 0.0):
+        super().__init__(0.0)
+
+
+class FadeTransition(Transition):
+    """Crossfade from the outgoing to the incoming clip."""
+
+    def render(self, frame_a, frame_b, progress, out=None):
+        if out is None:
+            out = np.empty_like(frame_a)
+        return cv2.addWeighted(frame_a, 1.0 - progress, frame_b, progress, 0, dst=out)
+
+
+class WipeTransition(Transition):
+    """Reveal the incoming clip behind a moving edge.
+
+    ``direction`` is the side the incoming clip enters from. With a non-zero
+    ``softness`` (fraction of the frame) the edge is a linear ramp; the ramp
+    profile is computed once per frame size and only the pixels under the
+    ramp are blended, everything else is a plain copy.
+    """
+
+    DIRECTIONS = ('left', 'right', 'top', 'bottom')
+
+    def __init__(self, duration: float = 1.0, direction: str = 'left', softness: float = 0.05):
+        super().__init__(duration)
+        if direction not in self.DIRECTIONS:
+            raise ValueError(f"Invalid wipe direction: {direction}")
+        self.direction = direction
+        self.softness = max(0.0, min(1.0, softness))
+        self._profiles = {}  # (length, softness) -> ramp weights of the soft edge
+        self._scratch = FramePool(depth=1)
+
+    def _oriented(self, frame: np.ndarray) -> np.ndarray:
+        """View a frame so the wipe always travels along axis 1 from index 0."""
+        if self.direction in ('top', 'bottom'):
+            frame = frame.transpose(1, 0, 2)
+        if self.direction in ('right', 'bottom'):
+            frame = frame[:, ::-1]
+        return frame
+
+    def _profile(self, length: int) -> np.ndarray:
+        """Weights of the incoming clip across the soft edge, shaped for broadcasting."""
+        key = (length, self.softness)
+        profile = self._profiles.get(key)
+        if profile is None:
+            band = max(1, int(round(length * self.softness)))
+            profile = np.linspace(1.0, 0.0, band + 2, dtype=np.float32)[1:-1]
+            profile = profile.reshape(1, band, 1)
+            self._profiles = {key: profile}  # Only the current frame size is kept
+        return profile
+
+    def render(self, frame_a, frame_b, progress, out=None):
+        if out is None:
+            out = np.empty_like(frame_a)
+        a, b, o = self._oriented(frame_a), self._oriented(frame_b), self._oriented(out)
+        length = o.shape[1]
+
+        if self.softness <= 0.0:
+            edge = int(round(progress * length))
+            o[:, :edge] = b[:, :edge]
+            o[:, edge:] = a[:, edge:]
+            return out
+
+        # The soft edge travels from fully off-frame on one side to the other
+        profile = self._profile(length)
+        band = profile.shape[1]
+        start = int(round(progress * (length + band))) - band
+        lo, hi = max(0, start), min(length, start + band)
+        o[:, :lo] = b[:, :lo]
+        o[:, hi:] = a[:, hi:]
+        if hi > lo:
+            weights = profile[:, lo - start:hi - start]
+            scratch = self._scratch.acquire((o.shape[0], band, o.shape[2]), np.float32)[:, :hi - lo]
+            np.subtract(b[:, lo:hi], a[:, lo:hi], out=scratch, dtype=np.float32)
+            scratch *= weights
+            scratch += a[:, lo:hi]
+            scratch += 0.5  # Round when truncating back to uint8
+            np.copyto(o[:, lo:hi], scratch, casting='unsafe')
+        return out
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data.update({
+            'direction': self.direction,
+            'softness': self.softness
+        })
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'WipeTransition':
+        transition = super().from_dict(data)
+        transition.direction = data['direction']
+        transition.softness = data['softness']
+        return transition
+
+
+TRANSITION_TYPES = {
+    'Cut': CutTransition,
+    'Fade': FadeTransition,
+    'Wipe': WipeTransition,
+}
+
+
+def create_transition(name: str, duration: float = 1.0) -> Transition:
+    """Create a transition from its palette name ("Cut", "Fade" or "Wipe")."""
+    return TRANSITION_TYPES[name](duration=duration)
+
+
+def transition_from_dict(data: dict) -> Transition:
+    """Recreate a serialized transition."""
+    classes = {cls.__name__: cls for cls in TRANSITION_TYPES.values()}
+    return classes[data['type']].from_dict(data)
+
+
+def blend_frames(transition: Transition, frame_a: np.ndarray, frame_b: np.ndarray,
+                 progress: float, out: np.ndarray = None) -> np.ndarray:
+    """Blend one frame of each side of a transition, fitting the incoming frame to the outgoing one.
+
+    ``progress`` is clamped to [0, 1]; the result is a new array unless
+    ``out`` is given.
+    """
+    if frame_b.shape != frame_a.shape:
+        frame_b = cv2.resize(frame_b, (frame_a.shape[1], frame_a.shape[0]), interpolation=cv2.INTER_AREA)
+    return transition.render(frame_a, frame_b, min(1.0, max(0.0, progress)), out=out)
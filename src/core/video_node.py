@@ -7,14 +7,23 @@ import ffmpeg
 import os
 import logging
 
+from .transitions import transition_from_dict
+from .audio.dsp import audio_effect_from_dict
+from .effects import effect_from_dict, apply_chain
+from .preview_reader import PreviewReader
+
 class VideoNode(QObject):
     """A node that represents a video clip with various operations and effects."""
     
     # Signals for node state changes
     state_changed = pyqtSignal()
+    edited = pyqtSignal(dict)  # {attribute: (old, new)} for each edit, lists as tuples
     preview_updated = pyqtSignal(np.ndarray)
     
-    def __init__(self, video_path: str = None):
+    has_audio = True
+    images = None  # ImageSequence of nodes backed by image files
+    
+    def __init__(self, video_path: str = None, probe: bool = True):
         super().__init__()
         self.id = str(uuid.uuid4())
         self.video_path = video_path
@@ -23,11 +32,18 @@ class VideoNode(QObject):
         self.speed = 1.0
         self.is_reversed = False
         self.effects = []
+        self.audio_effects = []  # Volume/EQ/Fade applied to the clip's audio
         self.error = None
         
         # Node connections
         self.next_node = None
         self.prev_node = None
+        self.transition_out = None  # Transition into the next clip on the timeline
+        
+        # Layering on the timeline
+        self.track = 0
+        self.opacity = 1.0
+        self.blend_mode = 'normal'  # See compositor.BLEND_MODES
         
         # Set up logging
         self.logger = logging.getLogger(__name__)
@@ -45,7 +61,9 @@ class VideoNode(QObject):
         self.width = 0
         self.height = 0
         
-        self.load_video_info()
+        # Probing can be deferred to a background loader (see apply_media_info)
+        if probe:
+            self.load_video_info()
     
     def load_video_info(self):
         """Load basic video information."""
@@ -84,31 +102,94 @@ class VideoNode(QObject):
             self.width = 0
             self.height = 0
     
-    def get_frame_at_time(self, time_pos: float) -> np.ndarray:
-        """Get the frame at the specified time position."""
-        if not self.video_path:
-            return np.zeros((720, 1280, 3), dtype=np.uint8)
-            
+    def apply_media_info(self, info: dict):
+        """Set video properties from a probe done elsewhere (e.g. a worker thread)."""
+        self.frame_count = info['frame_count']
+        self.fps = info['fps']
+        self.width = info['width']
+        self.height = info['height']
+        self.duration = info['duration']
+        self.error = info['error']
+        if self.error:
+            self.logger.error(self.error)
+        
+        # Set end time if not set, or clamp it if the file got shorter
+        if self.end_time is None or self.end_time > self.duration:
+            self.end_time = self.duration
+        
+        self.state_changed.emit()
+    
+    def source_frame_index(self, time_pos: float) -> int:
+        """Map a time within the clip to a frame number in the source file.
+        
+        Honours the trimmed time range, the playback speed and reversal.
+        """
+        end_time = self.end_time if self.end_time is not None else self.duration
+        
         # Apply time transformations
+        offset = time_pos * self.speed
         if self.is_reversed:
-            time_pos = self.duration - time_pos
-            
-        time_pos *= self.speed
+            source_time = end_time - offset
+        else:
+            source_time = self.start_time + offset
         
         # Ensure time is within bounds
-        time_pos = max(0, min(time_pos, self.duration))
+        source_time = max(self.start_time, min(source_time, end_time))
+        
+        frame_number = int(source_time * self.fps)
+        return max(0, min(frame_number, self.frame_count - 1))
+    
+    def clip_time(self, frame_number: int) -> float:
+        """Map a source frame number back to a time within the clip.
         
-        frame_number = int(time_pos * self.fps)
+        The inverse of ``source_frame_index``: honours the trimmed time
+        range, the playback speed and reversal.
+        """
+        end_time = self.end_time if self.end_time is not None else self.duration
+        source_time = max(self.start_time, min(frame_number / self.fps, end_time))
+        if self.is_reversed:
+            offset = end_time - source_time
+        else:
+            offset = source_time - self.start_time
+        return offset / self.speed
+    
+    def get_frame_at_time(self, time_pos: float, render_scale: float = 1.0) -> np.ndarray:
+        """Get the frame at the specified time position.
+        
+        With a ``render_scale`` below 1 the frame is shrunk before the effects
+        run, so previews pay for the effect chain at their own resolution.
+        """
+        if not self.video_path:
+            return np.zeros((720, 1280, 3), dtype=np.uint8)
+            
+        frame_number = self.source_frame_index(time_pos)
         frame = self.get_frame(frame_number)
         
         if frame is None:
             return np.zeros((720, 1280, 3), dtype=np.uint8)
         
-        # Apply effects
-        for effect in self.effects:
-            frame = effect.apply(frame)
-            
-        return frame
+        if render_scale < 1.0:
+            height, width = frame.shape[:2]
+            size = (max(1, int(round(width * render_scale))), max(1, int(round(height * render_scale))))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        
+        return self.apply_effects(frame, time_pos)
+    
+    def apply_effects(self, frame: np.ndarray, time_pos: float) -> np.ndarray:
+        """Run the effect chain on a frame, with animated parameters at a clip time.
+        
+        Effect parameters are relative to the frame (fractions, factors and
+        degrees), so a chain run on a downscaled frame gives the downscaled
+        result of the full-resolution chain.
+        """
+        return apply_chain(frame, [effect.evaluated(time_pos) for effect in self.effects])
+    
+    def effect_chains(self, times) -> list:
+        """The effect chain at each of many clip times, sampling every curve once."""
+        per_effect = [effect.evaluated_batch(times) for effect in self.effects]
+        if not per_effect:
+            return [[] for _ in range(len(times))]
+        return [list(chain) for chain in zip(*per_effect)]
     
     def get_frame(self, frame_number):
         """Get a specific frame from the video."""
@@ -143,36 +224,78 @@ class VideoNode(QObject):
         """Get a frame for preview purposes."""
         return self.get_frame(0)
     
+    def open_preview_reader(self, width: int, height: int):
+        """A sequential reader decoding frames at preview size."""
+        return PreviewReader(self.video_path, width, height, self.fps)
+    
+    def edit(self, **values):
+        """Set attributes and announce the change through ``edited`` and ``state_changed``.
+        
+        Lists are replaced rather than mutated, so the old list can be kept
+        by the undo history.
+        """
+        changes = {}
+        for attr, value in values.items():
+            old = getattr(self, attr)
+            setattr(self, attr, value)
+            if isinstance(value, list):
+                old, value = tuple(old), tuple(value)
+            if old != value:
+                changes[attr] = (old, value)
+        if changes:
+            self.edited.emit(changes)
+        self.state_changed.emit()
+    
     def add_effect(self, effect):
         """Add an effect to the video node."""
-        self.effects.append(effect)
-        self.state_changed.emit()
+        self.edit(effects=self.effects + [effect])
     
     def remove_effect(self, effect):
         """Remove an effect from the video node."""
         if effect in self.effects:
-            self.effects.remove(effect)
-            self.state_changed.emit()
+            self.edit(effects=[e for e in self.effects if e is not effect])
+    
+    def add_audio_effect(self, effect):
+        """Add an effect to the clip's audio."""
+        self.edit(audio_effects=self.audio_effects + [effect])
+    
+    def remove_audio_effect(self, effect):
+        """Remove an effect from the clip's audio."""
+        if effect in self.audio_effects:
+            self.edit(audio_effects=[e for e in self.audio_effects if e is not effect])
     
     def set_time_range(self, start: float, end: float):
         """Set the time range for this clip."""
-        self.start_time = max(0, start)
-        self.end_time = min(self.duration, end)
-        self.state_changed.emit()
+        self.edit(start_time=max(0, start), end_time=min(self.duration, end))
     
     def set_speed(self, speed: float):
         """Set the playback speed of the clip."""
-        self.speed = max(0.1, min(10.0, speed))
-        self.state_changed.emit()
+        self.edit(speed=max(0.1, min(10.0, speed)))
     
     def toggle_reverse(self):
         """Toggle reverse playback of the clip."""
-        self.is_reversed = not self.is_reversed
-        self.state_changed.emit()
+        self.edit(is_reversed=not self.is_reversed)
+    
+    def set_transition_out(self, transition):
+        """Set (or clear with None) the transition into the next clip."""
+        self.edit(transition_out=transition)
+    
+    def set_track(self, track: int):
+        """Move the clip to a timeline track; higher tracks are drawn on top."""
+        self.edit(track=max(0, track))
+    
+    def set_opacity(self, opacity: float):
+        """Set the opacity used when compositing the clip over lower tracks."""
+        self.edit(opacity=max(0.0, min(1.0, opacity)))
+    
+    def set_blend_mode(self, blend_mode: str):
+        """Set the blend mode used when compositing the clip over lower tracks."""
+        self.edit(blend_mode=blend_mode)
     
     def get_duration(self) -> float:
         """Get the actual duration considering speed and time range."""
-        base_duration = self.end_time - self.start_time
+        end_time = self.end_time if self.end_time is not None else self.duration
+        base_duration = end_time - self.start_time
         return base_duration / self.speed
     
     def to_dict(self) -> dict:
@@ -184,17 +307,52 @@ class VideoNode(QObject):
             'end_time': self.end_time,
             'speed': self.speed,
             'is_reversed': self.is_reversed,
-            'effects': [effect.to_dict() for effect in self.effects]
+            'effects': [effect.to_dict() for effect in self.effects],
+            'audio_effects': [effect.to_dict() for effect in self.audio_effects],
+            'transition_out': self.transition_out.to_dict() if self.transition_out else None,
+            'track': self.track,
+            'opacity': self.opacity,
+            'blend_mode': self.blend_mode
         }
     
+    @staticmethod
+    def encode_value(attr: str, value):
+        """Serializable form of an attribute value, as reported by ``edited``."""
+        if attr in ('effects', 'audio_effects'):
+            return [effect.to_dict() for effect in value]
+        if attr == 'transition_out':
+            return value.to_dict() if value else None
+        return value
+    
+    @staticmethod
+    def decode_value(attr: str, data):
+        """Attribute value from its serialized form (see ``encode_value``)."""
+        if attr == 'effects':
+            return [effect_from_dict(effect) for effect in data]
+        if attr == 'audio_effects':
+            return [audio_effect_from_dict(effect) for effect in data]
+        if attr == 'transition_out':
+            return transition_from_dict(data) if data else None
+        return data
+    
     @classmethod
-    def from_dict(cls, data: dict) -> 'VideoNode':
-        """Create a node from a dictionary."""
-        node = cls(data['video_path'])
+    def from_dict(cls, data: dict, probe: bool = True) -> 'VideoNode':
+        """Create a node (of the kind recorded in the dictionary) from a dictionary."""
+        if cls is VideoNode and data.get('kind') == 'image_sequence':
+            from .image_sequence import ImageSequenceNode
+            return ImageSequenceNode.from_dict(data, probe=probe)
+        node = cls(data['video_path'], probe=probe)
         node.id = data['id']
         node.start_time = data['start_time']
         node.end_time = data['end_time']
         node.speed = data['speed']
         node.is_reversed = data['is_reversed']
-        # Effects will be added when effect system is implemented
+        node.track = data.get('track', 0)
+        node.opacity = data.get('opacity', 1.0)
+        node.blend_mode = data.get('blend_mode', 'normal')
+        if data.get('transition_out'):
+            node.transition_out = transition_from_dict(data['transition_out'])
+        node.effects = [effect_from_dict(effect) for effect in data.get('effects', [])]
+        node.audio_effects = [audio_effect_from_dict(effect)
+                              for effect in data.get('audio_effects', [])]
         return node
@@ -0,0 +1,92 @@
+import time
+import numpy as np
+from PyQt6.QtCore import QObject, QTimer
+
+from ..core.audio import MixAhead
+
+try:
+    from PyQt6.QtMultimedia import QAudioFormat, QAudioSink, QMediaDevices
+except ImportError:  # Qt built without multimedia: play silently on the wall clock
+    QAudioSink = None
+
+
+class AudioOutput(QObject):
+    """Plays an AudioEngine on the default output device and acts as the playback clock.
+
+    A MixAhead mixes on a worker thread; the GUI thread only copies mixed
+    blocks to the device whenever it has room for one, keeping only a few
+    blocks queued. ``time`` is the timeline time currently audible, so
+    video playback follows the audio rather than its own timer. Without an
+    audio device it falls back to the wall clock.
+    """
+
+    QUEUED_BLOCKS = 4
+
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.mix = MixAhead(engine)
+        self.block = np.zeros((engine.mixer.block_size, engine.mixer.channels), dtype=np.float32)
+        self.sink = None
+        self.device = None
+        self.started_at = None  # (monotonic time, timeline time) for the fallback clock
+        self.block_bytes = engine.mixer.block_size * engine.mixer.channels * 4
+        self.frame_bytes = engine.mixer.channels * 4
+
+        if QAudioSink is not None and not QMediaDevices.defaultAudioOutput().isNull():
+            audio_format = QAudioFormat()
+            audio_format.setSampleRate(engine.sample_rate)
+            audio_format.setChannelCount(engine.mixer.channels)
+            audio_format.setSampleFormat(QAudioFormat.SampleFormat.Float)
+            self.sink = QAudioSink(QMediaDevices.defaultAudioOutput(), audio_format, self)
+            self.sink.setBufferSize(self.block_bytes * self.QUEUED_BLOCKS)
+
+        self.feed_timer = QTimer(self)
+        self.feed_timer.setInterval(5)
+        self.feed_timer.timeout.connect(self.feed)
+
+    def start(self, time_pos: float = 0.0):
+        """Start playing from a timeline time."""
+        self.stop()
+        self.started_at = (time.monotonic(), time_pos)
+        if self.sink is not None:
+            self.mix.start(time_pos)
+            self.device = self.sink.start()
+            self.feed()
+            self.feed_timer.start()
+
+    def feed(self):
+        """Copy mixed blocks to the device while it has room and blocks are ready."""
+        if self.device is None:
+            return
+        try:
+            while self.sink.bytesFree() >= self.block_bytes:
+                frames = self.mix.read_into(self.block)
+                if not frames:
+                    break  # The mixer is behind; the next tick catches up
+                self.device.write(self.block[:frames].tobytes())
+        except Exception as e:
+            print(f"Error feeding audio output: {e}")
+
+    def time(self) -> float:
+        """Timeline time currently audible."""
+        if self.device is None:
+            if self.started_at is None:
+                return 0.0
+            started, time_pos = self.started_at
+            return time_pos + time.monotonic() - started
+        buffered = (self.sink.bufferSize() - self.sink.bytesFree()) // self.frame_bytes
+        return self.mix.time(buffered)
+
+    def stop(self):
+        """Stop playback and discard queued audio."""
+        self.feed_timer.stop()
+        self.mix.stop()
+        if self.sink is not None:
+            self.sink.stop()
+        self.device = None
+        self.started_at = None
+
+    def close(self):
+        self.stop()
+        self.engine.close()
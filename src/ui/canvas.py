@@ -1,9 +1,22 @@
-from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPathItem
-from PyQt6.QtCore import Qt, QPointF
+from contextlib import contextmanager
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPathItem, QGraphicsItem, QMenu, QFileDialog
+from PyQt6.QtCore import Qt, QPointF, pyqtSignal
 from PyQt6.QtGui import QPen, QColor, QPainterPath, QPainter
 
 from .widgets.video_node_widget import VideoNodeWidget
+from .node_palette import NODE_MIME_TYPE
+from .scene_detect_job import SceneDetectJob
 from ..core.video_node import VideoNode
+from ..core.image_sequence import ImageSequenceNode
+from ..core.image_reader import IMAGE_EXTENSIONS
+from ..core.history import History
+from ..core.graph import Graph
+from ..core.graph_nodes import SourceNode
+from ..core.transitions import TRANSITION_TYPES, create_transition
+from ..core.audio import AUDIO_EFFECT_TYPES, create_audio_effect
+
+# Node attributes that move clips on the timeline
+TIMING_ATTRS = {'start_time', 'end_time', 'speed', 'transition_out'}
 
 class ConnectionItem(QGraphicsPathItem):
     """A graphics item representing a connection between nodes."""
@@ -57,6 +70,8 @@ class ConnectionItem(QGraphicsPathItem):
             self.scene().removeItem(self)
 
 class VideoCanvas(QGraphicsView):
+    similar_requested = pyqtSignal(object)  # Node widget to find similar clips for
+    
     def __init__(self):
         super().__init__()
         
@@ -71,6 +86,7 @@ class VideoCanvas(QGraphicsView):
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.setAcceptDrops(True)
         
         # Initialize connection variables
         self.temp_connection = None
@@ -78,6 +94,19 @@ class VideoCanvas(QGraphicsView):
         self.start_node = None
         self.connections = []  # List of ConnectionItem objects
         
+        # Evaluation graph the timeline pulls clip frames through
+        self.graph = Graph()
+        self.graph_sources = {}  # VideoNode id -> SourceNode
+        self.scene_jobs = {}  # Node widget -> running SceneDetectJob
+        
+        # Undo history of node edits and moves, addressed by VideoNode id
+        self.node_widgets = {}  # VideoNode id -> VideoNodeWidget
+        self.history = History(self.node_widgets.get, self.apply_history_value)
+        self.history.listeners.append(self.update_timeline)
+        self.move_start = {}  # VideoNode id -> position when a drag started
+        self.journal = None  # Autosave Journal receiving a record per edit
+        self.edit_batch = None  # Records collected by batched_edits, journaled as one
+        
         # Set dark theme
         self.setStyleSheet("""
             QGraphicsView {
@@ -107,18 +136,25 @@ class VideoCanvas(QGraphicsView):
                         conn.end_node.video_node.prev_node = None
                     self.scene.removeItem(conn)
             
-            self.connections = valid_connections
+            if len(valid_connections) != len(self.connections):
+                self.connections = valid_connections
             self.update_timeline()
             
         except Exception as e:
             print(f"Error updating connections: {e}")
     
-    def add_video_node(self, video_path, pos=None):
-        """Add a new video node to the canvas."""
+    def add_video_node(self, video_path, pos=None, placeholder=False, video_node=None):
+        """Add a new video node to the canvas.
+        
+        A placeholder node skips probing and preview decoding; it is filled in
+        later with VideoNodeWidget.apply_media_info. An existing VideoNode
+        (e.g. restored from a dictionary) can be passed instead of a path.
+        """
         try:
             # Create video node
-            video_node = VideoNode(video_path)
-            node_widget = VideoNodeWidget(video_node)
+            if video_node is None:
+                video_node = VideoNode(video_path, probe=not placeholder)
+            node_widget = VideoNodeWidget(video_node, load_preview=not placeholder)
             
             # Set position
             if pos is None:
@@ -127,6 +163,11 @@ class VideoCanvas(QGraphicsView):
             
             # Add to scene
             self.scene.addItem(node_widget)
+            self.graph_sources[video_node.id] = self.graph.add_node(SourceNode(video_node))
+            self.node_widgets[video_node.id] = node_widget
+            video_node.edited.connect(
+                lambda changes, node_id=video_node.id: self.record_node_edit(node_id, changes))
+            self.log_edit({'op': 'add', 'node': video_node.to_dict(), 'pos': [pos.x(), pos.y()]})
             
             # Connect to position changes
             node_widget.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsScenePositionChanges)
@@ -137,6 +178,178 @@ class VideoCanvas(QGraphicsView):
             print(f"Error adding video node: {e}")
             return None
     
+    def add_image_node(self, image_path, pos=None, sequence=False):
+        """Add a still image, or with ``sequence`` the numbered image sequence it belongs to."""
+        return self.add_video_node(image_path, pos, video_node=ImageSequenceNode(image_path, sequence=sequence))
+    
+    def choose_image(self, pos=None, sequence=False):
+        """Ask for an image file and add it as a still or as the sequence it belongs to."""
+        patterns = ' '.join(f"*{extension}" for extension in IMAGE_EXTENSIONS)
+        title = "Add Image Sequence (pick any frame)" if sequence else "Add Image"
+        path, _ = QFileDialog.getOpenFileName(self, title, "", f"Images ({patterns})")
+        if path:
+            self.add_image_node(path, pos, sequence)
+            self.update_timeline()
+    
+    def remove_video_node(self, node_widget):
+        """Remove a node and its connections from the canvas."""
+        try:
+            for conn in [c for c in self.connections
+                         if c.start_node is node_widget or c.end_node is node_widget]:
+                conn.start_node.video_node.next_node = None
+                conn.end_node.video_node.prev_node = None
+                self.scene.removeItem(conn)
+                self.connections.remove(conn)
+            
+            node_widget.is_playing = False
+            node_widget.playback_timer.stop()
+            node_widget.stop_audio()
+            node_widget.stop_stream()
+            job = self.scene_jobs.pop(node_widget, None)
+            if job is not None:
+                job.cancel()
+            if node_widget.reader:
+                node_widget.reader.close()
+            self.scene.removeItem(node_widget)
+            
+            self.node_widgets.pop(node_widget.video_node.id, None)
+            self.log_edit({'op': 'remove', 'node': node_widget.video_node.id})
+            source = self.graph_sources.pop(node_widget.video_node.id, None)
+            if source is not None:
+                self.graph.remove_node(source)
+            
+        except Exception as e:
+            print(f"Error removing video node: {e}")
+    
+    def clear_nodes(self):
+        """Remove every node and connection from the canvas."""
+        for job in self.scene_jobs.values():
+            job.cancel()
+        self.scene_jobs = {}
+        for widget in self.node_widgets.values():
+            widget.stop_stream()
+        self.scene.clear()
+        self.connections = []
+        self.temp_connection = None
+        self.graph = Graph()
+        self.graph_sources = {}
+        self.node_widgets.clear()
+        self.move_start = {}
+        self.history.clear()
+        self.log_edit({'op': 'clear'})
+    
+    def to_project(self):
+        """The full canvas as a dictionary (nodes with positions, and connections)."""
+        return {
+            'nodes': [{'node': widget.video_node.to_dict(), 'pos': [widget.pos().x(), widget.pos().y()]}
+                      for widget in self.node_widgets.values()],
+            'connections': [[conn.start_node.video_node.id, conn.end_node.video_node.id]
+                            for conn in self.connections]
+        }
+    
+    def load_project(self, project):
+        """Replace the canvas with a project; nodes are placeholders to be probed by the caller."""
+        self.clear_nodes()
+        for entry in project.get('nodes', []):
+            self.apply_record({'op': 'add', **entry})
+        for source_id, target_id in project.get('connections', []):
+            self.apply_record({'op': 'connect', 'source': source_id, 'target': target_id})
+    
+    def apply_record(self, record):
+        """Replay one autosave journal record."""
+        op = record['op']
+        widget = self.node_widgets.get(record.get('node')) if isinstance(record.get('node'), str) else None
+        if op == 'add':
+            video_node = VideoNode.from_dict(record['node'], probe=False)
+            self.add_video_node(video_node.video_path, QPointF(*record['pos']),
+                                placeholder=True, video_node=video_node)
+        elif op == 'remove' and widget is not None:
+            self.remove_video_node(widget)
+        elif op == 'edit' and widget is not None:
+            for attr, value in record['changes'].items():
+                if attr == 'pos':
+                    widget.setPos(QPointF(*value))
+                else:
+                    setattr(widget.video_node, attr, VideoNode.decode_value(attr, value))
+        elif op == 'connect':
+            source = self.node_widgets.get(record['source'])
+            target = self.node_widgets.get(record['target'])
+            if source is not None and target is not None:
+                self.connect_nodes(source, target)
+        elif op == 'disconnect':
+            target = self.node_widgets.get(record['target'])
+            if target is not None:
+                self.remove_existing_connections(target)
+        elif op == 'clear':
+            self.clear_nodes()
+        elif op == 'batch':
+            for entry in record['records']:
+                self.apply_record(entry)
+    
+    def log_edit(self, record):
+        """Append a change record to the autosave journal, if any."""
+        if self.edit_batch is not None:
+            self.edit_batch.append(record)
+        elif self.journal is not None:
+            self.journal.append(record)
+    
+    @contextmanager
+    def batched_edits(self):
+        """Journal the edits made inside the block as one 'batch' record, e.g. for bulk loads."""
+        outer = self.edit_batch
+        if outer is None:
+            self.edit_batch = []
+        try:
+            yield
+        finally:
+            if outer is None:
+                records, self.edit_batch = self.edit_batch, None
+                if records:
+                    self.log_edit({'op': 'batch', 'records': records})
+    
+    def log_node_changes(self, node_id, values):
+        """Journal new attribute values of a node (positions as 'pos')."""
+        changes = {attr: VideoNode.encode_value(attr, value) for attr, value in values.items()}
+        self.log_edit({'op': 'edit', 'node': node_id, 'changes': changes})
+    
+    def record_node_edit(self, node_id, changes):
+        """Add a node edit to the undo history; quick repeats of an edit coalesce."""
+        timeline = self.main_timeline()
+        if timeline is not None and TIMING_ATTRS.intersection(changes):
+            timeline.clip_changed(self.node_widgets[node_id].video_node)
+        self.log_node_changes(node_id, {attr: new for attr, (old, new) in changes.items()})
+        self.history.record_changes(
+            {(node_id, attr): change for attr, change in changes.items()},
+            label="Edit " + ", ".join(attr.replace('_', ' ') for attr in changes),
+            merge_key=(node_id, tuple(sorted(changes)))
+        )
+    
+    def apply_history_value(self, widget, attr, value):
+        """Set a recorded value while undoing or redoing."""
+        self.log_node_changes(widget.video_node.id, {attr: value})
+        if attr == 'pos':
+            widget.setPos(QPointF(*value))
+            return
+        setattr(widget.video_node, attr, list(value) if isinstance(value, tuple) else value)
+        timeline = self.main_timeline()
+        if timeline is not None and attr in TIMING_ATTRS:
+            timeline.clip_changed(widget.video_node)
+        widget.video_node.state_changed.emit()
+        widget.on_node_edited({attr: value})
+        widget.update()
+    
+    def source_frame(self, video_node, time_pos, render_scale=1.0):
+        """A clip's frame pulled through the evaluation graph, for the timeline compositor.
+        
+        Frames are cached by the graph, so a paused playhead re-renders
+        without decoding.
+        """
+        source = self.graph_sources.get(video_node.id)
+        if source is None:
+            return video_node.get_frame_at_time(time_pos, render_scale)
+        source.render_scale = render_scale
+        return self.graph.evaluate(source, time_pos)
+    
     def mousePressEvent(self, event):
         """Handle mouse press events."""
         try:
@@ -159,6 +372,12 @@ class VideoCanvas(QGraphicsView):
             print(f"Error in mousePressEvent: {e}")
         
         super().mousePressEvent(event)
+        
+        # Remember where the selected nodes were, so a drag is undone as one move
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.move_start = {item.video_node.id: (item.pos().x(), item.pos().y())
+                               for item in self.scene.selectedItems()
+                               if isinstance(item, VideoNodeWidget)}
     
     def mouseMoveEvent(self, event):
         """Handle mouse move events."""
@@ -204,6 +423,18 @@ class VideoCanvas(QGraphicsView):
             print(f"Error in mouseReleaseEvent: {e}")
         
         super().mouseReleaseEvent(event)
+        
+        if event.button() == Qt.MouseButton.LeftButton and self.move_start:
+            moves = {}
+            for node_id, old in self.move_start.items():
+                widget = self.node_widgets.get(node_id)
+                if widget is not None:
+                    new = (widget.pos().x(), widget.pos().y())
+                    if new != old:
+                        moves[(node_id, 'pos')] = (old, new)
+                        self.log_node_changes(node_id, {'pos': new})
+            self.history.record_changes(moves, label="Move")
+            self.move_start = {}
     
     def start_connection(self, node, port_type, pos):
         """Start drawing a connection from a port."""
@@ -266,17 +497,7 @@ class VideoCanvas(QGraphicsView):
                 source_node = end_node
                 target_node = self.start_node
             
-            # Remove any existing connections to the target node's input
-            self.remove_existing_connections(target_node)
-            
-            # Create new connection
-            connection = ConnectionItem(source_node, target_node)
-            self.scene.addItem(connection)
-            self.connections.append(connection)
-            
-            # Update the video node connections
-            source_node.video_node.next_node = target_node.video_node
-            target_node.video_node.prev_node = source_node.video_node
+            self.connect_nodes(source_node, target_node)
             
             # Clear temporary connection
             if self.temp_connection:
@@ -292,6 +513,25 @@ class VideoCanvas(QGraphicsView):
         except Exception as e:
             print(f"Error finishing connection: {e}")
     
+    def connect_nodes(self, source_node, target_node):
+        """Connect one node's output to another's input, replacing its input connection."""
+        # Remove any existing connections to the target node's input
+        self.remove_existing_connections(target_node)
+        
+        # Create new connection
+        connection = ConnectionItem(source_node, target_node)
+        self.scene.addItem(connection)
+        self.connections.append(connection)
+        
+        # Update the video node connections
+        source_node.video_node.next_node = target_node.video_node
+        target_node.video_node.prev_node = source_node.video_node
+        timeline = self.main_timeline()
+        if timeline is not None:
+            timeline.link(source_node.video_node, target_node.video_node)
+        self.log_edit({'op': 'connect', 'source': source_node.video_node.id,
+                       'target': target_node.video_node.id})
+    
     def remove_existing_connections(self, node):
         """Remove any existing connections to a node's input port."""
         try:
@@ -303,9 +543,14 @@ class VideoCanvas(QGraphicsView):
                     conn.end_node.video_node.prev_node = None
                     connections_to_remove.append(conn)
             
+            timeline = self.main_timeline()
             for conn in connections_to_remove:
                 self.scene.removeItem(conn)
                 self.connections.remove(conn)
+                if timeline is not None:
+                    timeline.unlink(conn.start_node.video_node, conn.end_node.video_node)
+            if connections_to_remove:
+                self.log_edit({'op': 'disconnect', 'target': node.video_node.id})
             
         except Exception as e:
             print(f"Error removing connections: {e}")
@@ -334,6 +579,12 @@ class VideoCanvas(QGraphicsView):
             print(f"Error getting clips order: {e}")
             return []
 
+    def main_timeline(self):
+        """The timeline of the main window showing this canvas, or None."""
+        if self.scene and self.scene.views():
+            return getattr(self.scene.views()[0].window(), 'timeline', None)
+        return None
+    
     def update_timeline(self):
         """Update the timeline with current connections."""
         try:
@@ -377,17 +628,128 @@ class VideoCanvas(QGraphicsView):
                     sorted_nodes[0].prev_node = None
             
             # Update timeline with connections
-            if self.scene and self.scene.views():
-                main_window = self.scene.views()[0].window()
-                if hasattr(main_window, 'timeline'):
-                    main_window.timeline.update_clips(connections)
-                    print(f"Updated timeline with {len(connections)} connections")
+            timeline = self.main_timeline()
+            if timeline is not None:
+                timeline.update_clips(connections)
+                print(f"Updated timeline with {len(connections)} connections")
         
         except Exception as e:
             print(f"Error updating timeline: {e}")
             import traceback
             traceback.print_exc()
     
+    def node_widget_at(self, pos):
+        """Get the node widget under a scene position, if any."""
+        for item in self.scene.items(pos):
+            while item is not None and not isinstance(item, VideoNodeWidget):
+                item = item.parentItem()
+            if item is not None:
+                return item
+        return None
+    
+    def dragEnterEvent(self, event):
+        """Accept nodes dragged from the palette."""
+        if event.mimeData().hasFormat(NODE_MIME_TYPE):
+            event.acceptProposedAction()
+        else:
+            super().dragEnterEvent(event)
+    
+    def dragMoveEvent(self, event):
+        """Keep accepting palette drags while they move over the canvas."""
+        if event.mimeData().hasFormat(NODE_MIME_TYPE):
+            event.acceptProposedAction()
+        else:
+            super().dragMoveEvent(event)
+    
+    def dropEvent(self, event):
+        """Handle nodes dropped from the palette.
+        
+        Dropping a transition onto a node sets the transition into the clip
+        that follows it on the timeline; dropping an audio node adds the
+        effect to the clip's audio. Dropping an Image node on empty canvas
+        asks for an image or image sequence to add there.
+        """
+        try:
+            if not event.mimeData().hasFormat(NODE_MIME_TYPE):
+                super().dropEvent(event)
+                return
+            
+            payload = bytes(event.mimeData().data(NODE_MIME_TYPE)).decode()
+            category, name = payload.split('/', 1)
+            pos = self.mapToScene(event.position().toPoint())
+            widget = self.node_widget_at(pos)
+            
+            if category == 'Transitions' and name in TRANSITION_TYPES and widget:
+                transition = None if name == 'Cut' else create_transition(name)
+                widget.video_node.set_transition_out(transition)
+                widget.update()
+                self.update_timeline()
+                event.acceptProposedAction()
+            
+            elif category == 'Audio' and name in AUDIO_EFFECT_TYPES and widget:
+                widget.video_node.add_audio_effect(create_audio_effect(name))
+                widget.update()
+                self.update_timeline()
+                event.acceptProposedAction()
+            
+            elif category == 'Media' and name in ('Image', 'Image Sequence') and widget is None:
+                event.acceptProposedAction()
+                self.choose_image(pos, sequence=name == 'Image Sequence')
+            
+        except Exception as e:
+            print(f"Error handling drop: {e}")
+    
+    def contextMenuEvent(self, event):
+        """Offer per-node actions for the node under the cursor."""
+        try:
+            widget = self.node_widget_at(self.mapToScene(event.pos()))
+            if widget is None or widget.video_node.error or not widget.video_node.frame_count:
+                super().contextMenuEvent(event)
+                return
+            
+            menu = QMenu(self)
+            split = menu.addAction("Split into Shots")
+            split.setEnabled(widget not in self.scene_jobs)
+            split.triggered.connect(lambda: self.detect_shots(widget))
+            similar = menu.addAction("Find Similar Clips")
+            similar.triggered.connect(lambda: self.similar_requested.emit(widget))
+            menu.exec(event.globalPos())
+            
+        except Exception as e:
+            print(f"Error showing node menu: {e}")
+    
+    def detect_shots(self, widget):
+        """Start detecting the shots of a node's clip in the background."""
+        job = SceneDetectJob(widget, self)
+        job.shots_detected.connect(self.split_into_shots)
+        job.failed.connect(self.on_scene_detect_failed)
+        self.scene_jobs[widget] = job
+        job.start()
+    
+    def on_scene_detect_failed(self, widget, message):
+        self.scene_jobs.pop(widget, None)
+        print(f"Error detecting shots in {widget.video_node.video_path}: {message}")
+    
+    def split_into_shots(self, widget, shots):
+        """Add one node per detected shot in a row below the analysed node."""
+        try:
+            self.scene_jobs.pop(widget, None)
+            if widget.scene() is not self.scene or len(shots) < 2:
+                return
+            
+            origin = widget.pos()
+            for index, (start, end) in enumerate(shots):
+                pos = QPointF(origin.x() + index * (widget.width + 50), origin.y() + widget.height + 50)
+                shot_widget = self.add_video_node(widget.video_node.video_path, pos)
+                if shot_widget is None:
+                    continue
+                shot_widget.video_node.set_time_range(start, end)
+                shot_widget.current_frame = int(start * shot_widget.video_node.fps)
+                shot_widget.controls.slider.setValue(shot_widget.current_frame)
+            
+        except Exception as e:
+            print(f"Error splitting into shots: {e}")
+    
     def wheelEvent(self, event):
         """Handle mouse wheel events for zooming."""
         if event.modifiers() == Qt.KeyboardModifier.ControlModifier:
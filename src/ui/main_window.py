@@ -1,20 +1,61 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QDockWidget, QPushButton, QToolBar, QLabel, QMessageBox,
-    QSplitter, QFileDialog, QMenuBar, QMenu
+    QSplitter, QFileDialog, QMenuBar, QMenu, QApplication
 )
-from PyQt6.QtCore import Qt, QTimer, QPointF
-from PyQt6.QtGui import QIcon, QAction
+from PyQt6.QtCore import Qt, QTimer, QPointF, QFileSystemWatcher
+from PyQt6.QtGui import QIcon, QAction, QKeySequence
 import os
 from pathlib import Path
 
 from .canvas import VideoCanvas
 from .timeline import Timeline
+from .node_palette import NodePalette
+from .quiver_loader import QuiverLoader
+from .similarity_indexer import SimilarityIndexer
+from .sequence_viewer import SequenceViewer
+from .preview_decoder import shutdown_preview_decoder
 from ..core.video_node import VideoNode
+from ..core.image_sequence import ImageSequenceNode
+from ..core.quiver import scan_quiver_stats
+from ..core.quiver_index import QuiverIndex
+from ..core.audio import export_audio
+from ..core.cache import cache_dir
+from ..core.journal import Journal
+from ..core.frame_cache import close_preview_frame_cache
 
 class MainWindow(QMainWindow):
+    QUIVER_BATCH_SIZE = 50  # Placeholder nodes inserted per event loop turn
+    POSTER_WIDTH = 180      # Preview area of a VideoNodeWidget
+    POSTER_HEIGHT = 110
+    
     def __init__(self):
         super().__init__()
+        self.quiver_loader = None
+        self.quiver_index = None  # Persistent QuiverIndex, loaded on first sync
+        self.quiver_state = {}    # path -> (size, mtime_ns) from the last scan
+        self.quiver_widgets = {}  # path -> VideoNodeWidget
+        self.quiver_filled = set()  # Paths whose nodes show probe results
+        self.quiver_queue = []    # (path, needs_probe) waiting to be inserted
+        self.quiver_queue_pos = 0
+        self.quiver_slots = 0     # Grid slots handed out to quiver nodes
+        
+        # Re-sync the quiver shortly after its directories change
+        self.quiver_watcher = QFileSystemWatcher(self)
+        self.quiver_refresh_timer = QTimer(self)
+        self.quiver_refresh_timer.setSingleShot(True)
+        self.quiver_refresh_timer.setInterval(500)
+        self.quiver_refresh_timer.timeout.connect(self.load_quiver_videos)
+        self.quiver_watcher.directoryChanged.connect(self.quiver_refresh_timer.start)
+        
+        # Batch index writes while probes are streaming in
+        self.index_save_timer = QTimer(self)
+        self.index_save_timer.setSingleShot(True)
+        self.index_save_timer.setInterval(2000)
+        self.index_save_timer.timeout.connect(self.save_quiver_index)
+        
+        # Perceptual hashes of quiver frames for similar-shot lookup
+        self.similarity_indexer = SimilarityIndexer(parent=self)
         self.setWindowTitle("WeaveClip")
         self.setMinimumSize(1200, 800)
         
@@ -33,6 +74,7 @@ class MainWindow(QMainWindow):
         
         # Create timeline
         self.timeline = Timeline()
+        self.timeline.frame_source = self.canvas.source_frame
         splitter.addWidget(self.timeline)
         
         # Set initial splitter sizes
@@ -89,9 +131,28 @@ class MainWindow(QMainWindow):
         
         # Connect signals
         self.canvas.scene.changed.connect(self.update_timeline)
+        self.canvas.similar_requested.connect(self.find_similar_clips)
         
         # Set up node palette
         self.setup_node_palette()
+        self.setup_sequence_viewer()
+        
+        # Restore a crashed session, then start autosaving
+        self.recovery_loader = None
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(1000)  # Snapshots are taken once edits pause
+        self.journal = Journal(cache_dir('autosave'), snapshot_provider=self.canvas.to_project)
+        if not self.journal.acquire():
+            print("Another WeaveClip window is autosaving; this one is not autosaved")
+            self.journal = None
+        elif not self.recover_autosave():
+            self.journal.release()
+            self.journal = None
+        else:
+            self.journal.start()
+            self.canvas.journal = self.journal
+            self.autosave_timer.timeout.connect(self.journal.compact_if_due)
+            self.autosave_timer.start()
         
         # Load videos from quiver
         self.load_quiver_videos()
@@ -108,17 +169,63 @@ class MainWindow(QMainWindow):
         add_video_action.triggered.connect(self.add_video)
         file_menu.addAction(add_video_action)
         
+        # Add a still image
+        add_image_action = QAction("Add Image...", self)
+        add_image_action.triggered.connect(self.add_image)
+        file_menu.addAction(add_image_action)
+        
+        # Add a numbered image sequence
+        add_sequence_action = QAction("Add Image Sequence...", self)
+        add_sequence_action.triggered.connect(self.add_image_sequence)
+        file_menu.addAction(add_sequence_action)
+        
         # Add refresh quiver action
         refresh_action = QAction("Refresh Quiver", self)
         refresh_action.triggered.connect(self.load_quiver_videos)
         file_menu.addAction(refresh_action)
         
+        # Export the mixed timeline audio
+        export_audio_action = QAction("Export Audio...", self)
+        export_audio_action.triggered.connect(self.export_timeline_audio)
+        file_menu.addAction(export_audio_action)
+        
         file_menu.addSeparator()
         
         # Exit action
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
+        
+        # Edit menu
+        edit_menu = menubar.addMenu("Edit")
+        
+        self.undo_action = QAction("Undo", self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.triggered.connect(self.canvas.history.undo)
+        edit_menu.addAction(self.undo_action)
+        
+        self.redo_action = QAction("Redo", self)
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        self.redo_action.triggered.connect(self.canvas.history.redo)
+        edit_menu.addAction(self.redo_action)
+        
+        self.canvas.history.listeners.append(self.update_undo_actions)
+        self.update_undo_actions()
+        
+        # Timeline menu
+        timeline_menu = menubar.addMenu("Timeline")
+        
+        play_action = QAction("Play Sequence", self)
+        play_action.triggered.connect(self.play_sequence)
+        timeline_menu.addAction(play_action)
+    
+    def update_undo_actions(self):
+        """Enable and label Undo/Redo from the canvas history."""
+        history = self.canvas.history
+        self.undo_action.setEnabled(history.can_undo())
+        self.undo_action.setText(f"Undo {history.undo_label()}".strip())
+        self.redo_action.setEnabled(history.can_redo())
+        self.redo_action.setText(f"Redo {history.redo_label()}".strip())
     
     def add_video(self):
         """Add a video file to the canvas."""
@@ -147,6 +254,35 @@ class MainWindow(QMainWindow):
             print(f"Error adding video: {e}")
             QMessageBox.warning(self, "Error", f"Error adding video: {str(e)}")
     
+    def add_image(self):
+        """Add a still image to the canvas."""
+        try:
+            self.canvas.choose_image(self.canvas.mapToScene(self.canvas.viewport().rect().center()))
+        except Exception as e:
+            print(f"Error adding image: {e}")
+            QMessageBox.warning(self, "Error", f"Error adding image: {str(e)}")
+    
+    def add_image_sequence(self):
+        """Add the numbered image sequence of a picked frame to the canvas."""
+        try:
+            self.canvas.choose_image(self.canvas.mapToScene(self.canvas.viewport().rect().center()),
+                                     sequence=True)
+        except Exception as e:
+            print(f"Error adding image sequence: {e}")
+            QMessageBox.warning(self, "Error", f"Error adding image sequence: {str(e)}")
+    
+    def export_timeline_audio(self):
+        """Mix the audio of all timeline clips into a WAV file."""
+        try:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Audio", "", "WAV files (*.wav)")
+            if not path:
+                return
+            export_audio(self.timeline.audio_clips(), path, self.timeline.duration())
+            
+        except Exception as e:
+            print(f"Error exporting audio: {e}")
+            QMessageBox.warning(self, "Error", f"Error exporting audio: {str(e)}")
+    
     def update_timeline(self):
         """Update the timeline with current canvas connections."""
         try:
@@ -164,55 +300,288 @@ class MainWindow(QMainWindow):
         palette_dock = QDockWidget("Node Palette", self)
         palette_dock.setFeatures(QDockWidget.DockWidgetFeature.DockWidgetMovable |
                                QDockWidget.DockWidgetFeature.DockWidgetFloatable)
+        palette_dock.setWidget(NodePalette())
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, palette_dock)
     
+    def setup_sequence_viewer(self):
+        """Set up the (initially hidden) sequence playback dock."""
+        self.sequence_viewer = SequenceViewer(self.timeline)
+        self.viewer_dock = QDockWidget("Sequence", self)
+        self.viewer_dock.setWidget(self.sequence_viewer)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.viewer_dock)
+        self.viewer_dock.hide()
+    
+    def play_sequence(self):
+        """Show the sequence viewer and play the timeline from its playhead."""
+        self.viewer_dock.show()
+        self.sequence_viewer.play()
+    
+    def quiver_directory(self):
+        """Path of the quiver directory next to the source tree."""
+        return Path(__file__).parent.parent.parent / 'quiver'
+    
     def load_quiver_videos(self):
-        """Load all videos from the quiver directory."""
+        """Sync the canvas with the quiver directory.
+        
+        The directory is scanned with stat calls only and compared against the
+        persistent quiver index. Unchanged files are restored from the index
+        without opening them, only added and changed files are probed on the
+        worker pool, and nodes of removed files are taken off the canvas.
+        Placeholder nodes are inserted in small batches so the canvas stays
+        responsive.
+        """
         try:
+            self.cancel_quiver_import()
+            
             # Get quiver directory path
-            quiver_dir = Path(__file__).parent.parent.parent / 'quiver'
+            quiver_dir = self.quiver_directory()
             if not quiver_dir.exists():
                 print(f"Quiver directory not found: {quiver_dir}")
                 return
             
-            # Find all video files
-            video_files = []
-            for ext in ['.mp4', '.avi', '.mov', '.mkv']:
-                video_files.extend(quiver_dir.glob(f'**/*{ext}'))
+            if self.quiver_index is None:
+                self.quiver_index = QuiverIndex(quiver_dir)
+                self.quiver_index.load()
+            
+            # Find all video files and compare them with the index
+            self.quiver_state = scan_quiver_stats(quiver_dir)
+            self.watch_quiver(quiver_dir)
+            added, removed, changed, unchanged = self.quiver_index.diff(self.quiver_state)
             
-            if not video_files:
+            if not self.quiver_state:
                 print("No video files found in quiver directory")
-                return
             
-            # Clear existing nodes
-            self.canvas.scene.clear()
+            for video_path in removed:
+                self.quiver_index.remove(video_path)
+                self.quiver_filled.discard(video_path)
+                widget = self.quiver_widgets.pop(video_path, None)
+                if widget is not None:
+                    self.canvas.remove_video_node(widget)
             
-            # Add each video as a node
-            spacing = 250  # Horizontal spacing between nodes
-            x = 50  # Starting x position
-            y = 50  # Starting y position
+            for video_path in changed:
+                self.quiver_filled.discard(video_path)
+                self.similarity_indexer.reindex(video_path)
+            self.similarity_indexer.sync(self.quiver_state)
             
-            for video_path in video_files:
-                # Create node at position
-                pos = QPointF(x, y)
-                self.canvas.add_video_node(str(video_path), pos)
-                
-                # Update position for next node
-                x += spacing
-                
-                # Move to next row if too wide
-                if x > 800:
-                    x = 50
-                    y += 300
+            restore = [p for p in unchanged if p not in self.quiver_filled]
+            probe = added + changed
+            if not restore and not probe:
+                self.quiver_index.save()
+                return
             
-            # Update timeline
-            self.update_timeline()
+            self.quiver_loader = QuiverLoader(self.POSTER_WIDTH, self.POSTER_HEIGHT, parent=self)
+            self.quiver_loader.media_loaded.connect(self.on_quiver_media_loaded)
+            self.quiver_loader.finished.connect(self.update_timeline)
+            self.quiver_queue = [(p, False) for p in restore] + [(p, True) for p in probe]
+            self.quiver_queue_pos = 0
+            self.insert_quiver_batch()
             
         except Exception as e:
             print(f"Error loading quiver videos: {e}")
             QMessageBox.warning(self, "Error", f"Error loading quiver videos: {str(e)}")
     
+    def watch_quiver(self, quiver_dir):
+        """Watch the quiver directories so added or removed files trigger a sync."""
+        directories = {str(quiver_dir)}
+        for video_path in self.quiver_state:
+            directory = os.path.dirname(video_path)
+            while directory not in directories and directory.startswith(str(quiver_dir)):
+                directories.add(directory)
+                directory = os.path.dirname(directory)
+        
+        watched = set(self.quiver_watcher.directories())
+        stale = watched - directories
+        if stale:
+            self.quiver_watcher.removePaths(list(stale))
+        new = directories - watched
+        if new:
+            self.quiver_watcher.addPaths(sorted(new))
+    
+    def quiver_position(self, index):
+        """Grid position of the n-th quiver node."""
+        spacing = 250  # Horizontal spacing between nodes
+        per_row = 4    # Nodes per row before wrapping (x stays within 800)
+        x = 50 + (index % per_row) * spacing
+        y = 50 + (index // per_row) * 300
+        return QPointF(x, y)
+    
+    def insert_quiver_batch(self):
+        """Insert the next batch of nodes; restore them from the index or queue them for probing."""
+        if self.quiver_loader is None:
+            return
+        
+        batch = self.quiver_queue[self.quiver_queue_pos:self.quiver_queue_pos + self.QUIVER_BATCH_SIZE]
+        self.quiver_queue_pos += len(batch)
+        to_probe = []
+        with self.canvas.batched_edits():
+            for video_path, needs_probe in batch:
+                widget = self.quiver_widgets.get(video_path)
+                if widget is None or widget.scene() is not self.canvas.scene:
+                    pos = self.quiver_position(self.quiver_slots)
+                    self.quiver_slots += 1
+                    widget = self.canvas.add_video_node(video_path, pos, placeholder=True)
+                    if widget is None:
+                        continue
+                    self.quiver_widgets[video_path] = widget
+                
+                info = None if needs_probe else self.quiver_index.media_info(video_path)
+                if info is None:
+                    to_probe.append(video_path)
+                else:
+                    widget.apply_media_info(info)
+                    self.quiver_filled.add(video_path)
+        
+        self.quiver_loader.submit(to_probe)
+        
+        # Yield to the event loop between batches
+        if self.quiver_queue_pos < len(self.quiver_queue):
+            QTimer.singleShot(0, self.insert_quiver_batch)
+    
+    def on_quiver_media_loaded(self, video_path, info):
+        """Record a finished probe in the index and fill in its node."""
+        if self.sender() is not self.quiver_loader:
+            return  # Result from a cancelled import
+        
+        stat = self.quiver_state.get(video_path)
+        if stat is not None:
+            self.quiver_index.update(video_path, stat[0], stat[1], info)
+            self.index_save_timer.start()
+        
+        widget = self.quiver_widgets.get(video_path)
+        if widget is not None and widget.scene() is self.canvas.scene:
+            widget.apply_media_info(info)
+            self.quiver_filled.add(video_path)
+    
+    def save_quiver_index(self):
+        """Persist the quiver index."""
+        try:
+            if self.quiver_index is not None:
+                self.quiver_index.save()
+        except Exception as e:
+            print(f"Error saving quiver index: {e}")
+    
+    def cancel_quiver_import(self):
+        """Stop any quiver import still in progress."""
+        if self.quiver_loader is not None:
+            self.quiver_loader.cancel()
+            self.quiver_loader.deleteLater()
+            self.quiver_loader = None
+        self.quiver_queue = []
+        self.quiver_queue_pos = 0
+    
+    def find_similar_clips(self, widget):
+        """Select the quiver nodes sharing frames with a node."""
+        try:
+            video_path = widget.video_node.video_path
+            if video_path not in self.similarity_indexer.index:
+                self.statusBar().showMessage("Frames of this clip are still being indexed", 5000)
+                return
+            
+            results = self.similarity_indexer.similar_clips(widget.video_node)
+            self.canvas.scene.clearSelection()
+            for path, count, distance in results:
+                other = self.quiver_widgets.get(path)
+                if other is not None:
+                    other.setSelected(True)
+            if results and results[0][0] in self.quiver_widgets:
+                self.canvas.centerOn(self.quiver_widgets[results[0][0]])
+            
+            names = ", ".join(os.path.basename(path) for path, count, distance in results[:3])
+            message = f"{len(results)} similar clips: {names}" if results else "No similar clips found"
+            self.statusBar().showMessage(message, 5000)
+            
+        except Exception as e:
+            print(f"Error finding similar clips: {e}")
+    
+    def recover_autosave(self):
+        """Offer to restore the canvas left by a session that did not exit cleanly.
+        
+        Returns False when a crashed session's autosave must be kept for
+        later because nobody can be asked about it (e.g. offscreen runs).
+        """
+        try:
+            snapshot, records = self.journal.recover()
+            if snapshot is None and not records:
+                return True
+            if QApplication.platformName() in ('offscreen', 'minimal'):
+                print("Not interactive; leaving the previous session's autosave for later")
+                return False
+            
+            answer = QMessageBox.question(
+                self, "Recover Session",
+                "WeaveClip did not exit cleanly. Restore the previous canvas?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                self.journal.discard()
+                return True
+            
+            if snapshot is not None:
+                self.canvas.load_project(snapshot)
+            for record in records:
+                self.canvas.apply_record(record)
+            self.canvas.history.clear()
+            
+            # Quiver nodes are filled in by the quiver sync; probe the rest here
+            quiver_dir = str(self.quiver_directory())
+            others = set()
+            for widget in self.canvas.node_widgets.values():
+                video_path = widget.video_node.video_path
+                if isinstance(widget.video_node, ImageSequenceNode):
+                    # Indexing a sequence is cheap, so image nodes are filled in directly
+                    if not widget.video_node.error:
+                        widget.video_node.load_video_info()
+                    widget.load_preview()
+                elif video_path.startswith(quiver_dir) and video_path not in self.quiver_widgets:
+                    self.quiver_widgets[video_path] = widget
+                else:
+                    others.add(video_path)
+            self.quiver_slots = len(self.quiver_widgets)
+            if others:
+                self.recovery_loader = QuiverLoader(self.POSTER_WIDTH, self.POSTER_HEIGHT, parent=self)
+                self.recovery_loader.media_loaded.connect(self.on_recovered_media_loaded)
+                self.recovery_loader.submit(sorted(others))
+            
+            # The restored canvas is the new baseline
+            self.journal.compact(self.canvas.to_project())
+            self.update_timeline()
+            
+        except Exception as e:
+            print(f"Error recovering autosave: {e}")
+        return True
+    
+    def on_recovered_media_loaded(self, video_path, info):
+        """Fill in restored nodes that are not quiver nodes."""
+        quiver_widget = self.quiver_widgets.get(video_path)
+        for widget in list(self.canvas.node_widgets.values()):
+            if widget.video_node.video_path == video_path and widget is not quiver_widget:
+                widget.apply_media_info(info)
+    
+    def closeEvent(self, event):
+        """Stop background work before closing."""
+        self.cancel_quiver_import()
+        if self.recovery_loader is not None:
+            self.recovery_loader.cancel()
+        self.autosave_timer.stop()
+        if self.journal is not None:
+            self.canvas.journal = None
+            self.journal.close()
+            self.journal.discard()  # A clean exit leaves nothing to recover
+            self.journal.release()
+            self.journal = None
+        self.save_quiver_index()
+        self.timeline.content.waveforms.shutdown()
+        self.timeline.content.thumbnails.shutdown()
+        self.sequence_viewer.stop()
+        shutdown_preview_decoder()
+        close_preview_frame_cache()
+        self.similarity_indexer.shutdown()
+        super().closeEvent(event)
+    
     def new_project(self):
         """Create a new project."""
-        self.canvas.scene.clear()
+        self.cancel_quiver_import()
+        self.canvas.clear_nodes()
+        self.quiver_widgets = {}
+        self.quiver_filled = set()
+        self.quiver_slots = 0
         self.update_timeline()
@@ -5,6 +5,10 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QMimeData
 from PyQt6.QtGui import QIcon, QDrag
 
+# Drag payload naming a palette node as "<category>/<name>"; plain text
+# alone is ambiguous since e.g. "Fade" exists as a transition and in audio
+NODE_MIME_TYPE = 'application/x-weaveclip-node'
+
 class NodePalette(QWidget):
     def __init__(self):
         super().__init__()
@@ -49,6 +53,7 @@ class NodeCategory(QFrame):
         """)
         
         layout = QVBoxLayout(self)
+        self.name = name
         
         # Add header
         header = QLabel(name)
@@ -59,6 +64,7 @@ class NodeCategory(QFrame):
         if name == "Media":
             self.add_node(layout, "Video Clip")
             self.add_node(layout, "Image")
+            self.add_node(layout, "Image Sequence")
             self.add_node(layout, "Audio File")
         elif name == "Transitions":
             self.add_node(layout, "Cut")
@@ -74,12 +80,13 @@ class NodeCategory(QFrame):
             self.add_node(layout, "Fade")
     
     def add_node(self, layout, name):
-        node = NodeButton(name)
+        node = NodeButton(name, self.name)
         layout.addWidget(node)
 
 class NodeButton(QPushButton):
-    def __init__(self, name):
+    def __init__(self, name, category=None):
         super().__init__(name)
+        self.category = category
         self.setStyleSheet("""
             QPushButton {
                 background-color: #3a3a3a;
@@ -100,6 +107,8 @@ class NodeButton(QPushButton):
             drag = QDrag(self)
             mime_data = QMimeData()
             mime_data.setText(self.text())
+            if self.category:
+                mime_data.setData(NODE_MIME_TYPE, f"{self.category}/{self.text()}".encode())
             drag.setMimeData(mime_data)
             
             # Start drag operation
@@ -117,7 +126,7 @@ class NodePaletteList(QListWidget):
         """Add available node types to the palette."""
         nodes = [
             "Video Clip",
-            "Image",  # TODO: Implement image support
+            "Image",
             "Text",   # TODO: Implement text support
             "Audio"   # TODO: Implement audio support
         ]
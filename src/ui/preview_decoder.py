@@ -0,0 +1,100 @@
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..core.decode_service import DecodeService
+
+SLOT_BYTES = 320 * 240 * 3  # Room for any node preview frame
+SLOTS = 64
+
+_decoder = None
+_decoder_failed = False
+
+
+class PreviewDecoder(QObject):
+    """Delivers frames from the multi-process DecodeService to widgets.
+
+    A collector thread waits on the service's results and forwards slot
+    numbers to the GUI thread, where the stream's handler is called with
+    ``(frame_number, frame, slot)``. ``frame`` wraps shared memory and is
+    None when decoding failed; the handler owns the slot until it calls
+    ``release``.
+    """
+
+    frame_decoded = pyqtSignal(int, int, int)  # stream, frame number, slot (-1 on failure)
+
+    def __init__(self, slot_bytes: int = SLOT_BYTES, slots: int = SLOTS, parent=None):
+        super().__init__(parent)
+        self.service = DecodeService(slot_bytes, slots)
+        self.handlers = {}  # stream -> callback
+        self.stop_event = threading.Event()
+        self.frame_decoded.connect(self.on_frame_decoded)
+        self.collector = threading.Thread(target=self._collect, name="preview-decoder", daemon=True)
+        self.collector.start()
+
+    def _collect(self):
+        """Worker: forward decoded frames to the GUI thread."""
+        while not self.stop_event.is_set():
+            try:
+                result = self.service.next_result(timeout=0.1)
+            except (OSError, ValueError, EOFError):
+                return
+            if result is not None:
+                stream, frame_number, slot = result
+                self.frame_decoded.emit(stream, frame_number, -1 if slot is None else slot)
+
+    def open(self, video_path: str, width: int, height: int, fps: float, handler) -> int:
+        stream = self.service.open(video_path, width, height, fps)
+        self.handlers[stream] = handler
+        return stream
+
+    def request(self, stream: int, frame_number: int) -> bool:
+        return self.service.request(stream, frame_number)
+
+    def release(self, slot: int):
+        self.service.release(slot)
+
+    def close_stream(self, stream: int):
+        self.handlers.pop(stream, None)
+        self.service.close_stream(stream)
+
+    def on_frame_decoded(self, stream, frame_number, slot):
+        handler = self.handlers.get(stream)
+        if handler is None:
+            # The stream was closed while the frame was in flight
+            if slot >= 0:
+                self.service.release(slot)
+            return
+        frame = self.service.frame(stream, slot) if slot >= 0 else None
+        try:
+            handler(frame_number, frame, slot)
+        except Exception as e:
+            print(f"Error showing decoded frame {frame_number}: {e}")
+
+    def shutdown(self):
+        self.stop_event.set()
+        self.handlers.clear()
+        self.collector.join(timeout=1.0)
+        self.service.shutdown()
+
+
+def preview_decoder():
+    """The decoder shared by all node previews, started on first use.
+
+    Returns None when worker processes cannot be started, in which case
+    previews decode on the GUI thread as before.
+    """
+    global _decoder, _decoder_failed
+    if _decoder is None and not _decoder_failed:
+        try:
+            _decoder = PreviewDecoder()
+        except Exception as e:
+            _decoder_failed = True
+            print(f"Error starting preview decode workers: {e}")
+    return _decoder
+
+
+def shutdown_preview_decoder():
+    global _decoder
+    if _decoder is not None:
+        _decoder.shutdown()
+        _decoder = None
@@ -0,0 +1,59 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..core.quiver import probe_media
+
+
+class QuiverLoader(QObject):
+    """Probes media files and extracts poster frames on a worker pool.
+
+    Results are delivered through ``media_loaded`` in the GUI thread as each
+    file finishes, so placeholder nodes can fill in progressively. A loader is
+    single-use: after ``cancel`` no further results are emitted.
+    """
+
+    media_loaded = pyqtSignal(str, object)  # path, probe info dict
+    finished = pyqtSignal()
+
+    def __init__(self, poster_width: int, poster_height: int, max_workers: int = None, parent=None):
+        super().__init__(parent)
+        self.poster_width = poster_width
+        self.poster_height = poster_height
+        self.cancelled = threading.Event()
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(8, os.cpu_count() or 1),
+            thread_name_prefix="quiver-probe"
+        )
+
+    def submit(self, paths):
+        """Queue files for probing."""
+        if self.cancelled.is_set():
+            return
+        with self.lock:
+            self.pending += len(paths)
+        for path in paths:
+            self.executor.submit(self._probe, path)
+
+    def _probe(self, path):
+        """Worker: probe one file unless the import was cancelled."""
+        try:
+            if self.cancelled.is_set():
+                return
+            info = probe_media(path, self.poster_width, self.poster_height)
+            if not self.cancelled.is_set():
+                self.media_loaded.emit(path, info)
+        finally:
+            with self.lock:
+                self.pending -= 1
+                done = self.pending == 0
+            if done and not self.cancelled.is_set():
+                self.finished.emit()
+
+    def cancel(self):
+        """Stop the import; queued files are dropped and running probes are discarded."""
+        self.cancelled.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
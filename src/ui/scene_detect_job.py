@@ -0,0 +1,40 @@
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..core.scene_detect import SceneDetector
+
+
+class SceneDetectJob(QObject):
+    """Detects the shots of one clip on a background thread.
+
+    ``shots_detected`` delivers the (start_time, end_time) list in the GUI
+    thread; nothing is emitted after ``cancel``.
+    """
+
+    shots_detected = pyqtSignal(object, object)  # node widget, shots
+    failed = pyqtSignal(object, str)  # node widget, error message
+
+    def __init__(self, node_widget, parent=None):
+        super().__init__(parent)
+        self.node_widget = node_widget
+        video_node = node_widget.video_node
+        self.detector = SceneDetector(video_node.video_path, video_node.fps, video_node.frame_count)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="scene-detect-job", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        try:
+            shots = self.detector.shots(stop_event=self.stop_event)
+        except Exception as e:
+            if not self.stop_event.is_set():
+                self.failed.emit(self.node_widget, str(e))
+            return
+        if shots is not None and not self.stop_event.is_set():
+            self.shots_detected.emit(self.node_widget, shots)
+
+    def cancel(self):
+        """Stop the analysis; partial results are discarded."""
+        self.stop_event.set()
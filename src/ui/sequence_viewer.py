@@ -0,0 +1,206 @@
+import queue
+import threading
+import numpy as np
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
+from PyQt6.QtCore import QTimer, QRectF
+from PyQt6.QtGui import QPainter, QImage, QColor
+
+from ..core.sequence_player import SequencePlayer
+from ..core.compositor import TrackCompositor
+from ..core.audio import AudioEngine
+from .audio_output import AudioOutput
+
+
+class FrameView(QWidget):
+    """Shows one RGB frame, scaled to fit with its aspect ratio kept."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(320, 180)
+        self.frame = None  # Keeps the pixels wrapped by ``image`` alive
+        self.image = None
+
+    def show_frame(self, frame: np.ndarray):
+        frame = np.ascontiguousarray(frame)
+        height, width = frame.shape[:2]
+        self.frame = frame
+        self.image = QImage(frame.data, width, height, 3 * width, QImage.Format.Format_RGB888)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#000000"))
+        if self.image is None:
+            return
+        scale = min(self.width() / self.image.width(), self.height() / self.image.height())
+        width, height = self.image.width() * scale, self.image.height() * scale
+        target = QRectF((self.width() - width) / 2, (self.height() - height) / 2, width, height)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawImage(target, self.image)
+
+
+class SequenceViewer(QWidget):
+    """Plays the timeline, all tracks composited, with its audio.
+
+    A producer thread reads frames from one SequencePlayer per sequence
+    (each pre-rolls its next clip), composites them by track, opacity and
+    blend mode, and puts the result in a small queue; the GUI timer shows
+    the frame due at the audio clock, so playback never waits on a decoder
+    at a cut. While paused the frame at the playhead is rendered by the
+    timeline.
+    """
+
+    FPS = 30.0
+    MAX_SIZE = (960, 540)
+    QUEUED_FRAMES = 8
+
+    def __init__(self, timeline, parent=None):
+        super().__init__(parent)
+        self.timeline = timeline
+        self.position = 0.0  # Playhead in timeline seconds
+        self.producer = None
+        self.stop_event = threading.Event()
+        self.frames = queue.Queue(maxsize=self.QUEUED_FRAMES)
+        self.pending = None  # A dequeued frame that is not due yet
+        self.audio_output = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.view = FrameView()
+        layout.addWidget(self.view, 1)
+
+        controls = QHBoxLayout()
+        self.play_button = QPushButton("Play")
+        self.play_button.clicked.connect(self.toggle_playback)
+        controls.addWidget(self.play_button)
+        self.time_label = QLabel("0.00s")
+        controls.addWidget(self.time_label)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(500 / self.FPS))  # Twice per frame
+        self.timer.timeout.connect(self.on_tick)
+
+    @property
+    def is_playing(self) -> bool:
+        return self.timer.isActive()
+
+    def toggle_playback(self):
+        if self.is_playing:
+            self.stop()
+            self.show_still()
+        else:
+            self.play()
+
+    def show_still(self):
+        """Show the frame at the playhead while paused."""
+        if self.is_playing:
+            return
+        try:
+            self.time_label.setText(f"{self.position:.2f}s")
+            self.view.show_frame(self.timeline.render_frame(self.position, *self.MAX_SIZE))
+        except Exception as e:
+            print(f"Error rendering the frame at {self.position:.2f}s: {e}")
+
+    def play(self):
+        """Start playing from the playhead."""
+        self.stop()
+        sequences = self.timeline.snapshot()
+        if self.position >= max([sequence.duration for sequence in sequences], default=0.0):
+            self.position = 0.0
+        if not sequences:
+            return
+        try:
+            players = [SequencePlayer(sequence, self.FPS, self.MAX_SIZE, start_time=self.position)
+                       for sequence in sequences]
+            compositor = TrackCompositor(*self.MAX_SIZE)
+            self.stop_event = threading.Event()
+            self.frames = queue.Queue(maxsize=self.QUEUED_FRAMES)
+            self.pending = None
+            self.producer = threading.Thread(target=self._produce,
+                                             args=(players, compositor, self.stop_event, self.frames),
+                                             name="sequence-player", daemon=True)
+            self.producer.start()
+
+            self.audio_output = AudioOutput(AudioEngine(self.timeline.audio_clips(sequences)), parent=self)
+            self.audio_output.start(self.position)
+            self.timer.start()
+            self.play_button.setText("Pause")
+        except Exception as e:
+            print(f"Error starting sequence playback: {e}")
+            self.stop()
+
+    def _produce(self, players, compositor, stop_event, frames):
+        """Worker: composite the sequences' frames in order until the end or until stopped."""
+        try:
+            while not stop_event.is_set():
+                item = None
+                layers = []
+                for player in list(players):
+                    read = player.read()
+                    if read is None:
+                        # This sequence has ended; the others play on
+                        player.close()
+                        players.remove(player)
+                        continue
+                    time_pos, node, frame = read
+                    layers.append((node, frame))
+                if players:
+                    item = (time_pos, compositor.composite(layers).copy())
+                while not stop_event.is_set():
+                    try:
+                        frames.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if item is None:
+                    return
+        except Exception as e:
+            print(f"Error reading sequence frames: {e}")
+            frames.put(None)
+        finally:
+            for player in players:
+                player.close()
+
+    def on_tick(self):
+        """Show the latest frame due at the playback clock."""
+        clock = self.audio_output.time() if self.audio_output is not None else self.position
+        shown = None
+        while True:
+            item = self.pending
+            self.pending = None
+            if item is None:
+                try:
+                    item = self.frames.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # End of the timeline
+                    self.stop()
+                    self.position = 0.0
+                    self.show_still()
+                    return
+            if item[0] > clock:
+                self.pending = item
+                break
+            shown = item
+
+        if shown is not None:
+            time_pos, frame = shown
+            self.position = time_pos
+            self.time_label.setText(f"{time_pos:.2f}s")
+            self.view.show_frame(frame)
+
+    def stop(self):
+        """Pause playback, keeping the playhead."""
+        self.timer.stop()
+        self.stop_event.set()
+        if self.producer is not None:
+            self.producer.join(timeout=2.0)
+            self.producer = None
+        if self.audio_output is not None:
+            self.audio_output.close()
+            self.audio_output = None
+        self.pending = None
+        self.play_button.setText("Play")
@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..core.phash import clip_hashes
+from ..core.hash_index import FrameHashIndex
+
+
+class SimilarityIndexer(QObject):
+    """Keeps a FrameHashIndex of the quiver up to date in the background.
+
+    Frame hashes are computed (or loaded from the cache) on a small worker
+    pool; the index itself is only touched in the GUI thread, when
+    ``clip_indexed`` is delivered.
+    """
+
+    clip_indexed = pyqtSignal(str, object)  # path, (times, hashes)
+    clip_failed = pyqtSignal(str)  # path
+
+    def __init__(self, max_workers: int = 2, parent=None):
+        super().__init__(parent)
+        self.index = FrameHashIndex()
+        self.pending = set()
+        self.stop_event = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="similarity")
+        self.clip_indexed.connect(self.on_clip_indexed)
+        self.clip_failed.connect(self.on_clip_failed)
+
+    def sync(self, paths):
+        """Index new files and drop files that are gone."""
+        paths = set(paths)
+        for path in [p for p in self.index.clips if p not in paths]:
+            self.index.remove_clip(path)
+        for path in sorted(paths):
+            if path not in self.index and path not in self.pending and not self.stop_event.is_set():
+                self.pending.add(path)
+                self.executor.submit(self._hash_clip, path)
+
+    def reindex(self, path):
+        """Hash a file again after it changed."""
+        self.index.remove_clip(path)
+        self.pending.discard(path)
+        self.sync(set(self.index.clips) | self.pending | {path})
+
+    def _hash_clip(self, path):
+        """Worker: hash one file's sampled frames."""
+        try:
+            result = clip_hashes(path, stop_event=self.stop_event)
+        except Exception as e:
+            print(f"Error hashing frames of {path}: {e}")
+            result = None
+        if self.stop_event.is_set():
+            return
+        if result is not None:
+            self.clip_indexed.emit(path, result)
+        else:
+            self.clip_failed.emit(path)
+
+    def on_clip_indexed(self, path, result):
+        if path in self.pending:
+            self.pending.discard(path)
+            self.index.add_clip(path, *result)
+
+    def on_clip_failed(self, path):
+        """Forget a file that could not be hashed, so a later sync tries again."""
+        self.pending.discard(path)
+
+    def similar_clips(self, video_node, radius: int = 8, limit: int = 10):
+        """Clips sharing frames with a node's trimmed range."""
+        return self.index.similar_clips(video_node.video_path, video_node.start_time,
+                                        video_node.end_time, radius, limit)
+
+    def shutdown(self):
+        self.stop_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
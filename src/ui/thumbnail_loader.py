@@ -0,0 +1,84 @@
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from ..core.thumbnails import ThumbnailPyramid
+
+
+class ThumbnailLoader(QObject):
+    """Provides filmstrip thumbnail pyramids for timeline clips, building them in the background.
+
+    ``get`` returns the pyramid as far as it is built (or None before its
+    atlas exists) and schedules the missing thumbnails; ``thumbnails_ready``
+    is emitted as levels fill in so the timeline can repaint. Painting only
+    reads the memory-mapped atlas and never waits for a decoder.
+    """
+
+    thumbnails_ready = pyqtSignal(str)  # media path
+    MAX_IMAGES = 4096  # QImages kept for drawing before the cache is cleared
+
+    def __init__(self, max_workers: int = 2, parent=None):
+        super().__init__(parent)
+        self.pyramids = {}  # path -> ThumbnailPyramid, or None while it is being created
+        self.images = {}    # (path, slot, effects key) -> QImage
+        self.stop_event = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="thumbnails")
+
+    def get(self, node):
+        """Get the pyramid for a clip's source, or None if it is not available yet."""
+        path = node.video_path
+        if path in self.pyramids:
+            return self.pyramids[path]
+        self.pyramids[path] = None
+        if node.width and node.height and not self.stop_event.is_set():
+            self.executor.submit(self._build, path, node.duration, node.width, node.height)
+        return None
+
+    @staticmethod
+    def effects_key(node):
+        """Hashable state of a node's effect chain, or None when it has no effects."""
+        if not node.effects:
+            return None
+        return (node.id,) + tuple(repr(effect.to_dict()) for effect in node.effects)
+
+    def image(self, pyramid, slot, node=None, effects_key=None, time_pos=0.0):
+        """QImage of one thumbnail, copied out of the atlas once.
+
+        With an ``effects_key`` (see ``effects_key``) the node's effects are
+        run on the thumbnail at clip time ``time_pos``; the result is cached
+        per node and effects state, so editing an effect redraws it.
+        """
+        key = (pyramid.media_path, slot, effects_key)
+        image = self.images.get(key)
+        if image is None:
+            if len(self.images) >= self.MAX_IMAGES:
+                self.images.clear()
+            pixels = pyramid.atlas[slot]
+            if effects_key is not None:
+                pixels = node.apply_effects(np.array(pixels), time_pos)
+            pixels = np.ascontiguousarray(pixels)
+            height, width = pixels.shape[:2]
+            image = QImage(pixels.tobytes(), width, height, 3 * width, QImage.Format.Format_RGB888).copy()
+            self.images[key] = image
+        return image
+
+    def _build(self, path, duration, width, height):
+        """Worker: open or create a clip's atlas and decode what is missing."""
+        try:
+            pyramid = ThumbnailPyramid.create(path, duration, width, height)
+            if self.stop_event.is_set():
+                return
+            self.pyramids[path] = pyramid
+            self.thumbnails_ready.emit(path)
+            if not pyramid.complete:
+                pyramid.build(self.stop_event, lambda: self.thumbnails_ready.emit(path))
+        except Exception as e:
+            print(f"Error building thumbnails of {path}: {e}")
+
+    def shutdown(self):
+        """Stop any running decoding."""
+        self.stop_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,14 +1,21 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QScrollArea, QFrame,
     QGraphicsView, QGraphicsScene, QGraphicsItem,
-    QLabel, QHBoxLayout
+    QLabel, QHBoxLayout, QMenu
 )
-from PyQt6.QtCore import Qt, QRectF, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, QRectF, QLineF, pyqtSignal, QSize
 from PyQt6.QtGui import QPainter, QPen, QColor, QBrush
 import cv2
 import numpy as np
 import os
 
+from ..core.compositor import BLEND_MODES, TrackCompositor
+from ..core.audio import AudioClip
+from ..core.interval_index import IntervalIndex
+from ..core.sequence import ClipSequence
+from .waveform_loader import WaveformLoader
+from .thumbnail_loader import ThumbnailLoader
+
 class Timeline(QWidget):
     clip_selected = pyqtSignal(str)  # Emitted when a clip is selected
     
@@ -16,8 +23,13 @@ class Timeline(QWidget):
         super().__init__(parent)
         self.setMinimumHeight(200)
         self.clips = []  # List of (node, start_time) tuples
+        self.sequences = []  # One ClipSequence per chain of connected clips
+        self.chains = []  # The nodes of each sequence, in order
+        self.locations = {}  # node -> (sequence number, position in it)
         self.current_time = 0
         self.scale_factor = 100  # pixels per second
+        self.compositor = None  # TrackCompositor, created for the requested output size
+        self.frame_source = None  # Callable (node, local time, render scale) -> frame for render_frame
         
         # Set up the layout
         layout = QVBoxLayout(self)
@@ -27,7 +39,7 @@ class Timeline(QWidget):
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
         # Create content widget
         self.content = TimelineContent()
@@ -56,71 +68,271 @@ class Timeline(QWidget):
         """)
     
     def update_clips(self, connections):
-        """Update timeline with connected clips."""
+        """Update timeline with connected clips.
+        
+        When the chains of clips are unchanged only the clips whose timing
+        differs are updated in place; other changes rebuild the sequences.
+        """
         try:
-            # Clear current clips
-            self.clips = []
-            
-            if not connections:
-                self.content.update_clips([])
-                return
-            
-            # Process connections to build timeline
-            processed_nodes = set()
-            
-            def process_node(node, start_time):
-                """Process a node and its connections recursively."""
-                if node in processed_nodes:
-                    return
-                processed_nodes.add(node)
-                
-                # Add clip to timeline
-                self.clips.append((node, start_time))
-                
-                # Calculate next start time based on current clip duration
-                next_start = start_time + node.duration
-                
-                # Process next node if it exists
-                if node.next_node:
-                    process_node(node.next_node, next_start)
-            
             # Find root nodes (nodes with no incoming connections)
-            root_nodes = set()
-            for start_node, end_node in connections:
-                # Add all start nodes as potential roots
-                root_nodes.add(start_node)
-                # Remove any end nodes from roots
-                root_nodes.discard(end_node)
+            targets = {end_node for start_node, end_node in connections}
+            root_nodes = dict.fromkeys(start_node for start_node, end_node in connections
+                                       if start_node not in targets)
             
-            # Process each root node
-            for root in root_nodes:
-                process_node(root, 0)
+            # Each root starts a sequence at time 0; a clip is placed only once
+            visited = set()
+            timings = [self.chain_timing(root, visited) for root in root_nodes]
+            chains = [[node for node, advance, duration in timing] for timing in timings]
+            if chains == self.chains:
+                changed = False
+                for number, timing in enumerate(timings):
+                    for index, (node, advance, duration) in enumerate(timing):
+                        item, start, old_advance, old_duration = self.sequences[number].entry(index)
+                        if (advance, duration) != (old_advance, old_duration):
+                            self.sequences[number] = self.sequences[number].update(index, advance, duration)
+                            changed = True
+                if changed:
+                    self.refresh()
+                return
             
-            # Update timeline content
-            self.content.update_clips(self.clips)
+            self.sequences = [ClipSequence.from_items(timing) for timing in timings]
+            self.refresh()
             
         except Exception as e:
             print(f"Error updating timeline clips: {e}")
-            
+    
+    def refresh(self):
+        """Recompute clip placements from the sequences and redraw."""
+        self.clips = [clip for sequence in self.sequences for clip in sequence]
+        self.chains = [[node for node, start_time in sequence] for sequence in self.sequences]
+        self.locations = {node: (number, index) for number, chain in enumerate(self.chains)
+                          for index, node in enumerate(chain)}
+        self.content.update_clips(self.clips)
+    
+    def clip_changed(self, node):
+        """Ripple a clip's new duration or transition through its sequence.
+        
+        The clip before it is updated too, since its transition overlap
+        depends on this clip's duration.
+        """
+        try:
+            location = self.locations.get(node)
+            if location is None:
+                return
+            number, index = location
+            sequence = self.sequences[number]
+            for position in range(max(0, index - 1), index + 1):
+                item = self.chains[number][position]
+                sequence = sequence.update(position, *self.clip_timing(item))
+            self.sequences[number] = sequence
+            self.refresh()
+        except Exception as e:
+            print(f"Error updating timeline clip: {e}")
+    
+    def link(self, source, target):
+        """Append the sequence starting at ``target`` to the one ending at ``source``.
+        
+        Any other change of the chains falls back to a rebuild on the next
+        ``update_clips``.
+        """
+        try:
+            if source not in self.locations or target not in self.locations:
+                return
+            number, index = self.locations[source]
+            target_number, target_index = self.locations[target]
+            if (number == target_number or target_index != 0
+                    or index != len(self.chains[number]) - 1):
+                return
+            sequence = self.sequences[number].update(index, *self.clip_timing(source))
+            for node, start_time in self.sequences[target_number]:
+                advance, duration = self.clip_timing(node)
+                sequence = sequence.insert(len(sequence), node, advance, duration)
+            self.sequences[number] = sequence
+            del self.sequences[target_number]
+            self.refresh()
+        except Exception as e:
+            print(f"Error linking timeline clips: {e}")
+    
+    def unlink(self, source, target):
+        """Split the sequence between ``source`` and ``target``; ``target`` starts a new one."""
+        try:
+            if source not in self.locations or target not in self.locations:
+                return
+            number, index = self.locations[source]
+            if self.locations[target] != (number, index + 1):
+                return
+            sequence = self.sequences[number]
+            detached = self.chains[number][index + 1:]
+            for node in detached:
+                sequence = sequence.delete(index + 1)
+            self.sequences[number] = sequence.update(index, *self.clip_timing(source))
+            self.sequences.append(ClipSequence.from_items(
+                (node,) + self.clip_timing(node) for node in detached))
+            self.refresh()
+        except Exception as e:
+            print(f"Error unlinking timeline clips: {e}")
+    
+    @staticmethod
+    def clip_timing(node):
+        """(advance, duration) of a clip given its current next clip.
+        
+        A clip advances the timeline by its duration less the overlap of
+        its outgoing transition.
+        """
+        duration = node.get_duration()
+        advance = duration
+        if node.next_node is not None and node.transition_out:
+            advance -= node.transition_out.overlap(duration, node.next_node.get_duration())
+        return advance, duration
+    
+    @classmethod
+    def chain_timing(cls, root, visited):
+        """(node, advance, duration) along a chain of next_node links not yet visited."""
+        timing = []
+        node = root
+        while node is not None and node not in visited:
+            visited.add(node)
+            timing.append((node,) + cls.clip_timing(node))
+            node = node.next_node
+        return timing
+    
+    def clip_at_time(self, time_pos, sequence=0):
+        """(node, local time, source frame) of a sequence's clip at a timeline time, or None."""
+        if sequence >= len(self.sequences):
+            return None
+        found = self.sequences[sequence].find(time_pos)
+        if found is None:
+            return None
+        index, node, start_time = found
+        local_time = time_pos - start_time
+        return node, local_time, node.source_frame_index(local_time)
+    
+    def snapshot(self):
+        """The current sequences, unaffected by later edits, for a renderer."""
+        return tuple(self.sequences)
+    
+    def render_frame(self, time_pos, width, height):
+        """Composite all tracks at a timeline time into a reused RGB frame."""
+        if (self.compositor is None or
+                (self.compositor.compositor.width, self.compositor.compositor.height) != (width, height)):
+            self.compositor = TrackCompositor(width, height, self.frame_source)
+        return self.compositor.render(self.sequences, time_pos)
+
+    def audio_clips(self, sequences=None):
+        """The audio of the clips of ``sequences`` (by default every timeline clip), for playback or export."""
+        if sequences is None:
+            sequences = self.sequences
+        return [AudioClip.from_video_node(node, start_time)
+                for sequence in sequences for node, start_time in sequence]
+    
+    def duration(self):
+        """End time of the last clip."""
+        return max([sequence.duration for sequence in self.sequences], default=0.0)
+
 class TimelineContent(QWidget):
+    CLIP_HEIGHT = 100
+    TRACK_SPACING = 10
+    Y_OFFSET = 40  # Space for the time markers
+    WAVEFORM_HEIGHT = 36  # Band at the bottom of each clip
+    MIN_TICK_SPACING = 80  # Pixels between time markers at any zoom
+    TICK_INTERVALS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 1800, 3600)
+    
     def __init__(self):
         super().__init__()
         self.clips = []
+        self.index = IntervalIndex()  # (node, start_time) by timeline interval
+        self.clip_starts = {}  # node -> start_time
+        self.tracks = 1
         self.setMinimumHeight(180)
         self.scale_factor = 100  # pixels per second
         self.setStyleSheet("background-color: #1a1a1a;")
         
+        # Audio waveforms, analysed in the background on first use
+        self.waveforms = WaveformLoader(parent=self)
+        self.waveforms.waveform_ready.connect(self.on_waveform_ready)
+        
+        # Filmstrip thumbnails, decoded in the background coarse levels first
+        self.thumbnails = ThumbnailLoader(parent=self)
+        self.thumbnails.thumbnails_ready.connect(self.on_thumbnails_ready)
+    
+    def on_waveform_ready(self, path):
+        """Repaint once a clip's waveform has been analysed."""
+        self.update()
+    
+    def on_thumbnails_ready(self, path):
+        """Repaint as more of a clip's thumbnails become available."""
+        self.update()
+    
+    def track_count(self):
+        """Number of tracks in use (at least one), as of the last update_clips."""
+        return self.tracks
+    
+    def track_y(self, track):
+        """Top of a track's row; track 0 is drawn at the bottom."""
+        row = self.track_count() - 1 - track
+        return self.Y_OFFSET + row * (self.CLIP_HEIGHT + self.TRACK_SPACING)
+    
+    def clip_at(self, pos):
+        """Get the topmost (node, start_time) under a widget position, if any."""
+        candidates = self.index.at(pos.x() / self.scale_factor)
+        for node, start_time in sorted(candidates, key=lambda c: c[0].track, reverse=True):
+            y = self.track_y(node.track)
+            if y <= pos.y() < y + self.CLIP_HEIGHT:
+                return node, start_time
+        return None
+    
+    def tick_interval(self):
+        """Seconds between time markers, so they stay at least MIN_TICK_SPACING apart."""
+        for interval in self.TICK_INTERVALS:
+            if interval * self.scale_factor >= self.MIN_TICK_SPACING:
+                return interval
+        return self.TICK_INTERVALS[-1]
+    
+    def contextMenuEvent(self, event):
+        """Offer track, opacity and blend mode changes for the clip under the cursor."""
+        clip = self.clip_at(event.pos())
+        if clip is None:
+            return
+        node = clip[0]
+        
+        menu = QMenu(self)
+        up = menu.addAction("Move Up a Track")
+        up.triggered.connect(lambda: node.set_track(node.track + 1))
+        down = menu.addAction("Move Down a Track")
+        down.setEnabled(node.track > 0)
+        down.triggered.connect(lambda: node.set_track(node.track - 1))
+        
+        opacity_menu = menu.addMenu("Opacity")
+        for percent in (100, 75, 50, 25):
+            action = opacity_menu.addAction(f"{percent}%")
+            action.setCheckable(True)
+            action.setChecked(abs(node.opacity * 100 - percent) < 0.5)
+            action.triggered.connect(lambda checked, p=percent: node.set_opacity(p / 100))
+        
+        blend_menu = menu.addMenu("Blend Mode")
+        for mode in BLEND_MODES:
+            action = blend_menu.addAction(mode.capitalize())
+            action.setCheckable(True)
+            action.setChecked(node.blend_mode == mode)
+            action.triggered.connect(lambda checked, m=mode: node.set_blend_mode(m))
+        
+        menu.exec(event.globalPos())
+        self.update_clips(self.clips)
+        
     def update_clips(self, clips):
         """Update the list of clips and redraw."""
         self.clips = clips
-        total_duration = 0
-        for node, start_time in clips:
-            clip_end = start_time + node.duration
-            total_duration = max(total_duration, clip_end)
+        self.index = IntervalIndex((start_time, start_time + node.get_duration(), (node, start_time))
+                                   for node, start_time in clips)
+        self.clip_starts = {node: start_time for node, start_time in clips}
+        self.tracks = max([node.track for node, start_time in clips], default=0) + 1
+        total_duration = self.index.end
         
-        # Set widget width based on total duration
+        # Set widget size based on total duration and track count
         width = max(int(total_duration * self.scale_factor), self.parent().width())
         self.setMinimumWidth(width)
+        height = self.track_y(0) + self.CLIP_HEIGHT + self.TRACK_SPACING
+        self.setMinimumHeight(max(180, height))
         self.update()
         
     def paintEvent(self, event):
@@ -129,45 +341,161 @@ class TimelineContent(QWidget):
             painter = QPainter(self)
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
             
-            # Draw time markers
-            painter.setPen(QPen(QColor("#4a4a4a")))
-            total_width = self.width()
-            marker_interval = self.scale_factor  # 1 second intervals
+            # Only the exposed time range is drawn
+            exposed = event.rect()
+            visible_start = exposed.left() / self.scale_factor
+            visible_end = (exposed.right() + 1) / self.scale_factor
             
-            for x in range(0, total_width, marker_interval):
+            # Draw time markers for the visible range, labelled a marker early
+            # so text starting left of the exposed area is complete
+            painter.setPen(QPen(QColor("#4a4a4a")))
+            interval = self.tick_interval()
+            first_tick = int(visible_start // interval) - 1
+            last_tick = int(visible_end // interval) + 1
+            for tick in range(max(0, first_tick), last_tick + 1):
+                time = tick * interval
+                x = int(round(time * self.scale_factor))
                 painter.drawLine(x, 0, x, 10)
-                time = x / self.scale_factor
                 painter.drawText(x - 15, 25, f"{time:.1f}s")
             
-            # Draw clips
-            clip_height = 100
-            y_offset = 40
+            # Draw the visible clips, one row per track
+            clip_height = self.CLIP_HEIGHT
+            visible = self.index.overlapping(visible_start, visible_end)
             
-            for node, start_time in self.clips:
+            for node, start_time in visible:
                 try:
                     # Calculate clip rectangle
                     x = int(start_time * self.scale_factor)
-                    width = int(node.duration * self.scale_factor)
+                    width = int(node.get_duration() * self.scale_factor)
+                    y_offset = self.track_y(node.track)
                     
                     # Draw clip background
                     painter.setPen(QPen(QColor("#4a9eff")))
                     painter.setBrush(QBrush(QColor("#2a2a2a")))
                     painter.drawRoundedRect(x, y_offset, width, clip_height, 5, 5)
                     
+                    # Draw the filmstrip behind the clip's labels
+                    self.draw_filmstrip(painter, node, x, y_offset + 3, width, exposed)
+                    
+                    # Draw the audio waveform for the visible part of the clip
+                    self.draw_waveform(painter, node, x, y_offset + clip_height - self.WAVEFORM_HEIGHT - 4,
+                                       width, exposed)
+                    
                     # Draw clip name
                     painter.setPen(QPen(Qt.GlobalColor.white))
                     clip_name = os.path.basename(node.video_path)
                     painter.drawText(x + 5, y_offset + 20, clip_name)
                     
                     # Draw duration
-                    duration_text = f"{node.duration:.1f}s"
+                    duration_text = f"{node.get_duration():.1f}s"
                     painter.drawText(x + 5, y_offset + 40, duration_text)
                     
+                    # Draw compositing settings when they differ from the defaults
+                    if node.opacity < 1.0 or node.blend_mode != 'normal':
+                        painter.drawText(x + 5, y_offset + 60,
+                                         f"{node.blend_mode} {node.opacity * 100:.0f}%")
+                    
                 except Exception as e:
                     print(f"Error drawing clip: {e}")
             
+            # Draw transitions over the overlap of adjacent clips; an overlap
+            # lies within the outgoing clip, so only visible clips can have one
+            starts = self.clip_starts
+            for node, start_time in visible:
+                transition = node.transition_out
+                if not transition or node.next_node not in starts:
+                    continue
+                overlap = transition.overlap(node.get_duration(), node.next_node.get_duration())
+                if overlap <= 0:
+                    continue
+                x = int(starts[node.next_node] * self.scale_factor)
+                width = max(1, int(overlap * self.scale_factor))
+                y_offset = self.track_y(node.track)
+                painter.setPen(QPen(QColor("#ffb74a")))
+                painter.setBrush(QBrush(QColor(255, 183, 74, 80)))
+                painter.drawRect(x, y_offset, width, clip_height)
+                painter.drawText(x + 3, y_offset + clip_height - 8,
+                                 transition.__class__.__name__.replace('Transition', ''))
+            
         except Exception as e:
             print(f"Error painting timeline: {e}")
+    
+    def source_range(self, node):
+        """Trimmed (start, end) source times shown by a clip."""
+        source_end = node.end_time if node.end_time is not None else node.duration
+        return node.start_time, source_end
+    
+    def draw_filmstrip(self, painter, node, x, y, width, exposed):
+        """Draw the thumbnails of a clip's visible tiles at the density of the current zoom."""
+        pyramid = self.thumbnails.get(node)
+        if pyramid is None or width <= 0:
+            return
+        
+        left = max(x, exposed.left())
+        right = min(x + width, exposed.right() + 1)
+        if right <= left:
+            return
+        
+        thumb_width, thumb_height = pyramid.thumb_size
+        source_start, source_end = self.source_range(node)
+        seconds_per_pixel = (source_end - source_start) / width
+        seconds_per_thumb = thumb_width * seconds_per_pixel
+        
+        effects_key = self.thumbnails.effects_key(node)
+        
+        painter.save()
+        painter.setClipRect(x, y, width, thumb_height)
+        painter.setOpacity(0.6)  # Keep the labels readable
+        for tile in range((left - x) // thumb_width, (right - x - 1) // thumb_width + 1):
+            centre = (tile + 0.5) * seconds_per_thumb
+            time_pos = source_end - centre if node.is_reversed else source_start + centre
+            slot = pyramid.thumbnail(time_pos, seconds_per_thumb)
+            if slot is not None:
+                image = self.thumbnails.image(pyramid, slot, node, effects_key, centre / node.speed)
+                # Effects such as crops change the size; draw every tile in its cell
+                painter.drawImage(QRectF(x + tile * thumb_width, y, thumb_width, thumb_height), image)
+        painter.restore()
+    
+    def draw_waveform(self, painter, node, x, y, width, exposed):
+        """Draw a clip's waveform as one min/max line per visible pixel column."""
+        if not node.has_audio:
+            return
+        pyramid = self.waveforms.get(node.video_path)
+        if pyramid is None or width <= 0:
+            return
+        
+        # Only the columns inside the exposed area are read and drawn
+        left = max(x, exposed.left())
+        right = min(x + width, exposed.right() + 1)
+        if right <= left:
+            return
+        
+        # Map the clip's columns onto its trimmed source range
+        source_start, source_end = self.source_range(node)
+        seconds_per_pixel = (source_end - source_start) / width
+        if node.is_reversed:
+            t0 = source_end - (right - x) * seconds_per_pixel
+            t1 = source_end - (left - x) * seconds_per_pixel
+        else:
+            t0 = source_start + (left - x) * seconds_per_pixel
+            t1 = source_start + (right - x) * seconds_per_pixel
+        mins, maxs = pyramid.peaks_for_range(t0, t1, right - left)
+        if len(mins) == 0:
+            return
+        if node.is_reversed:
+            mins, maxs = mins[::-1], maxs[::-1]
+        
+        half = self.WAVEFORM_HEIGHT / 2
+        centre = y + half
+        tops = centre - maxs * half
+        bottoms = centre - mins * half
+        lines = [QLineF(left + i, top, left + i, max(bottom, top + 1))
+                 for i, (top, bottom) in enumerate(zip(tops.tolist(), bottoms.tolist()))]
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        painter.setPen(QPen(QColor("#7fc97f")))
+        painter.drawLines(lines)
+        painter.restore()
 
 class TimelineTracks(QWidget):
     def __init__(self):
@@ -0,0 +1,49 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..core.audio import WaveformPyramid
+
+
+class WaveformLoader(QObject):
+    """Provides waveform pyramids for timeline clips, analysing audio in the background.
+
+    ``get`` returns a cached pyramid immediately or schedules the analysis and
+    returns None; ``waveform_ready`` is emitted in the GUI thread when it is
+    done so the timeline can repaint. Each file is analysed at most once.
+    """
+
+    waveform_ready = pyqtSignal(str)  # media path
+
+    def __init__(self, max_workers: int = 2, parent=None):
+        super().__init__(parent)
+        self.pyramids = {}  # path -> WaveformPyramid, or None while analysing
+        self.stop_event = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="waveform")
+
+    def get(self, path: str):
+        """Get the pyramid for a file, or None if it is not available yet."""
+        if path in self.pyramids:
+            return self.pyramids[path]
+        pyramid = WaveformPyramid.load(path)
+        self.pyramids[path] = pyramid
+        if pyramid is None and not self.stop_event.is_set():
+            self.executor.submit(self._analyse, path)
+        return pyramid
+
+    def _analyse(self, path):
+        """Worker: decode and analyse one file's audio."""
+        try:
+            pyramid = WaveformPyramid.analyse(path, self.stop_event)
+        except Exception as e:
+            print(f"Error analysing audio of {path}: {e}")
+            return
+        if pyramid is not None and not self.stop_event.is_set():
+            self.pyramids[path] = pyramid
+            self.waveform_ready.emit(path)
+
+    def shutdown(self):
+        """Stop any running analysis."""
+        self.stop_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -5,12 +5,19 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer
 from PyQt6.QtGui import QPainter, QPen, QColor, QBrush, QImage
-import cv2
 import numpy as np
 import os
 
+from ...core.preview_reader import PreviewReader, fit_size, fit_into
+from ...core.frame_pool import FramePool
+from ...core.frame_cache import preview_frame_cache
+from ...core.cache import media_fingerprint
+from ...core.audio import AudioClip, AudioEngine
+from ..audio_output import AudioOutput
+from ..preview_decoder import preview_decoder
+
 class VideoNodeWidget(QGraphicsItem):
-    def __init__(self, video_node):
+    def __init__(self, video_node, load_preview=True):
         super().__init__()
         
         self.video_node = video_node
@@ -21,8 +28,23 @@ class VideoNodeWidget(QGraphicsItem):
         self.is_playing = False
         self.current_frame = 0
         self.error_message = None
+        self.reader = None
+        self.media_key = None  # Fingerprint keying the node's frames in the frame cache
+        self.displayed_frame = None
+        
+        # Preview buffers are recycled; each one is wrapped by a QImage once
+        self.frame_pool = FramePool()
+        self.preview_images = {}  # id(buffer) -> QImage sharing its memory
+        self.preview_buffer = None  # Keeps the displayed buffer alive
         self.playback_speed = 1.0
         self.is_reversed = False
+        self.audio_output = None  # Plays the clip's audio and clocks playback
+        
+        # During playback frames are decoded by worker processes into shared slots
+        self.stream = None
+        self.stream_slot = None  # Slot of the displayed frame, if it is shared
+        self.requested_frame = None
+        self.frames_in_flight = 0
         
         # Enable item movement and selection
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
@@ -39,8 +61,12 @@ class VideoNodeWidget(QGraphicsItem):
         self.playback_timer.timeout.connect(self.next_frame)
         self.update_playback_interval()
         
+        # Effects are drawn into the preview, so redraw when they change
+        self.video_node.edited.connect(self.on_node_edited)
+        
         # Load preview
-        self.load_preview()
+        if load_preview:
+            self.load_preview()
     
     def update_playback_interval(self):
         """Update timer interval based on playback speed."""
@@ -51,10 +77,100 @@ class VideoNodeWidget(QGraphicsItem):
         """Set the playback speed."""
         self.playback_speed = speed
         self.update_playback_interval()
+        if self.is_playing:
+            self.start_audio()
     
     def toggle_reverse(self, reversed_state):
         """Toggle reverse playback."""
         self.is_reversed = reversed_state
+        if self.is_playing:
+            self.start_audio()
+    
+    def start_audio(self):
+        """Play the source audio from the current frame; reverse playback is silent."""
+        self.stop_audio()
+        if self.is_reversed or not self.video_node.fps or not self.video_node.has_audio:
+            return
+        try:
+            speed = abs(self.playback_speed)
+            clip = AudioClip(self.video_node.video_path, 0.0, self.video_node.duration / speed,
+                             speed=speed, effects=self.video_node.audio_effects)
+            self.audio_output = AudioOutput(AudioEngine([clip]))
+            self.audio_output.start(self.current_frame / self.video_node.fps / speed)
+        except Exception as e:
+            self.audio_output = None
+            print(f"Error starting audio for {self.video_node.video_path}: {e}")
+    
+    def stop_audio(self):
+        """Stop the clip's audio."""
+        if self.audio_output is not None:
+            self.audio_output.close()
+            self.audio_output = None
+    
+    def start_stream(self):
+        """Decode playback frames in a worker process when one is available."""
+        if self.stream is not None or not isinstance(self.reader, PreviewReader):
+            return  # Image sequences are already decoded on a thread pool
+        decoder = preview_decoder()
+        if decoder is None:
+            return
+        try:
+            self.stream = decoder.open(self.video_node.video_path, self.reader.width, self.reader.height,
+                                       self.video_node.fps, self.on_frame_decoded)
+            self.reader.close()
+        except Exception as e:
+            self.stream = None
+            print(f"Error starting decode stream for {self.video_node.video_path}: {e}")
+    
+    def stop_stream(self):
+        """Stop the worker stream, keeping a private copy of the displayed frame."""
+        if self.stream is None:
+            return
+        decoder = preview_decoder()
+        decoder.close_stream(self.stream)
+        self.stream = None
+        self.requested_frame = None
+        self.frames_in_flight = 0
+        if self.stream_slot is not None:
+            buffer = self.frame_pool.acquire(self.preview_buffer.shape)
+            buffer[...] = self.preview_buffer
+            self.preview_buffer = buffer
+            self.preview_frame = self.image_for_buffer(buffer)
+            decoder.release(self.stream_slot)
+            self.stream_slot = None
+    
+    def request_frame(self, frame_number):
+        """Ask the worker for a frame, keeping at most two in flight."""
+        if frame_number in (self.displayed_frame, self.requested_frame) or self.frames_in_flight >= 2:
+            return
+        if preview_decoder().request(self.stream, frame_number):
+            self.requested_frame = frame_number
+            self.frames_in_flight += 1
+    
+    def on_frame_decoded(self, frame_number, frame, slot):
+        """Show a frame a worker decoded into a shared slot."""
+        decoder = preview_decoder()
+        self.frames_in_flight = max(0, self.frames_in_flight - 1)
+        if frame is None:
+            return
+        self.cache_frame(frame_number, frame)
+        buffer = frame
+        if self.video_node.effects:
+            buffer = self.render_effects(frame, frame_number)
+        
+        previous_slot = self.stream_slot
+        self.preview_buffer = buffer
+        self.preview_frame = self.image_for_buffer(buffer)
+        self.displayed_frame = frame_number
+        if buffer is frame:
+            self.stream_slot = slot
+        else:
+            self.stream_slot = None
+            decoder.release(slot)
+        # The previous frame is no longer on screen, so its slot can be reused
+        if previous_slot is not None:
+            decoder.release(previous_slot)
+        self.update()
     
     def load_preview(self):
         """Load the first frame as preview."""
@@ -64,61 +180,182 @@ class VideoNodeWidget(QGraphicsItem):
                 self.error_message = "File not found"
                 return
             
-            cap = cv2.VideoCapture(self.video_node.video_path)
-            if not cap.isOpened():
+            if self.video_node.error or not self.video_node.width:
                 self.error_message = "Could not open video"
                 return
             
-            ret, frame = cap.read()
-            if not ret:
+            self.create_reader()
+            
+            if not self.show_frame(0):
                 self.error_message = "Could not read frame"
                 return
             
-            # Convert frame from BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Scale frame to fit preview area
-            preview_height = self.height - 140  # Leave space for title and controls
-            preview_width = self.width - 20    # Leave margin
-            
-            frame_height, frame_width = frame_rgb.shape[:2]
-            scale = min(preview_width/frame_width, preview_height/frame_height)
-            new_width = int(frame_width * scale)
-            new_height = int(frame_height * scale)
-            
-            frame_scaled = cv2.resize(frame_rgb, (new_width, new_height))
-            
-            # Convert to QImage
-            height, width, channel = frame_scaled.shape
-            bytes_per_line = 3 * width
-            self.preview_frame = QImage(frame_scaled.data, width, height, 
-                                     bytes_per_line, QImage.Format.Format_RGB888).copy()
-            
             # Update controls with video duration
             if hasattr(self, 'controls'):
-                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                self.controls.slider.setMaximum(total_frames - 1)
+                self.controls.slider.setMaximum(max(0, self.video_node.frame_count - 1))
             
-            cap.release()
+            # Only a poster frame is needed until playback starts
+            self.reader.close()
             
         except Exception as e:
             self.error_message = f"Error: {str(e)}"
             print(f"Error loading preview for {self.video_node.video_path}: {e}")
     
+    def create_reader(self):
+        """Create a reader that decodes straight to the size of the preview area."""
+        if self.reader is not None:
+            self.reader.close()
+        self.displayed_frame = None
+        preview_width, preview_height = fit_size(
+            self.video_node.width, self.video_node.height,
+            self.width - 20,    # Leave margin
+            self.height - 140   # Leave space for title and controls
+        )
+        self.reader = self.video_node.open_preview_reader(preview_width, preview_height)
+        try:
+            self.media_key = media_fingerprint(self.video_node.video_path)
+        except OSError:
+            self.media_key = None
+    
+    def apply_media_info(self, info):
+        """Fill in a placeholder node from a background probe."""
+        try:
+            self.video_node.apply_media_info(info)
+            if self.video_node.error or not self.video_node.width:
+                self.error_message = "Could not open video"
+                self.update()
+                return
+            
+            self.create_reader()
+            poster = info.get('poster')
+            if poster is not None and poster.shape == self.reader.frame_shape:
+                buffer = self.frame_pool.acquire(poster.shape, exclude=self.preview_buffer)
+                buffer[...] = poster
+                self.preview_buffer = buffer
+                self.preview_frame = self.image_for_buffer(buffer)
+                self.displayed_frame = 0
+            elif not self.show_frame(0):
+                self.error_message = "Could not read frame"
+            self.reader.close()
+            
+            self.controls.slider.setMaximum(max(0, self.video_node.frame_count - 1))
+            self.update()
+            
+        except Exception as e:
+            self.error_message = f"Error: {str(e)}"
+            print(f"Error applying media info for {self.video_node.video_path}: {e}")
+    
+    def show_frame(self, frame_number):
+        """Decode a frame at preview resolution and display it."""
+        if self.reader is None:
+            return False
+        if frame_number == self.displayed_frame:
+            return True
+        
+        buffer = self.frame_pool.acquire(self.reader.frame_shape, exclude=self.preview_buffer)
+        frame = None
+        if self.reader.position != frame_number:
+            # A reader already at the frame decodes it in step; a cache hit
+            # would leave it behind and restart the decoder at the next miss
+            frame = self.cached_frame(frame_number, buffer)
+        if frame is None:
+            frame = self.reader.read_frame(frame_number, out=buffer)
+            if frame is None:
+                return False
+            self.cache_frame(frame_number, frame)
+        if self.video_node.effects:
+            buffer = self.render_effects(buffer, frame_number)
+        
+        self.preview_buffer = buffer
+        self.preview_frame = self.image_for_buffer(buffer)
+        self.displayed_frame = frame_number
+        
+        # Trigger repaint
+        self.update()
+        return True
+    
+    def cached_frame(self, frame_number, out):
+        """Copy a frame from the frame cache into ``out``, or return None on a miss."""
+        if self.media_key is None:
+            return None
+        try:
+            frame = preview_frame_cache().get(self.media_key, frame_number, out.shape)
+        except Exception as e:
+            print(f"Error reading cached frame of {self.video_node.video_path}: {e}")
+            return None
+        if frame is None:
+            return None
+        np.copyto(out, frame)
+        return out
+    
+    def cache_frame(self, frame_number, frame):
+        """Keep a decoded (pre-effects) frame for later scrubbing."""
+        if self.media_key is not None:
+            try:
+                preview_frame_cache().put(self.media_key, frame_number, frame)
+            except Exception as e:
+                print(f"Error caching frame of {self.video_node.video_path}: {e}")
+    
+    def on_node_edited(self, changes):
+        """Redraw the displayed frame after the effect chain changed."""
+        if 'effects' not in changes or self.reader is None or self.displayed_frame is None:
+            return
+        try:
+            frame_number, self.displayed_frame = self.displayed_frame, None
+            self.show_frame(frame_number)
+            if not self.is_playing:
+                self.reader.close()
+        except Exception as e:
+            print(f"Error refreshing preview for {self.video_node.video_path}: {e}")
+    
+    def render_effects(self, frame, frame_number):
+        """Run the node's effects on a decoded preview frame.
+        
+        The frame is already at preview size, so the chain runs at that
+        resolution. The result is fitted into a buffer of the preview shape.
+        """
+        time_pos = self.video_node.clip_time(frame_number)
+        try:
+            result = self.video_node.apply_effects(frame, time_pos)
+        except Exception as e:
+            print(f"Error applying effects to preview of {self.video_node.video_path}: {e}")
+            return frame
+        if result is frame:
+            return frame
+        # A buffer other than the decoded one, since the result may be a view of it
+        return fit_into(result, self.frame_pool.acquire(frame.shape, exclude=frame))
+    
+    def image_for_buffer(self, buffer):
+        """Get the QImage wrapping a pooled buffer without copying its pixels."""
+        image = self.preview_images.get(id(buffer))
+        if image is None:
+            height, width, channel = buffer.shape
+            bytes_per_line = 3 * width
+            image = QImage(buffer.data, width, height,
+                           bytes_per_line, QImage.Format.Format_RGB888)
+            self.preview_images[id(buffer)] = image
+        return image
+    
     def next_frame(self):
         """Load and display the next frame during playback."""
         if not self.is_playing:
             return
         
         try:
-            cap = cv2.VideoCapture(self.video_node.video_path)
-            if not cap.isOpened():
+            total_frames = self.video_node.frame_count
+            if total_frames <= 0:
                 return
             
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            # Update current frame based on direction
-            if self.is_reversed:
+            # With audio playing, show the frame being heard
+            if self.audio_output is not None:
+                frame = int(self.audio_output.time() * abs(self.playback_speed) * self.video_node.fps)
+                if frame >= total_frames:
+                    self.current_frame = 0
+                    self.audio_output.start(0.0)
+                else:
+                    self.current_frame = frame
+            # Otherwise step one frame per tick based on direction
+            elif self.is_reversed:
                 self.current_frame -= 1
                 if self.current_frame < 0:
                     self.current_frame = total_frames - 1
@@ -127,37 +364,12 @@ class VideoNodeWidget(QGraphicsItem):
                 if self.current_frame >= total_frames:
                     self.current_frame = 0
             
-            # Set position to current frame
-            cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
-            
-            # Read frame
-            ret, frame = cap.read()
-            if ret:
-                # Convert and scale frame
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                preview_height = self.height - 140
-                preview_width = self.width - 20
-                
-                frame_height, frame_width = frame_rgb.shape[:2]
-                scale = min(preview_width/frame_width, preview_height/frame_height)
-                new_width = int(frame_width * scale)
-                new_height = int(frame_height * scale)
-                
-                frame_scaled = cv2.resize(frame_rgb, (new_width, new_height))
-                
-                # Update preview frame
-                height, width, channel = frame_scaled.shape
-                bytes_per_line = 3 * width
-                self.preview_frame = QImage(frame_scaled.data, width, height,
-                                         bytes_per_line, QImage.Format.Format_RGB888).copy()
-                
+            if self.stream is not None:
+                self.request_frame(self.current_frame)
+                self.controls.slider.setValue(self.current_frame)
+            elif self.show_frame(self.current_frame):
                 # Update slider position
                 self.controls.slider.setValue(self.current_frame)
-                
-                # Trigger repaint
-                self.update()
-            
-            cap.release()
             
         except Exception as e:
             print(f"Error during playback: {e}")
@@ -211,6 +423,9 @@ class VideoNodeWidget(QGraphicsItem):
             elif self.error_message:
                 painter.drawText(QRectF(10, 30, self.width-20, self.height-140),
                                Qt.AlignmentFlag.AlignCenter, self.error_message)
+            else:
+                painter.drawText(QRectF(10, 30, self.width-20, self.height-140),
+                               Qt.AlignmentFlag.AlignCenter, "Loading...")
             
             # Draw ports with better visibility
             # Input port (left)
@@ -232,6 +447,13 @@ class VideoNodeWidget(QGraphicsItem):
             painter.drawText(QRectF(output_pos.x() - 20, output_pos.y() - 20,
                                   40, 20), Qt.AlignmentFlag.AlignCenter, "Out")
             
+            # Show the transition into the next clip under the output port
+            transition = self.video_node.transition_out
+            if transition:
+                label = transition.__class__.__name__.replace('Transition', '')
+                painter.drawText(QRectF(output_pos.x() - 40, output_pos.y() + 10,
+                                      40, 20), Qt.AlignmentFlag.AlignRight, label)
+            
         except Exception as e:
             print(f"Error painting node: {e}")
 
@@ -366,43 +588,32 @@ class VideoControls(QWidget):
         if self.parent_node.is_playing:
             self.parent_node.is_playing = False
             self.parent_node.playback_timer.stop()
+            self.parent_node.stop_audio()
+            self.parent_node.stop_stream()
+            if self.parent_node.reader:
+                self.parent_node.reader.close()
             self.play_button.setText("Play")
         else:
             self.parent_node.is_playing = True
+            self.parent_node.start_stream()
             self.parent_node.playback_timer.start()
+            self.parent_node.start_audio()
             self.play_button.setText("Pause")
     
     def on_slider_changed(self, value):
         """Handle slider value changes."""
+        seeked = value != self.parent_node.current_frame
         self.parent_node.current_frame = value
+        if seeked and self.parent_node.audio_output is not None:
+            self.parent_node.start_audio()
         # Load and display the frame at the new position
         try:
-            cap = cv2.VideoCapture(self.parent_node.video_node.video_path)
-            if cap.isOpened():
-                cap.set(cv2.CAP_PROP_POS_FRAMES, value)
-                ret, frame = cap.read()
-                if ret:
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    preview_height = self.parent_node.height - 140
-                    preview_width = self.parent_node.width - 20
-                    
-                    frame_height, frame_width = frame_rgb.shape[:2]
-                    scale = min(preview_width/frame_width, preview_height/frame_height)
-                    new_width = int(frame_width * scale)
-                    new_height = int(frame_height * scale)
-                    
-                    frame_scaled = cv2.resize(frame_rgb, (new_width, new_height))
-                    
-                    height, width, channel = frame_scaled.shape
-                    bytes_per_line = 3 * width
-                    self.parent_node.preview_frame = QImage(
-                        frame_scaled.data, width, height,
-                        bytes_per_line, QImage.Format.Format_RGB888
-                    ).copy()
-                    
-                    self.parent_node.update()
-                
-                cap.release()
+            if self.parent_node.stream is not None:
+                self.parent_node.request_frame(value)
+                return
+            self.parent_node.show_frame(value)
+            if not self.parent_node.is_playing and self.parent_node.reader:
+                self.parent_node.reader.close()
                 
         except Exception as e:
             print(f"Error updating frame: {e}")
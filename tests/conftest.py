@@ -2,6 +2,15 @@ import pytest
 import os
 import sys
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep every cache (frames, hashes, autosave...) of a test in its own temporary directory."""
+    monkeypatch.setenv('WEAVECLIP_CACHE_DIR', str(tmp_path / 'cache'))
+    yield
+    from src.core.frame_cache import close_preview_frame_cache
+    close_preview_frame_cache()  # Its store lives in this test's directory
+
+
 @pytest.fixture(autouse=True)
 def setup_test_env():
     """Set up the test environment before each test."""
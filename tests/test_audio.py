@@ -0,0 +1,116 @@
+import numpy as np
+
+from src.core.audio import (AudioClip, AudioEngine, AudioMixer, EQEffect, FadeEffect, MixAhead,
+                            VolumeEffect)
+from src.core.audio.reader import atempo_factors
+
+
+def test_eq_matches_direct_convolution():
+    """Overlap-save across blocks of varying size equals convolving the whole signal at once."""
+    rng = np.random.default_rng(4)
+    signal = rng.uniform(-0.5, 0.5, (5000, 2)).astype(np.float32)
+    eq = EQEffect(low_db=6.0, mid_db=-3.0, high_db=4.0)
+    kernel = eq.kernel(48000).astype(np.float64)
+
+    output = signal.copy()
+    start = 0
+    for size in (1024, 300, 1, 2048, 1627):
+        eq.process(output[start:start + size], start / 48000, 1.0, 48000)
+        start += size
+    assert start == len(signal)
+
+    for channel in range(2):
+        expected = np.convolve(signal[:, channel].astype(np.float64), kernel)[:len(signal)]
+        np.testing.assert_allclose(output[:, channel], expected, atol=1e-4)
+
+
+def test_eq_reset_forgets_history():
+    """After a reset a block is filtered as if it started the signal."""
+    rng = np.random.default_rng(6)
+    block = rng.uniform(-0.5, 0.5, (512, 1)).astype(np.float32)
+    eq = EQEffect(low_db=-6.0)
+    first = block.copy()
+    eq.process(first, 0.0, 1.0, 48000)
+    eq.process(rng.uniform(-0.5, 0.5, (512, 1)).astype(np.float32), 0.0, 1.0, 48000)
+    eq.reset()
+    again = block.copy()
+    eq.process(again, 0.0, 1.0, 48000)
+    np.testing.assert_array_equal(again, first)
+
+
+def test_fade_and_volume_gains():
+    """Fades ramp linearly at both ends and volume scales by the dB gain."""
+    block = np.ones((100, 2), np.float32)
+    FadeEffect(fade_in=1.0, fade_out=1.0).process(block, 0.0, 10.0, 100)
+    np.testing.assert_allclose(block[:, 0], np.arange(100) / 100, atol=1e-6)
+
+    block = np.ones((100, 2), np.float32)
+    FadeEffect(fade_in=1.0, fade_out=1.0).process(block, 9.0, 10.0, 100)
+    np.testing.assert_allclose(block[:, 1], (100 - np.arange(100)) / 100, atol=1e-6)
+
+    block = np.ones((4, 2), np.float32)
+    VolumeEffect(gain_db=-20.0).process(block, 0.0, 1.0, 100)
+    np.testing.assert_allclose(block, 0.1, rtol=1e-6)
+
+
+def test_atempo_factors_multiply_to_the_speed():
+    """Speeds outside atempo's 0.5-2.0 range are split into factors within it."""
+    for speed in (0.1, 0.5, 0.75, 1.0, 3.0, 10.0):
+        factors = atempo_factors(speed)
+        assert all(0.5 <= factor <= 2.0 for factor in factors)
+        assert np.isclose(np.prod(factors), speed)
+
+
+def test_mixers_process_their_own_effect_copies():
+    """Two mixers playing the same clip never share effect state."""
+    eq = EQEffect(low_db=3.0)
+    clip = AudioClip('clip.mp4', 0.0, 1.0, effects=[eq])
+    first, second = AudioMixer(), AudioMixer()
+    first.set_clips([clip])
+    second.set_clips([clip])
+    first_eq, second_eq = first.effects[id(clip)][0], second.effects[id(clip)][0]
+    assert first_eq is not eq and second_eq is not eq and first_eq is not second_eq
+    assert first_eq.settings() == eq.settings()
+    first.set_clips([clip])
+    assert first.effects[id(clip)][0] is first_eq  # Kept while the clip stays
+
+
+def test_mixer_places_clips_on_the_timeline():
+    """Clip frame ranges follow start time and duration; muted clips mix to silence."""
+    mixer = AudioMixer(sample_rate=1000, block_size=256)
+    clip = AudioClip('clip.mp4', 0.5, 0.25, muted=True)
+    assert mixer.clip_frames(clip) == (500, 750)
+    mixer.set_clips([clip])
+    assert not mixer.mix(400).any()
+    assert not mixer.streams
+
+
+class CountingEngine(AudioEngine):
+    """An engine whose blocks hold their timeline frame numbers."""
+
+    def next_block(self):
+        block = self.mixer.out
+        block[...] = (self.frame + np.arange(len(block)))[:, np.newaxis]
+        self.frame += len(block)
+        return block
+
+
+def test_mix_ahead_delivers_blocks_in_order():
+    """Frames copied out of the ring continue from the start time without gaps."""
+    engine = CountingEngine(sample_rate=1000, block_size=64)
+    mix = MixAhead(engine, blocks=4)
+    mix.start(2.0)
+    out = np.zeros((50, 2), np.float32)
+    expected = 2000
+    try:
+        for _ in range(40):
+            frames = 0
+            while frames == 0:
+                frames = mix.read_into(out)
+            np.testing.assert_array_equal(out[:frames, 0], expected + np.arange(frames))
+            expected += frames
+            assert mix.written - mix.read <= len(mix.ring)
+        assert mix.time(10) == (expected - 10) / 1000
+    finally:
+        mix.stop()
+    assert mix.thread is None
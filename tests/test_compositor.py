@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+from src.core.compositor import TrackCompositor
+from src.core.image_sequence import ImageSequenceNode
+from src.core.sequence import ClipSequence
+from src.core.transitions import FadeTransition
+from src.ui.timeline import Timeline
+
+
+def still(directory, name, value, track=0, size=(32, 24)):
+    path = directory / f"{name}.png"
+    cv2.imwrite(str(path), np.full((size[1], size[0], 3), value, dtype=np.uint8))
+    node = ImageSequenceNode(str(path), still_duration=1.0)
+    node.track = track
+    return node
+
+
+def sequence(*nodes):
+    for node, next_node in zip(nodes, nodes[1:]):
+        node.next_node = next_node
+    return ClipSequence.from_items(Timeline.chain_timing(nodes[0], set()))
+
+
+def recording_source(rendered):
+    def frame_source(node, time_pos, render_scale):
+        rendered.append(node)
+        return node.get_frame_at_time(time_pos, render_scale)
+    return frame_source
+
+
+def test_higher_tracks_blend_over_lower_ones(tmp_path):
+    """A half-transparent clip on track 1 mixes with the clip under it."""
+    low, high = still(tmp_path, 'low', 200), still(tmp_path, 'high', 0, track=1)
+    high.opacity = 0.5
+    compositor = TrackCompositor(32, 24)
+    frame = compositor.render([sequence(high), sequence(low)], 0.5)
+    assert abs(int(frame[0, 0, 0]) - 100) <= 1
+
+    high.blend_mode = 'add'
+    high.opacity = 1.0
+    assert compositor.render([sequence(high), sequence(low)], 0.5)[0, 0, 0] == 200
+
+
+def test_opaque_tracks_hide_and_skip_lower_ones(tmp_path):
+    """Clips under a full-frame opaque clip are never rendered."""
+    low, high = still(tmp_path, 'low', 200), still(tmp_path, 'high', 50, track=1)
+    rendered = []
+    compositor = TrackCompositor(32, 24, frame_source=recording_source(rendered))
+    assert compositor.render([sequence(low), sequence(high)], 0.5)[0, 0, 0] == 50
+    assert rendered == [high]
+
+
+def test_render_blends_clips_inside_a_transition(tmp_path):
+    """Both sides of a fade are rendered and mixed by its progress."""
+    node_a, node_b = still(tmp_path, 'a', 0), still(tmp_path, 'b', 200)
+    node_a.transition_out = FadeTransition(duration=0.5)
+    clips = sequence(node_a, node_b)
+    compositor = TrackCompositor(32, 24)
+    assert compositor.render([clips], 0.25)[0, 0, 0] == 0
+    assert abs(int(compositor.render([clips], 0.75)[0, 0, 0]) - 100) <= 1
+    assert compositor.render([clips], 1.25)[0, 0, 0] == 200
+
+
+def test_composite_fits_native_frames_and_centres_smaller_ones(tmp_path):
+    """Frames already rendered by players are stacked like rendered clips."""
+    low = still(tmp_path, 'low', 200, size=(64, 48))
+    high = still(tmp_path, 'high', 0, track=1, size=(8, 6))
+    compositor = TrackCompositor(32, 24)
+    frame = compositor.composite([(low, low.get_frame(0)), (high, np.full((12, 16, 3), 10, np.uint8)),
+                                  (low, None)])
+    assert frame[0, 0, 0] == 200 and frame[12, 16, 0] == 10
+
+
+def test_canvas_frames_come_through_the_evaluation_graph(tmp_path):
+    """The canvas feeds the compositor from its graph's source nodes."""
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.canvas import VideoCanvas
+
+    app = QApplication.instance() or QApplication([])
+    canvas = VideoCanvas()
+    try:
+        cv2.imwrite(str(tmp_path / 'grey.png'), np.full((48, 64, 3), 120, dtype=np.uint8))
+        node = canvas.add_image_node(str(tmp_path / 'grey.png')).video_node
+        compositor = TrackCompositor(32, 24, frame_source=canvas.source_frame)
+        assert compositor.render([sequence(node)], 0.5)[0, 0, 0] == 120
+        source = canvas.graph_sources[node.id]
+        assert source.render_scale == 0.5
+        assert canvas.graph.evaluate(source, 0.5).shape == (24, 32, 3)
+    finally:
+        canvas.clear_nodes()
@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.core.decode_service import DecodeService, SharedFrameRing
+
+
+def results(service, count, timeout=30.0):
+    """The next ``count`` results, skipping timeouts."""
+    found = []
+    deadline = time.monotonic() + timeout
+    while len(found) < count and time.monotonic() < deadline:
+        result = service.next_result(timeout=0.2)
+        if result is not None:
+            found.append(result)
+    return found
+
+
+def test_ring_slots_are_shared_between_attached_rings():
+    """A frame written through one ring is read through another attached by name."""
+    ring = SharedFrameRing(4, 2 * 3 * 3)
+    attached = SharedFrameRing(4, 2 * 3 * 3, name=ring.name)
+    try:
+        ring.frame(2, (2, 3, 3))[...] = 7
+        assert attached.frame(2, (2, 3, 3)).sum() == 7 * 18
+        assert not attached.frame(1, (2, 3, 3)).any()  # Slots do not overlap
+        with pytest.raises(ValueError):
+            ring.frame(0, (3, 3, 3))
+    finally:
+        attached.close()
+        ring.close()
+    with pytest.raises(FileNotFoundError):
+        SharedFrameRing(4, 18, name=ring.name)  # The owner unlinked the block
+
+
+def test_failed_reads_and_dead_workers_give_slots_back(tmp_path):
+    """Every requested frame is answered once, and no slot stays reserved afterwards."""
+    service = DecodeService(slot_bytes=8 * 8 * 3, slots=3, workers=1)
+    try:
+        stream = service.open(str(tmp_path / 'missing.mp4'), 8, 8, 25.0)
+        with pytest.raises(ValueError):
+            service.open(str(tmp_path / 'missing.mp4'), 16, 16, 25.0)
+
+        assert all(service.request(stream, frame) for frame in range(3))
+        assert not service.request(stream, 3)  # The ring is full
+        assert not service.request(stream + 100, 0)  # Unknown stream
+        assert sorted(results(service, 3)) == [(stream, 0, None), (stream, 1, None), (stream, 2, None)]
+        assert len(service.free_slots) == 3 and not service.in_flight
+
+        # A killed worker is noticed by its closed pipe and replaced; the frames it owed fail
+        service.processes[0].kill()
+        service.processes[0].join()
+        assert service.request(stream, 5) and service.request(stream, 6)
+        assert sorted(results(service, 2)) == [(stream, 5, None), (stream, 6, None)]
+        assert len(service.free_slots) == 3 and not service.in_flight
+        assert service.processes[0].is_alive()
+
+        # The replacement reopened the stream and answers new requests
+        assert service.request(stream, 7)
+        assert results(service, 1) == [(stream, 7, None)]
+        assert len(service.free_slots) == 3
+
+        service.close_stream(stream)
+        assert not service.request(stream, 8)
+    finally:
+        service.shutdown()
+    assert service.processes == []
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.core.effects import (BrightnessEffect, ContrastEffect, CropEffect, RotateEffect,
+                              ScaleEffect, apply_chain)
+from src.core.effects.chain import plan_regions, reorder_chain
+
+
+def card(width=320, height=240):
+    """A smooth test card: gradients plus low-frequency detail, no noise for the resamplers to alias."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frame = np.stack([x / width * 255,
+                      y / height * 255,
+                      127.5 + 100 * np.sin(x / 9.0) * np.cos(y / 13.0)], axis=2)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def apply_sequentially(frame, effects):
+    for effect in effects:
+        frame = effect.apply(frame)
+    return frame
+
+
+CHAINS = [
+    [CropEffect(0.25, 0.2, 0.5, 0.5)],
+    [ScaleEffect(0.5, 0.5), CropEffect(0.1, 0.1, 0.6, 0.7)],
+    [ScaleEffect(1.5, 1.25), CropEffect(0.3, 0.4, 0.3, 0.3)],
+    [RotateEffect(30.0), CropEffect(0.3, 0.3, 0.4, 0.4)],
+    [CropEffect(0.1, 0.1, 0.8, 0.8), ScaleEffect(0.75, 0.5), RotateEffect(-15.0), CropEffect(0.2, 0.25, 0.5, 0.5)],
+    [BrightnessEffect(20.0), ScaleEffect(0.5, 0.5), CropEffect(0.0, 0.5, 1.0, 0.5)],
+]
+
+
+@pytest.mark.parametrize('effects', CHAINS)
+def test_chain_matches_applying_effects_one_by_one(effects):
+    """Processing only the surviving region gives the sequential result within one level."""
+    frame = card()
+    expected = apply_sequentially(frame, effects)
+    result = apply_chain(frame, effects)
+    assert result.shape == expected.shape
+    assert np.abs(result.astype(np.int16) - expected).max() <= 1
+
+
+def test_reordered_chain_matches_the_written_order():
+    """Linear point-wise effects move after downscales without changing the frame."""
+    frame = card()
+    effects = [ContrastEffect(0.8), ScaleEffect(0.5, 0.5), CropEffect(0.2, 0.2, 0.5, 0.5)]
+    reordered = reorder_chain(effects)
+    assert [type(effect) for effect in reordered] == [ScaleEffect, ContrastEffect, CropEffect]
+    assert np.abs(apply_sequentially(frame, reordered).astype(np.int16) -
+                  apply_sequentially(frame, effects)).max() <= 1
+
+
+def test_effects_before_a_tight_crop_only_see_its_region():
+    """The region planned for the first effect shrinks to what the crop keeps."""
+    sizes, regions = plan_regions([ScaleEffect(0.5, 0.5), CropEffect(0.5, 0.5, 0.25, 0.25)], (320, 240))
+    assert sizes == [(320, 240), (160, 120), (40, 30)]
+    x1, y1, x2, y2 = regions[0]
+    assert (x2 - x1) * (y2 - y1) < 320 * 240 / 8
+    assert plan_regions([CropEffect(0.5, 0.5, 0.0, 0.5)], (320, 240)) is None
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+
+from src.core.frame_cache import (FRAMES_PER_FILE, SPILL_FILE_BYTES, DiskFrameStore, FrameCache,
+                                  frames_per_file)
+
+
+def frame(value, shape=(4, 6, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_store_reopens_frames_written_by_an_earlier_instance(tmp_path):
+    """Frames put before close are read back by a new store over the same directory."""
+    store = DiskFrameStore(tmp_path)
+    store.put('clip', 3, frame(30))
+    store.put('clip', FRAMES_PER_FILE + 1, frame(40))
+    store.close()
+
+    reopened = DiskFrameStore(tmp_path)
+    assert reopened.total_bytes == store.total_bytes
+    assert np.array_equal(reopened.get('clip', 3, (4, 6, 3)), frame(30))
+    assert np.array_equal(reopened.get('clip', FRAMES_PER_FILE + 1, (4, 6, 3)), frame(40))
+    assert reopened.get('clip', 4, (4, 6, 3)) is None  # Same file, slot never filled
+    assert reopened.get('other', 3, (4, 6, 3)) is None
+
+
+def test_store_deletes_files_left_by_a_crash(tmp_path):
+    """A temporary flags file, or frames without flags, are removed on startup."""
+    store = DiskFrameStore(tmp_path)
+    store.put('clip', 0, frame(10))
+    store.close()
+    np.save(tmp_path / 'clip-6x4-1.filled.tmp.npy', np.zeros(FRAMES_PER_FILE, np.uint8))
+    np.save(tmp_path / 'clip-6x4-2.npy', np.zeros((FRAMES_PER_FILE, 4, 6, 3), np.uint8))
+
+    reopened = DiskFrameStore(tmp_path)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['clip-6x4-0.filled.npy', 'clip-6x4-0.npy']
+    assert list(reopened.usage) == ['clip-6x4-0']
+    assert np.array_equal(reopened.get('clip', 0, (4, 6, 3)), frame(10))
+
+
+def test_store_evicts_least_recently_used_files_by_modification_time(tmp_path):
+    """Across sessions the oldest file on disk goes first when the budget is exceeded."""
+    store = DiskFrameStore(tmp_path)
+    for index in range(2):
+        store.put('clip', index * FRAMES_PER_FILE, frame(index))
+    file_bytes = store.total_bytes // 2
+    store.close()
+    os.utime(tmp_path / 'clip-6x4-0.npy', (1000, 1000))
+    os.utime(tmp_path / 'clip-6x4-1.npy', (500, 500))
+
+    reopened = DiskFrameStore(tmp_path, max_bytes=2 * file_bytes)
+    reopened.put('clip', 2 * FRAMES_PER_FILE, frame(2))
+    assert sorted(reopened.usage) == ['clip-6x4-0', 'clip-6x4-2']
+    assert not (tmp_path / 'clip-6x4-1.npy').exists()
+    assert reopened.total_bytes <= reopened.max_bytes
+
+
+def test_store_stays_within_its_budget(tmp_path):
+    """Recently read files survive while new files push out older ones."""
+    store = DiskFrameStore(tmp_path)
+    store.put('clip', 0, frame(0))
+    file_bytes = store.total_bytes
+    store = DiskFrameStore(tmp_path, max_bytes=3 * file_bytes)
+    for index in range(1, 6):
+        store.put('clip', index * FRAMES_PER_FILE, frame(index))
+        assert store.get('clip', 0, (4, 6, 3)) is not None  # Keep the first file in use
+        assert store.total_bytes <= store.max_bytes
+    assert sorted(store.usage) == ['clip-6x4-0', 'clip-6x4-4', 'clip-6x4-5']
+
+
+def test_large_frames_are_stored_downscaled(tmp_path):
+    """Frames over the size limit take less disk and come back at the requested shape."""
+    store = DiskFrameStore(tmp_path, max_frame_size=(3, 2))
+    store.put('clip', 0, frame(70))
+    assert list(store.usage) == ['clip-3x2-0']
+    assert np.array_equal(store.get('clip', 0, (4, 6, 3)), frame(70))
+
+
+def test_frame_cache_spills_to_and_promotes_from_the_store(tmp_path):
+    """Frames evicted from RAM are found again through the store."""
+    cache = FrameCache(max_bytes=frame(0).nbytes, store=DiskFrameStore(tmp_path))
+    cache.put('clip', 0, frame(1))
+    cache.put('clip', 1, frame(2))
+    assert list(cache.frames) == [('clip', 1, (4, 6, 3))]
+    cache.wait_for_spills()
+    assert not cache.pending
+    assert np.array_equal(cache.get('clip', 0, (4, 6, 3)), frame(1))
+    assert ('clip', 0, (4, 6, 3)) in cache.frames
+    cache.close()
+
+
+def test_spills_are_written_in_the_background_and_on_close(tmp_path):
+    """Every frame put reaches the store, whether evicted while running or still in RAM at close."""
+    cache = FrameCache(max_bytes=3 * frame(0).nbytes, store=DiskFrameStore(tmp_path))
+    for index in range(20):
+        cache.put('clip', index, frame(index))
+        assert cache.nbytes <= cache.max_bytes
+    cache.close()
+    assert cache.spill_thread is None
+
+    store = DiskFrameStore(tmp_path)
+    for index in range(20):
+        assert np.array_equal(store.get('clip', index, (4, 6, 3)), frame(index))
+
+
+def test_spill_files_stay_a_small_part_of_the_budget():
+    """Large frames share a file with fewer others, so evicting one file frees little."""
+    assert frames_per_file((4, 6, 3)) == FRAMES_PER_FILE
+    assert frames_per_file((2160, 3840, 3)) == 2
+    assert frames_per_file((4320, 7680, 3)) == 1  # Too big to share a file at all
+    for shape in ((360, 640, 3), (1080, 1920, 3), (2160, 3840, 3)):
+        assert frames_per_file(shape) * np.prod(shape) <= SPILL_FILE_BYTES
+
+
+def test_store_keeps_large_frames_in_short_files(tmp_path):
+    """Frames numbered one file apart land in separate files sized for the frame."""
+    shape = (1080, 1920, 3)
+    count = frames_per_file(shape)
+    store = DiskFrameStore(tmp_path)
+    store.put('clip', 0, frame(5, shape))
+    store.put('clip', count, frame(6, shape))
+    assert sorted(store.usage) == ['clip-1920x1080-0', 'clip-1920x1080-1']
+    assert all(size <= SPILL_FILE_BYTES + 4096 for used, size in store.usage.values())
+    assert np.array_equal(store.get('clip', count, shape), frame(6, shape))
+    store.close()
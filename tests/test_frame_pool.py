@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.core.frame_pool import FramePool
+
+
+def test_buffers_recycle_after_depth_acquires():
+    """A buffer comes back only after depth - 1 newer buffers of its shape were handed out."""
+    pool = FramePool(depth=3)
+    first = [pool.acquire((4, 6, 3)) for _ in range(3)]
+    assert len({id(buffer) for buffer in first}) == 3
+    second = [pool.acquire((4, 6, 3)) for _ in range(3)]
+    assert all(again is buffer for again, buffer in zip(second, first))
+
+
+def test_steady_state_allocates_nothing():
+    """Shapes and dtypes get separate rings, and repeated acquires never grow the pool."""
+    pool = FramePool()
+    for _ in range(10):
+        pool.acquire((4, 6, 3))
+        pool.acquire((2, 2, 3))
+        pool.acquire((4, 6, 3), dtype=np.float32)
+    buffers = list(pool.buffers())
+    assert len(buffers) == 6
+    assert pool.acquire((4, 6, 3), dtype=np.float32).dtype == np.float32
+    pool.clear()
+    assert not list(pool.buffers())
+
+
+def test_acquire_skips_excluded_buffer():
+    """The buffer on screen is never handed out while the ring has another one."""
+    pool = FramePool(depth=2)
+    shown = pool.acquire((4, 4))
+    for _ in range(5):
+        buffer = pool.acquire((4, 4), exclude=shown)
+        assert buffer is not shown
+        shown = buffer
+
+    single = FramePool(depth=1)
+    only = single.acquire((4, 4))
+    assert single.acquire((4, 4), exclude=only) is only
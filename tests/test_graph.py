@@ -0,0 +1,136 @@
+import pytest
+
+from src.core.graph import Graph, GraphNode, GraphError
+
+
+class CountingSource(GraphNode):
+    """Source whose value is the requested time; counts evaluations."""
+    time_dependent = True
+
+    def __init__(self, name=None):
+        super().__init__(name)
+        self.calls = 0
+
+    def evaluate(self, time, inputs):
+        self.calls += 1
+        return {'output': time}
+
+
+class Offset(GraphNode):
+    """Adds a constant to its input; counts evaluations."""
+    input_ports = ('input',)
+
+    def __init__(self, amount, name=None):
+        super().__init__(name)
+        self.amount = amount
+        self.calls = 0
+
+    def state_key(self):
+        return (self.version, self.amount)
+
+    def evaluate(self, time, inputs):
+        self.calls += 1
+        return {'output': inputs['input'] + self.amount}
+
+
+class Sum(GraphNode):
+    """Adds two inputs."""
+    input_ports = ('a', 'b')
+
+    def evaluate(self, time, inputs):
+        return {'output': inputs['a'] + inputs['b']}
+
+
+class Switch(GraphNode):
+    """Pulls 'a' before one second and 'b' afterwards, each shifted to local time."""
+    input_ports = ('a', 'b')
+
+    def required_inputs(self, time):
+        return ('a',) if time < 1.0 else ('b',)
+
+    def input_time(self, port, time):
+        return time if port == 'a' else time - 1.0
+
+    def evaluate(self, time, inputs):
+        return {'output': next(iter(inputs.values()))}
+
+
+def build_diamond():
+    graph = Graph()
+    source = graph.add_node(CountingSource())
+    left = graph.add_node(Offset(1))
+    right = graph.add_node(Offset(10))
+    total = graph.add_node(Sum())
+    graph.connect(source, left)
+    graph.connect(source, right)
+    graph.connect(left, total, 'a')
+    graph.connect(right, total, 'b')
+    return graph, source, left, right, total
+
+
+def test_shared_upstream_is_evaluated_once():
+    """A source feeding two branches is computed once per frame."""
+    graph, source, left, right, total = build_diamond()
+    assert graph.evaluate(total, 2.0) == 2.0 * 2 + 11
+    assert source.calls == 1
+
+
+def test_plan_is_topological():
+    """Inputs come before the nodes consuming them."""
+    graph, source, left, right, total = build_diamond()
+    order = graph.plan(total)
+    assert order.index(source.id) < order.index(left.id) < order.index(total.id)
+    assert order.index(right.id) < order.index(total.id)
+    assert order[-1] == total.id
+
+
+def test_unchanged_subgraphs_are_skipped():
+    """Only nodes downstream of a parameter change are re-evaluated."""
+    graph, source, left, right, total = build_diamond()
+    graph.evaluate(total, 1.0)
+    graph.evaluate(total, 1.0)
+    assert (source.calls, left.calls, right.calls) == (1, 1, 1)
+
+    right.amount = 20
+    assert graph.evaluate(total, 1.0) == 2.0 + 1 + 20
+    assert (source.calls, left.calls, right.calls) == (1, 1, 2)
+
+
+def test_new_time_recomputes_time_dependent_paths():
+    """Moving to a new time re-pulls the source and everything below it."""
+    graph, source, left, right, total = build_diamond()
+    graph.evaluate(total, 1.0)
+    graph.evaluate(total, 3.0)
+    assert (source.calls, left.calls) == (2, 2)
+
+
+def test_only_required_inputs_are_pulled():
+    """Inputs a node does not need at a given time are never evaluated."""
+    graph = Graph()
+    first = graph.add_node(CountingSource())
+    second = graph.add_node(CountingSource())
+    switch = graph.add_node(Switch())
+    graph.connect(first, switch, 'a')
+    graph.connect(second, switch, 'b')
+
+    assert graph.evaluate(switch, 1.5) == pytest.approx(0.5)
+    assert (first.calls, second.calls) == (0, 1)
+
+
+def test_cycles_are_rejected():
+    """Connecting a node to one of its ancestors raises."""
+    graph = Graph()
+    first = graph.add_node(Offset(1))
+    second = graph.add_node(Offset(2))
+    graph.connect(first, second)
+    with pytest.raises(GraphError):
+        graph.connect(second, first)
+
+
+def test_unknown_ports_are_rejected():
+    """Ports must be declared by the nodes."""
+    graph = Graph()
+    source = graph.add_node(CountingSource())
+    total = graph.add_node(Sum())
+    with pytest.raises(GraphError):
+        graph.connect(source, total, 'c')
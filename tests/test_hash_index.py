@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+
+from src.core.hash_index import FrameHashIndex, hamming_distances
+
+
+def brute_force(clips, query, radius):
+    found = []
+    for path, (times, hashes) in clips.items():
+        for time_pos, value in zip(times, hashes):
+            distance = bin(value ^ query).count('1')
+            if distance <= radius:
+                found.append((path, float(time_pos), distance))
+    return sorted(found)
+
+
+def flip_bits(rng, value, count):
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+def test_query_matches_brute_force():
+    """Queries at every radius return exactly the frames a full Hamming scan finds."""
+    rng = random.Random(11)
+    bases = [rng.getrandbits(64) for _ in range(20)]
+    clips = {}
+    for clip in range(8):
+        # Near-copies of shared base hashes, so small radii have matches too
+        hashes = [flip_bits(rng, rng.choice(bases), rng.randint(0, 10)) for _ in range(60)]
+        clips[f'clip{clip}.mp4'] = ([float(t) for t in range(len(hashes))], hashes)
+    index = FrameHashIndex()
+    for path, (times, hashes) in clips.items():
+        index.add_clip(path, np.array(times), np.array(hashes, dtype=np.uint64))
+
+    for _ in range(30):
+        query = flip_bits(rng, rng.choice(bases), rng.randint(0, 4))
+        for radius in (0, 3, 4, 8, 11, 16):
+            results = index.query(query, radius)
+            assert sorted(results) == brute_force(clips, query, radius)
+            distances = [distance for path, time_pos, distance in results]
+            assert distances == sorted(distances)
+
+
+def test_removed_clips_are_not_found():
+    """Index tables are rebuilt after a clip is removed."""
+    index = FrameHashIndex()
+    index.add_clip('a.mp4', np.array([0.0]), np.array([0xFF], dtype=np.uint64))
+    index.add_clip('b.mp4', np.array([1.0]), np.array([0xFE], dtype=np.uint64))
+    assert [path for path, _, _ in index.query(0xFF, 1)] == ['a.mp4', 'b.mp4']
+    index.remove_clip('a.mp4')
+    assert index.query(0xFF, 1) == [('b.mp4', 1.0, 1)]
+    assert len(index) == 1 and 'a.mp4' not in index
+
+
+def test_hamming_distances_count_bits():
+    """Vectorised popcounts agree with counting the bits of each XOR."""
+    rng = random.Random(2)
+    values = [rng.getrandbits(64) for _ in range(100)] + [0, (1 << 64) - 1]
+    query = rng.getrandbits(64)
+    expected = [bin(value ^ query).count('1') for value in values]
+    assert hamming_distances(np.array(values, dtype=np.uint64), query).tolist() == expected
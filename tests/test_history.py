@@ -0,0 +1,147 @@
+from src.core.history import History
+
+
+class Target:
+    def __init__(self):
+        self.value = 0
+        self.items = []
+
+
+def make_history(**kwargs):
+    targets = {'a': Target(), 'b': Target()}
+    return History(targets.get, **kwargs), targets
+
+
+def set_value(history, target, target_id, value, merge_key=None):
+    """Edit a target the way the UI does: change it, then record the delta."""
+    old, target.value = target.value, value
+    history.record(target_id, 'value', old, value, merge_key=merge_key)
+
+
+def test_undo_redo_restores_values():
+    """Undo and redo walk the recorded deltas both ways."""
+    history, targets = make_history()
+    set_value(history, targets['a'], 'a', 1)
+    set_value(history, targets['b'], 'b', 2)
+
+    assert history.undo()
+    assert (targets['a'].value, targets['b'].value) == (1, 0)
+    assert history.undo()
+    assert targets['a'].value == 0
+    assert not history.undo()
+
+    assert history.redo() and history.redo()
+    assert (targets['a'].value, targets['b'].value) == (1, 2)
+
+
+def test_rapid_edits_with_a_merge_key_coalesce():
+    """A drag or spin-box sequence becomes a single command."""
+    history, targets = make_history()
+    for value in range(1, 20):
+        set_value(history, targets['a'], 'a', value, merge_key='drag')
+    assert len(history.commands) == 1
+
+    history.undo()
+    assert targets['a'].value == 0
+
+
+def test_coalesced_edits_that_cancel_out_are_dropped():
+    """Dragging back to the start leaves nothing to undo."""
+    history, targets = make_history()
+    set_value(history, targets['a'], 'a', 5, merge_key='drag')
+    set_value(history, targets['a'], 'a', 0, merge_key='drag')
+    assert not history.can_undo()
+
+
+def test_new_edit_discards_redo_branch():
+    """Recording after an undo drops the undone commands."""
+    history, targets = make_history()
+    set_value(history, targets['a'], 'a', 1)
+    set_value(history, targets['a'], 'a', 2)
+    history.undo()
+    set_value(history, targets['a'], 'a', 3)
+    assert not history.can_redo()
+    assert history.end == 2
+
+
+def test_group_records_one_command():
+    """Edits made inside a group undo together."""
+    history, targets = make_history()
+    with history.group("Trim"):
+        set_value(history, targets['a'], 'a', 1)
+        set_value(history, targets['b'], 'b', 2)
+    assert len(history.commands) == 1
+    history.undo()
+    assert (targets['a'].value, targets['b'].value) == (0, 0)
+
+
+def test_goto_across_checkpoints_matches_stepping():
+    """Jumping over checkpoint spans gives the same state as single steps."""
+    history, targets = make_history(checkpoint_interval=8)
+    for value in range(1, 101):
+        set_value(history, targets['a' if value % 3 else 'b'], 'a' if value % 3 else 'b', value)
+    final = (targets['a'].value, targets['b'].value)
+
+    history.goto(5)
+    jumped = (targets['a'].value, targets['b'].value)
+    assert history._checkpoints  # Spans were squashed on the way
+
+    history.goto(100)
+    assert (targets['a'].value, targets['b'].value) == final
+    while history.version > 5:
+        history.undo()
+    assert (targets['a'].value, targets['b'].value) == jumped == (5, 3)
+
+
+def test_list_values_are_restored_as_lists():
+    """Lists recorded as tuples come back as lists."""
+    history, targets = make_history()
+    targets['a'].items = ['blur']
+    history.record('a', 'items', (), ('blur',))
+    history.undo()
+    assert targets['a'].items == []
+    history.redo()
+    assert targets['a'].items == ['blur']
+
+
+def test_memory_budget_drops_oldest_commands():
+    """Old commands are forgotten once over budget; recent ones still undo."""
+    history, targets = make_history(max_bytes=5000)
+    for value in range(1, 200):
+        set_value(history, targets['a'], 'a', value)
+    assert history.total_bytes <= 5000
+    assert history.base > 0
+    history.goto(0)
+    assert history.version == history.base
+    assert targets['a'].value == history.base
+
+
+def test_checkpoints_count_toward_memory_budget():
+    """Kept checkpoints are part of total_bytes and never push it past the budget."""
+    history, targets = make_history(checkpoint_interval=4, max_bytes=30000)
+    for value in range(1, 60):
+        set_value(history, targets['a'], 'a', value)
+    commands = sum(command.size for command in history.commands)
+    assert history.total_bytes == commands
+
+    history.goto(history.base)
+    assert history._checkpoints
+    checkpoints = sum(checkpoint.size for checkpoint in history._checkpoints.values())
+    assert history.total_bytes == commands + checkpoints <= history.max_bytes
+
+    # New edits trim old commands together with the checkpoints of their spans
+    history.goto(history.end)
+    for value in range(60, 200):
+        set_value(history, targets['a'], 'a', value)
+    checkpoints = sum(checkpoint.size for checkpoint in history._checkpoints.values())
+    assert history.total_bytes == sum(command.size for command in history.commands) + checkpoints
+    assert history.total_bytes <= history.max_bytes
+    assert all(span * 4 >= history.base for span in history._checkpoints)
+
+    # Undone spans past a new edit lose their checkpoints and their bytes
+    history.goto(history.base)
+    history.goto(history.end)
+    history.goto(history.base + 1)
+    set_value(history, targets['a'], 'a', -1)
+    assert history.total_bytes == sum(command.size for command in history.commands) + sum(
+        checkpoint.size for checkpoint in history._checkpoints.values())
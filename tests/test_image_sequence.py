@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+
+import src.ui.main_window  # noqa: F401  The whole app imports without a cycle
+from src.core.image_sequence import ImageSequenceNode
+from src.core.video_node import VideoNode
+
+
+def write_sequence(directory, count, size=(32, 24)):
+    for index in range(count):
+        frame = np.full((size[1], size[0], 3), index * 10, dtype=np.uint8)
+        cv2.imwrite(str(directory / f"shot_{index + 1:04d}.png"), frame)
+    (directory / "other_0001.png").write_bytes(b"")  # A different sequence is ignored
+
+
+def test_node_indexes_a_png_sequence(tmp_path):
+    """Picking one file finds the whole numbered sequence, in order."""
+    write_sequence(tmp_path, 5)
+    node = ImageSequenceNode(str(tmp_path / "shot_0003.png"), frame_rate=10.0, sequence=True)
+    assert node.error is None
+    assert (node.frame_count, node.width, node.height) == (5, 32, 24)
+    assert node.duration == 0.5
+    assert node.get_frame(4)[0, 0, 0] == 40
+    assert node.get_frame_at_time(0.25)[0, 0, 0] == 20
+
+
+def test_node_round_trips_through_a_dictionary(tmp_path):
+    """Saved image nodes come back as image nodes with their frame rate."""
+    write_sequence(tmp_path, 3)
+    node = ImageSequenceNode(str(tmp_path / "shot_0001.png"), frame_rate=12.0, sequence=True)
+    restored = VideoNode.from_dict(node.to_dict())
+    assert isinstance(restored, ImageSequenceNode)
+    assert restored.sequence
+    assert restored.fps == 12.0 and restored.frame_count == 3
+
+
+def test_numbered_file_is_a_still_unless_a_sequence_is_asked_for(tmp_path):
+    """A name ending in digits alone does not pull in the neighbouring files."""
+    write_sequence(tmp_path, 4)
+    node = ImageSequenceNode(str(tmp_path / "shot_0002.png"), still_duration=2.0)
+    assert node.images.is_still
+    assert (node.frame_count, node.duration) == (1, 2.0)
+    assert node.get_frame(0)[0, 0, 0] == 10
+    assert not VideoNode.from_dict(node.to_dict()).sequence
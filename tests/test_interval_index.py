@@ -0,0 +1,31 @@
+import random
+
+from src.core.interval_index import IntervalIndex
+
+
+def brute_force(intervals, start, end):
+    return sorted(item for s, e, item in intervals if s < end and e > start)
+
+
+def test_overlapping_matches_brute_force():
+    """Queries return exactly the intervals a full scan finds, nesting included."""
+    rng = random.Random(3)
+    intervals = []
+    for item in range(500):
+        start = rng.uniform(0, 1000)
+        intervals.append((start, start + rng.choice([0.5, 2.0, 10.0, 200.0]), item))
+    index = IntervalIndex(intervals)
+
+    for _ in range(200):
+        start = rng.uniform(-10, 1010)
+        end = start + rng.uniform(0, 50)
+        assert sorted(index.overlapping(start, end)) == brute_force(intervals, start, end)
+
+
+def test_at_uses_half_open_intervals():
+    """A clip ending where the next begins is not found at the boundary."""
+    index = IntervalIndex([(0.0, 2.0, 'a'), (2.0, 5.0, 'b'), (1.0, 3.0, 'c')])
+    assert index.at(2.0) == ['c', 'b']
+    assert index.at(5.0) == []
+    assert index.end == 5.0
+    assert IntervalIndex().overlapping(0, 10) == []
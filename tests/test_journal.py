@@ -0,0 +1,128 @@
+import os
+
+from src.core.journal import Journal
+
+
+def test_records_survive_a_crash(tmp_path):
+    """Records written before a crash (no close) are recovered in order."""
+    journal = Journal(tmp_path)
+    journal.start()
+    for index in range(3):
+        journal.append({'op': 'move', 'node': 'a', 'pos': [index, 0]})
+    journal.flush()
+
+    snapshot, records = Journal(tmp_path).recover()
+    assert snapshot is None
+    assert [record['pos'][0] for record in records] == [0, 1, 2]
+    assert [record['seq'] for record in records] == [1, 2, 3]
+    journal.close()
+
+
+def test_compaction_replaces_the_log_with_a_snapshot(tmp_path):
+    """After compaction only newer records remain next to the snapshot."""
+    project = {'nodes': []}
+    journal = Journal(tmp_path, compact_every=2, snapshot_provider=lambda: project, idle_delay=0.0)
+    journal.start()
+    journal.append({'op': 'clear'})
+    assert not journal.compact_if_due()
+    journal.append({'op': 'clear'})
+    assert journal.compact_if_due()
+    journal.append({'op': 'remove', 'node': 'b'})
+    journal.flush()
+
+    snapshot, records = Journal(tmp_path).recover()
+    assert snapshot == project
+    assert [record['seq'] for record in records] == [3]
+    journal.close()
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    """A partially written record at the end of the log is dropped."""
+    journal = Journal(tmp_path)
+    journal.start()
+    journal.append({'op': 'remove', 'node': 'a'})
+    journal.close()
+    with open(journal.log_path, 'a') as f:
+        f.write('{"op": "rem')
+
+    snapshot, records = Journal(tmp_path).recover()
+    assert [record['node'] for record in records] == ['a']
+
+
+def test_sequence_continues_after_recovery(tmp_path):
+    """New records follow the recovered ones."""
+    journal = Journal(tmp_path)
+    journal.start()
+    journal.append({'op': 'clear'})
+    journal.close()
+
+    reopened = Journal(tmp_path)
+    reopened.recover()
+    reopened.start()
+    reopened.append({'op': 'clear'})
+    reopened.close()
+    snapshot, records = Journal(tmp_path).recover()
+    assert [record['seq'] for record in records] == [1, 2]
+
+
+def test_discard_leaves_nothing_to_recover(tmp_path):
+    """A clean exit removes the autosave."""
+    journal = Journal(tmp_path)
+    journal.start()
+    journal.append({'op': 'clear'})
+    journal.close(project={'nodes': []})
+    journal.discard()
+    assert Journal(tmp_path).recover() == (None, [])
+
+
+def test_snapshots_wait_for_edits_to_pause(tmp_path):
+    """Appending never builds a snapshot; compaction waits until the editor is idle."""
+    calls = []
+    journal = Journal(tmp_path, compact_every=1, snapshot_provider=lambda: calls.append(1) or {},
+                      idle_delay=60.0)
+    journal.start()
+    for index in range(3):
+        journal.append({'op': 'clear'})
+    assert not journal.compact_if_due()
+    journal.last_append -= 60.0
+    assert journal.compact_if_due()
+    assert calls == [1] and journal.records_since_snapshot == 0
+    journal.close()
+
+
+def test_canvas_journals_bulk_loads_as_one_record(tmp_path):
+    """Placeholder nodes added in a batch are one record that replays as every add."""
+    from PyQt6.QtCore import QPointF
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.canvas import VideoCanvas
+
+    app = QApplication.instance() or QApplication([])
+    canvas = VideoCanvas()
+    canvas.journal = Journal(tmp_path)
+    canvas.journal.start()
+    with canvas.batched_edits():
+        for index in range(3):
+            canvas.add_video_node(f"clip{index}.mp4", QPointF(index * 100, 0), placeholder=True)
+    canvas.journal.close()
+
+    snapshot, records = Journal(tmp_path).recover()
+    assert [record['op'] for record in records] == ['batch']
+    restored = VideoCanvas()
+    restored.apply_record(records[0])
+    assert sorted(widget.video_node.video_path for widget in restored.node_widgets.values()) == \
+        ['clip0.mp4', 'clip1.mp4', 'clip2.mp4']
+
+
+def test_a_live_session_keeps_its_directory(tmp_path):
+    """A second journal cannot claim a directory held by a running process; a stale lock is taken over."""
+    journal = Journal(tmp_path)
+    assert journal.acquire()
+    assert not Journal(tmp_path).acquire()
+    journal.release()
+
+    journal.lock_path.write_text('999999999')  # Left by a process that is gone
+    other = Journal(tmp_path)
+    assert other.acquire()
+    assert journal.lock_path.read_text() == str(os.getpid())
+    other.release()
+    assert not journal.lock_path.exists()
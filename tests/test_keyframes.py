@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from src.core.effects import BrightnessEffect, Curve, Keyframe
+from src.core.video_node import VideoNode
+
+EASES = [(0.42, 0.0, 0.58, 1.0), (0.25, 0.1, 0.25, 1.0), (0.0, 0.0, 1.0, 1.0),
+         (0.9, 0.0, 0.1, 1.0), (0.1, 0.9, 0.9, 0.1), (0.0, 1.0, 0.0, 1.0)]
+
+
+def bezier(p1, p2, s):
+    return 3 * (1 - s) ** 2 * s * p1 + 3 * (1 - s) * s ** 2 * p2 + s ** 3
+
+
+def reference(keyframes, time):
+    """Value of a keyframed parameter at one time, solving Bézier timing by bisection."""
+    if time <= keyframes[0].time:
+        return keyframes[0].value
+    if time >= keyframes[-1].time:
+        return keyframes[-1].value
+    for start, end in zip(keyframes, keyframes[1:]):
+        if start.time <= time < end.time:
+            break
+    u = (time - start.time) / (end.time - start.time)
+    if start.interpolation == 'hold':
+        eased = 0.0
+    elif start.interpolation == 'linear':
+        eased = u
+    else:
+        x1, y1, x2, y2 = start.ease
+        low, high = 0.0, 1.0
+        for _ in range(60):
+            middle = (low + high) / 2
+            if bezier(x1, x2, middle) < u:
+                low = middle
+            else:
+                high = middle
+        eased = bezier(y1, y2, (low + high) / 2)
+    return start.value + (end.value - start.value) * eased
+
+
+@pytest.mark.parametrize('ease', EASES)
+def test_sample_matches_a_bisection_reference(ease):
+    """Linear, hold and Bézier segments agree with a scalar reference to 1e-3 of the value range."""
+    keyframes = [Keyframe(0.0, 0.0, 'bezier', ease), Keyframe(1.0, 100.0, 'linear'),
+                 Keyframe(2.5, -50.0, 'hold'), Keyframe(3.0, 20.0, 'bezier', ease), Keyframe(4.0, 80.0, 'hold'),
+                 Keyframe(4.2, 60.0)]
+    curve = Curve(keyframes)
+    times = np.linspace(-0.5, 4.5, 2001)
+    expected = np.array([reference(keyframes, time) for time in times])
+    assert np.abs(curve.sample(times) - expected).max() <= 1e-3 * 150
+
+
+def test_hold_keeps_the_value_until_the_next_keyframe():
+    """A hold segment jumps exactly at the next keyframe."""
+    curve = Curve([Keyframe(0.0, 1.0, 'hold'), Keyframe(1.0, 5.0)])
+    assert curve.value_at(0.999) == 1.0
+    assert curve.value_at(1.0) == 5.0
+    assert curve.value_at(2.0) == 5.0  # Past the last keyframe its value holds
+
+
+def test_keyframes_replace_and_serialise():
+    """A keyframe at an existing time replaces it; curves round-trip through dictionaries."""
+    curve = Curve([Keyframe(1.0, 2.0), Keyframe(0.0, 0.0)])
+    curve.add(Keyframe(1.0, 4.0, 'bezier', (0.3, 0.0, 0.7, 1.0)))
+    assert [k.time for k in curve.keyframes] == [0.0, 1.0]
+    restored = Curve.from_dict(curve.to_dict())
+    times = np.linspace(0.0, 1.0, 11)
+    assert np.array_equal(restored.sample(times), curve.sample(times))
+    with pytest.raises(ValueError):
+        Keyframe(0.0, 0.0, 'cubic')
+
+
+def test_animated_effects_evaluate_their_curves():
+    """An effect driven by a curve takes the curve's value at a clip time."""
+    effect = BrightnessEffect(0.0)
+    effect.animate('value', Curve([Keyframe(0.0, 0.0), Keyframe(2.0, 40.0)]))
+    assert effect.evaluated(1.0).value == pytest.approx(20.0)
+    assert effect.value == 0.0
+
+
+def test_batched_chains_match_per_frame_evaluation():
+    """Chains sampled for many times at once equal effects evaluated one time at a time."""
+    node = VideoNode("clip.mp4", probe=False)
+    animated = BrightnessEffect(0.0)
+    animated.animate('value', Curve([Keyframe(0.0, -30.0, 'bezier', (0.4, 0.0, 0.2, 1.0)),
+                                     Keyframe(1.5, 60.0)]))
+    node.effects = [animated, BrightnessEffect(10.0)]
+    times = np.linspace(0.0, 2.0, 37)
+    chains = node.effect_chains(times)
+    assert len(chains) == len(times)
+    for time_pos, chain in zip(times, chains):
+        assert chain[0].value == pytest.approx(animated.evaluated(time_pos).value)
+        assert chain[1] is node.effects[1]
+    node.effects = []
+    assert node.effect_chains(times[:3]) == [[], [], []]
+
+
+@pytest.mark.parametrize('reversed_', [False, True])
+def test_clip_time_inverts_source_frame_index(reversed_):
+    """Effects on a preview frame see the clip time the frame is shown at, with speed and reversal."""
+    node = VideoNode("clip.mp4", probe=False)
+    node.fps, node.frame_count, node.duration = 25.0, 500, 20.0
+    node.start_time, node.end_time = 4.0, 12.0
+    node.speed, node.is_reversed = 2.0, reversed_
+    for time_pos in np.arange(0.0, node.get_duration(), 0.4):
+        frame_number = node.source_frame_index(time_pos)
+        assert node.clip_time(frame_number) == pytest.approx(time_pos, abs=1 / node.fps)
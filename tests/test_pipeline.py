@@ -0,0 +1,89 @@
+import random
+import time
+
+import pytest
+
+from src.core.pipeline import Pipeline
+
+
+def jitter(item, salt):
+    """Sleep a pseudo-random time derived from the item, so workers finish out of order."""
+    time.sleep(random.Random(item * 31 + salt).random() * 0.004)
+
+
+def double(item):
+    jitter(item, 1)
+    return item * 2
+
+
+def increment(item):
+    jitter(item, 2)
+    return item + 1
+
+
+def stopped(pipeline):
+    return not any(thread.is_alive() for thread in pipeline.threads)
+
+
+def test_results_keep_source_order_despite_random_stage_delays():
+    """Items overtaking each other inside parallel stages come out in order."""
+    pipeline = Pipeline(iter(range(200)), [(double, 4), (increment, 3)])
+    assert list(pipeline) == [item * 2 + 1 for item in range(200)]
+    assert stopped(pipeline)
+
+
+def test_items_in_flight_are_bounded():
+    """The source is never more than ``max_in_flight`` items ahead of the consumer."""
+    produced = []
+
+    def source():
+        for item in range(50):
+            produced.append(item)
+            yield item
+
+    pipeline = Pipeline(source(), [(double, 4)], max_in_flight=6)
+    for index, result in enumerate(pipeline):
+        assert result == index * 2
+        time.sleep(0.001)
+        # Plus one item the feeder has pulled and holds until the window opens
+        assert len(produced) <= index + 1 + 6 + 1
+
+
+def test_stage_exception_stops_the_stream_mid_way():
+    """A failing item re-raises in the consumer after an in-order prefix, and the threads stop."""
+    def fragile(item):
+        jitter(item, 3)
+        if item == 40:
+            raise ValueError("bad frame")
+        return item
+
+    pipeline = Pipeline(iter(range(200)), [(fragile, 4), (increment, 2)])
+    received = []
+    with pytest.raises(ValueError, match="bad frame"):
+        for result in pipeline:
+            received.append(result)
+    assert received == [item + 1 for item in range(len(received))]
+    assert len(received) <= 40
+    assert stopped(pipeline)
+
+
+def test_source_exception_reaches_the_consumer():
+    """An error while producing items is re-raised by the iterator."""
+    def source():
+        yield from range(5)
+        raise OSError("decoder died")
+
+    pipeline = Pipeline(source(), [(double, 2)])
+    with pytest.raises(OSError, match="decoder died"):
+        list(pipeline)
+    assert stopped(pipeline)
+
+
+def test_closing_early_stops_every_thread():
+    """Leaving the loop early closes the pipeline."""
+    pipeline = Pipeline(iter(range(1000)), [(double, 3)])
+    for result in pipeline:
+        if result >= 10:
+            break
+    pipeline.close()
+    assert stopped(pipeline)
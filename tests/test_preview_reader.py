@@ -0,0 +1,25 @@
+import numpy as np
+
+from src.core.preview_reader import fit_into, fit_size
+
+
+def test_fit_size_keeps_aspect_inside_box():
+    """The fitted size fills one side of the box and never exceeds the other."""
+    assert fit_size(1920, 1080, 640, 640) == (640, 360)
+    assert fit_size(1080, 1920, 640, 640) == (360, 640)
+    assert fit_size(100, 100, 50, 80) == (50, 50)
+    assert fit_size(320, 240, 640, 480) == (640, 480)
+    assert fit_size(10000, 1, 100, 100) == (100, 1)
+
+
+def test_fit_into_centres_on_black():
+    """A smaller-aspect frame is letterboxed; a same-shape frame is copied as is."""
+    frame = np.full((10, 40, 3), 200, np.uint8)
+    out = np.full((20, 20, 3), 7, np.uint8)
+    assert fit_into(frame, out) is out
+    assert not out[:7].any() and not out[12:].any()
+    assert (out[7:12] == 200).all()
+
+    same = np.arange(20 * 20 * 3, dtype=np.uint8).reshape(20, 20, 3)
+    assert fit_into(same, out) is out
+    assert np.array_equal(out, same)
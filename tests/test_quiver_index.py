@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from src.core.quiver import scan_quiver_stats
+from src.core.quiver_index import QuiverIndex
+
+
+def probe(value):
+    return {'frame_count': 10, 'fps': 25.0, 'width': 8, 'height': 6, 'duration': 0.4, 'error': None,
+            'poster': np.full((6, 8, 3), value, dtype=np.uint8)}
+
+
+def record(index, state):
+    for path, (size, mtime_ns) in state.items():
+        index.update(path, size, mtime_ns, probe(0))
+
+
+def test_diff_finds_added_changed_and_removed_files(tmp_path):
+    """A rescan reports new, modified (size or mtime) and deleted files; the rest is unchanged."""
+    quiver = tmp_path / 'quiver'
+    (quiver / 'nested').mkdir(parents=True)
+    for name in ('a.mp4', 'b.mov', 'c.mkv', 'nested/d.avi'):
+        (quiver / name).write_bytes(b'0' * 100)
+    (quiver / 'notes.txt').write_bytes(b'not media')
+    (quiver / '.hidden.mp4').write_bytes(b'0')
+
+    index = QuiverIndex(quiver, index_dir=str(tmp_path / 'index'))
+    state = scan_quiver_stats(quiver)
+    assert sorted(os.path.relpath(path, quiver) for path in state) == ['a.mp4', 'b.mov', 'c.mkv',
+                                                                       os.path.join('nested', 'd.avi')]
+    added, removed, changed, unchanged = index.diff(state)
+    assert added == sorted(state) and removed == changed == unchanged == []
+    record(index, state)
+    index.save()
+
+    (quiver / 'b.mov').write_bytes(b'0' * 200)          # Size changed
+    os.utime(quiver / 'c.mkv', ns=(10 ** 18, 10 ** 18))  # Only the mtime changed
+    (quiver / 'nested' / 'd.avi').unlink()
+    (quiver / 'e.mp4').write_bytes(b'0')
+
+    reloaded = QuiverIndex(quiver, index_dir=str(tmp_path / 'index'))
+    reloaded.load()
+    added, removed, changed, unchanged = reloaded.diff(scan_quiver_stats(quiver))
+    assert added == [str(quiver / 'e.mp4')]
+    assert removed == [str(quiver / 'nested' / 'd.avi')]
+    assert changed == [str(quiver / 'b.mov'), str(quiver / 'c.mkv')]
+    assert unchanged == [str(quiver / 'a.mp4')]
+
+
+def test_update_and_remove_keep_posters_in_step(tmp_path):
+    """Re-probing a file replaces its poster, and removing it deletes the poster."""
+    index = QuiverIndex(tmp_path / 'quiver', index_dir=str(tmp_path / 'index'))
+    path = str(tmp_path / 'quiver' / 'a.mp4')
+    index.update(path, 100, 1, probe(50))
+    index.update(path, 200, 2, probe(90))
+    assert len(os.listdir(index.poster_dir)) == 1
+    info = index.media_info(path)
+    assert info['fps'] == 25.0 and info['path'] == path
+    assert info['poster'][0, 0, 0] == 90
+
+    index.save()
+    assert not index.dirty
+    index.remove(path)
+    assert index.dirty and index.media_info(path) is None
+    assert os.listdir(index.poster_dir) == []
+    assert index.diff({}) == ([], [], [], [])
@@ -0,0 +1,55 @@
+import numpy as np
+
+from src.core.scene_detect import (HIST_LEVELS, block_features, block_scores, detect_cuts,
+                                   shots_from_cuts)
+
+
+def brute_force_scores(frames):
+    """Per-pair scores computed one frame pair at a time."""
+    shift = 8 - int(np.log2(HIST_LEVELS))
+    hist_scores, pixel_scores = [], []
+    for a, b in zip(frames, frames[1:]):
+        hists = []
+        for frame in (a, b):
+            q = (frame >> shift).astype(int)
+            bins = (q[..., 0] * HIST_LEVELS + q[..., 1]) * HIST_LEVELS + q[..., 2]
+            hists.append(np.bincount(bins.ravel(), minlength=HIST_LEVELS ** 3))
+        pixels = a.shape[0] * a.shape[1]
+        hist_scores.append(np.abs(hists[1] - hists[0]).sum() / (2 * pixels))
+        luma_a = a.astype(np.float64) @ [0.299, 0.587, 0.114]
+        luma_b = b.astype(np.float64) @ [0.299, 0.587, 0.114]
+        pixel_scores.append(np.abs(luma_b - luma_a).mean() / 255)
+    return np.array(hist_scores), np.array(pixel_scores)
+
+
+def test_block_scores_match_pairwise_scores():
+    """Batched block scores equal scores computed frame pair by frame pair."""
+    rng = np.random.default_rng(5)
+    frames = rng.integers(0, 256, (12, 9, 16, 3), dtype=np.uint8)
+    frames[4] = frames[3]  # An unchanged frame scores zero
+    hist_scores, pixel_scores = block_scores(*block_features(frames))
+    expected_hist, expected_pixel = brute_force_scores(frames)
+
+    assert len(hist_scores) == len(frames) - 1
+    np.testing.assert_allclose(hist_scores, expected_hist, atol=1e-6)
+    np.testing.assert_allclose(pixel_scores, expected_pixel, atol=1e-5)
+    assert hist_scores[3] == 0 and pixel_scores[3] == 0
+
+
+def test_cuts_need_both_scores_and_a_minimum_shot_length():
+    """A cut needs both scores over threshold, and cuts too close to the last one are dropped."""
+    hist = np.zeros(40, np.float32)
+    pixel = np.zeros(40, np.float32)
+    hist[[10, 12, 25, 30]] = 0.9
+    pixel[[10, 12, 25]] = 0.5  # Frame 30 only changes colour distribution
+    pixel[35] = 0.5            # Frame 35 only changes brightness
+    assert detect_cuts(hist, pixel, min_shot_frames=5) == [10, 25]
+    assert detect_cuts(hist, pixel, min_shot_frames=1) == [10, 12, 25]
+    assert detect_cuts(hist, pixel, min_shot_frames=13) == [25]  # Too close to the clip start
+
+
+def test_shots_cover_the_clip():
+    """Shots run from cut to cut and together cover every frame."""
+    assert shots_from_cuts([10, 25], 40, 10.0) == [(0.0, 1.0), (1.0, 2.5), (2.5, 4.0)]
+    assert shots_from_cuts([], 40, 10.0) == [(0.0, 4.0)]
+    assert shots_from_cuts([], 0, 10.0) == []
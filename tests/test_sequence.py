@@ -0,0 +1,71 @@
+import random
+import time
+
+from src.core.sequence import ClipSequence
+
+
+def starts(sequence):
+    return [start for item, start in sequence]
+
+
+def test_from_items_lays_clips_end_to_end():
+    """Starts are the running sum of advances; overlaps shorten the advance."""
+    sequence = ClipSequence.from_items([('a', 2.0, 2.0), ('b', 2.5, 3.0), ('c', 1.0, 1.0)])
+    assert list(sequence) == [('a', 0.0), ('b', 2.0), ('c', 4.5)]
+    assert sequence.duration == 5.5
+    assert sequence.entry(1) == ('b', 2.0, 2.5, 3.0)
+
+
+def test_find_maps_times_to_clips():
+    """The clip at a time is the last one starting at or before it."""
+    sequence = ClipSequence.from_items([('a', 2.0, 2.0), ('b', 2.5, 3.0), ('c', 1.0, 1.0)])
+    assert sequence.find(0.0) == (0, 'a', 0.0)
+    assert sequence.find(1.99) == (0, 'a', 0.0)
+    assert sequence.find(4.6) == (2, 'c', 4.5)
+    assert sequence.find(5.5) is None
+    assert sequence.find(-1.0) is None
+    assert ClipSequence().find(0.0) is None
+
+
+def test_ripple_edits_match_a_list_and_keep_snapshots():
+    """Random inserts, deletes and trims agree with a plain list model."""
+    rng = random.Random(7)
+    model = [(i, 1.0) for i in range(50)]
+    sequence = ClipSequence.from_items((item, length, length) for item, length in model)
+    snapshot = sequence
+    for step in range(300):
+        action = rng.random()
+        if action < 0.4 or not model:
+            index = rng.randint(0, len(model))
+            length = rng.uniform(0.1, 3.0)
+            model.insert(index, (100 + step, length))
+            sequence = sequence.insert(index, 100 + step, length, length)
+        elif action < 0.7:
+            index = rng.randrange(len(model))
+            del model[index]
+            sequence = sequence.delete(index)
+        else:
+            index = rng.randrange(len(model))
+            length = rng.uniform(0.1, 3.0)
+            model[index] = (model[index][0], length)
+            sequence = sequence.update(index, advance=length, duration=length)
+
+    expected, start = [], 0.0
+    for item, length in model:
+        expected.append((item, start))
+        start += length
+    assert [item for item, _ in sequence] == [item for item, _ in expected]
+    assert all(abs(a - b) < 1e-9 for a, b in zip(starts(sequence), [s for _, s in expected]))
+    assert list(snapshot) == [(i, float(i)) for i in range(50)]
+
+
+def test_large_sequences_edit_quickly():
+    """Edits on 50,000 clips touch only a logarithmic path."""
+    sequence = ClipSequence.from_items((i, 1.0, 1.0) for i in range(50000))
+    began = time.perf_counter()
+    for i in range(1000):
+        sequence = sequence.update(25000, advance=2.0, duration=2.0)
+        sequence = sequence.insert(10, 'x', 1.0, 1.0).delete(10)
+        assert sequence.find(40000.5)[0] == 39999
+    assert time.perf_counter() - began < 5.0
+    assert sequence.duration == 50001.0
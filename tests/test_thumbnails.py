@@ -0,0 +1,71 @@
+import math
+
+import numpy as np
+
+from src.core.effects import BrightnessEffect, CropEffect
+from src.core.thumbnails import (COARSEST_THUMBS, MAX_THUMBS, MIN_STEP, ThumbnailPyramid)
+from src.core.video_node import VideoNode
+from src.ui.thumbnail_loader import ThumbnailLoader
+
+
+def pyramid(duration, value=0):
+    levels = ThumbnailPyramid.plan_levels(duration)
+    slots = levels[-1][0] + levels[-1][1]
+    atlas = np.full((slots, 6, 8, 3), value, dtype=np.uint8)
+    return ThumbnailPyramid(atlas, np.zeros(slots, np.uint8), levels, 'clip.mp4')
+
+
+def test_plan_levels_halves_the_spacing_down_to_the_finest_step():
+    """Levels run coarse to fine, packed one after another, each covering the clip."""
+    for duration in (0.2, 3.0, 60.0, 10000.0):
+        levels = ThumbnailPyramid.plan_levels(duration)
+        offset = 0
+        for index, (level_offset, count, step) in enumerate(levels):
+            assert level_offset == offset
+            assert count == max(1, math.ceil(duration / step))
+            if index:
+                assert step == levels[index - 1][2] / 2
+            offset += count
+        assert levels[0][1] <= COARSEST_THUMBS
+        assert levels[-1][2] == max(MIN_STEP, duration / MAX_THUMBS)
+        assert levels[-1][1] <= MAX_THUMBS
+
+
+def test_thumbnail_falls_back_to_coarser_levels_while_building():
+    """Missing thumbnails are replaced by the nearest filled coarser one, or None."""
+    strip = pyramid(60.0)
+    fine = strip.level_for(MIN_STEP)
+    assert fine == len(strip.levels) - 1
+    assert strip.thumbnail(10.0, MIN_STEP) is None
+
+    coarse_offset, coarse_count, coarse_step = strip.levels[0]
+    coarse_slot = coarse_offset + int(10.0 / coarse_step)
+    strip.filled[coarse_slot] = 1
+    assert strip.thumbnail(10.0, MIN_STEP) == coarse_slot
+
+    offset, count, step = strip.levels[fine]
+    strip.filled[offset + int(10.0 / step)] = 1
+    assert strip.thumbnail(10.0, MIN_STEP) == offset + int(10.0 / step)
+    strip.filled[offset + count - 1] = 2  # No frame there: keep falling back
+    assert strip.thumbnail(1e6, MIN_STEP) is None
+
+
+def test_filmstrip_images_show_the_clip_effects():
+    """Thumbnails run the node's effects and are cached per effects state."""
+    strip = pyramid(4.0, value=100)
+    loader = ThumbnailLoader()
+    try:
+        node = VideoNode("clip.mp4", probe=False)
+        plain = loader.image(strip, 0, node, loader.effects_key(node))
+        assert plain.pixelColor(0, 0).red() == 100
+
+        node.effects = [BrightnessEffect(50.0)]
+        brighter = loader.image(strip, 0, node, loader.effects_key(node))
+        assert brighter.pixelColor(0, 0).red() > 100
+
+        node.effects.append(CropEffect(width=0.5))
+        cropped = loader.image(strip, 0, node, loader.effects_key(node))
+        assert (cropped.width(), cropped.height()) == (4, 6)
+        assert len(loader.images) == 3
+    finally:
+        loader.shutdown()
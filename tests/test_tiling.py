@@ -0,0 +1,62 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.effects import RotateEffect, ScaleEffect
+from src.core.effects import tiling
+
+
+@pytest.fixture
+def frame_4k():
+    """A 4K frame of smooth gradients and low-frequency detail."""
+    y, x = np.mgrid[0:2160, 0:3840].astype(np.float32)
+    frame = np.stack([x / 3840 * 255,
+                      y / 2160 * 255,
+                      127.5 + 100 * np.sin(x / 23.0) * np.cos(y / 17.0)], axis=2)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture(autouse=True)
+def several_bands(monkeypatch):
+    """Split outputs into bands even on a single-core machine."""
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+
+
+def within_one_level(result, expected):
+    return result.shape == expected.shape and np.abs(result.astype(np.int16) - expected).max() <= 1
+
+
+@pytest.mark.parametrize('scale', [(0.5, 0.5), (0.75, 0.4), (1.25, 1.1)])
+def test_tiled_scale_matches_a_single_resize(frame_4k, scale):
+    """Banded Lanczos resampling gives the same frame as one cv2.resize call."""
+    effect = ScaleEffect(*scale)
+    size = effect.output_size((3840, 2160))
+    expected = cv2.resize(frame_4k, size, interpolation=cv2.INTER_LANCZOS4)
+    assert within_one_level(effect.apply(frame_4k), expected)
+
+
+@pytest.mark.parametrize('angle', [30.0, -90.0, 7.5])
+def test_tiled_rotation_matches_a_single_warp(frame_4k, angle):
+    """Banded rotation gives the same frame as one cv2.warpAffine call."""
+    effect = RotateEffect(angle)
+    matrix, size = effect.matrix((3840, 2160))
+    expected = cv2.warpAffine(frame_4k, matrix, size)
+    assert within_one_level(effect.apply(frame_4k), expected)
+
+
+def test_small_outputs_are_rendered_in_one_call(frame_4k):
+    """Below the pixel threshold the render callback runs once on the whole region."""
+    calls = []
+
+    def render(frame, in_region, region, size, dst):
+        calls.append(region)
+        return frame
+
+    small = frame_4k[:256, :256]
+    tiling.apply_tiled(ScaleEffect(), small, (0, 0, 256, 256), (0, 0, 256, 256), (256, 256), render)
+    assert calls == [(0, 0, 256, 256)]
+    calls.clear()
+    tiling.apply_tiled(ScaleEffect(), frame_4k, (0, 0, 3840, 2160), (0, 0, 3840, 2160), (3840, 2160), render)
+    assert len(calls) == 4 and calls[0][1] == 0 and calls[-1][3] == 2160
@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from src.core.image_sequence import ImageSequenceNode
+from src.core.transitions import FadeTransition
+from src.ui.timeline import Timeline
+
+
+def clips(directory, count):
+    nodes = []
+    for index in range(count):
+        path = directory / f"clip{chr(ord('a') + index)}.png"
+        cv2.imwrite(str(path), np.full((12, 16, 3), index, dtype=np.uint8))
+        nodes.append(ImageSequenceNode(str(path), still_duration=2.0))
+    return nodes
+
+
+def chain(*nodes):
+    """Link nodes in order and return their connections."""
+    for node, next_node in zip(nodes, nodes[1:]):
+        node.next_node, next_node.prev_node = next_node, node
+    return list(zip(nodes, nodes[1:]))
+
+
+def rebuilt(connections):
+    """Clip placements of a timeline built from scratch."""
+    timeline = Timeline()
+    timeline.update_clips(connections)
+    return [list(sequence) for sequence in timeline.sequences]
+
+
+def test_trims_update_clips_in_place(tmp_path):
+    """A trimmed clip ripples later clips as a rebuild would, and unchanged timing rebuilds nothing."""
+    app = QApplication.instance() or QApplication([])
+    a, b, c, d = clips(tmp_path, 4)
+    connections = chain(a, b, c, d)
+    b.set_transition_out(FadeTransition(duration=0.5))
+    timeline = Timeline()
+    timeline.update_clips(connections)
+
+    c.set_time_range(0.0, 1.0)
+    timeline.clip_changed(c)
+    assert [list(sequence) for sequence in timeline.sequences] == rebuilt(connections)
+    assert timeline.clips[3] == (d, 2.0 + 1.5 + 1.0)
+
+    sequences = list(timeline.sequences)
+    timeline.update_clips(connections)
+    assert timeline.sequences == sequences  # Same chains and timing: left alone
+
+    a.set_speed(2.0)  # Picked up by comparing timings
+    timeline.update_clips(connections)
+    assert [list(sequence) for sequence in timeline.sequences] == rebuilt(connections)
+
+
+def test_link_and_unlink_match_a_rebuild(tmp_path):
+    """Joining two sequences and splitting them again gives what rebuilding would."""
+    app = QApplication.instance() or QApplication([])
+    a, b, c, d, e = clips(tmp_path, 5)
+    first, second = chain(a, b), chain(c, d, e)
+    b.set_transition_out(FadeTransition(duration=1.0))
+    timeline = Timeline()
+    timeline.update_clips(first + second)
+    assert len(timeline.sequences) == 2
+
+    chain(b, c)
+    timeline.link(b, c)
+    connections = first + [(b, c)] + second
+    assert [list(sequence) for sequence in timeline.sequences] == rebuilt(connections)
+    assert timeline.locations[e] == (0, 4)
+
+    c.next_node = d.prev_node = None
+    timeline.unlink(c, d)
+    connections = first + [(b, c), (d, e)]
+    assert [list(sequence) for sequence in timeline.sequences] == rebuilt(connections)
+    assert timeline.clips[-1] == (e, 2.0)
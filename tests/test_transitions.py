@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+
+from src.core.image_sequence import ImageSequenceNode
+from src.core.sequence import ClipSequence
+from src.core.sequence_player import SequencePlayer
+from src.core.transitions import FadeTransition, WipeTransition, blend_frames
+from src.ui.timeline import Timeline
+
+
+def frames():
+    rng = np.random.default_rng(3)
+    return (rng.integers(0, 256, (24, 32, 3), dtype=np.uint8),
+            rng.integers(0, 256, (24, 32, 3), dtype=np.uint8))
+
+
+def test_transitions_start_on_the_outgoing_and_end_on_the_incoming_frame():
+    """Progress 0 shows only clip A and progress 1 only clip B."""
+    frame_a, frame_b = frames()
+    for transition in (FadeTransition(), WipeTransition(direction='left'),
+                       WipeTransition(direction='bottom', softness=0.0)):
+        assert np.array_equal(transition.render(frame_a, frame_b, 0.0), frame_a)
+        assert np.array_equal(transition.render(frame_a, frame_b, 1.0), frame_b)
+
+
+def test_blend_frames_fits_the_incoming_frame():
+    """An incoming frame of another size is resized to the outgoing one."""
+    frame_a, frame_b = frames()
+    blended = blend_frames(FadeTransition(), frame_a, cv2.resize(frame_b, (16, 12)), 1.5)
+    assert blended.shape == frame_a.shape
+    assert np.array_equal(blended, cv2.resize(cv2.resize(frame_b, (16, 12)), (32, 24),
+                                              interpolation=cv2.INTER_AREA))
+
+
+def still(directory, name, value):
+    path = directory / f"{name}.png"  # Unnumbered, so each file is a still of its own
+    cv2.imwrite(str(path), np.full((24, 32, 3), value, dtype=np.uint8))
+    return ImageSequenceNode(str(path), still_duration=1.0)
+
+
+def test_sequence_player_blends_the_overlap(tmp_path):
+    """Inside a fade both clips play and are mixed by the transition's progress."""
+    node_a, node_b = still(tmp_path, 'black', 0), still(tmp_path, 'grey', 200)
+    node_a.next_node = node_b
+    node_a.transition_out = FadeTransition(duration=0.5)
+    sequence = ClipSequence.from_items(Timeline.chain_timing(node_a, set()))
+    assert sequence.entry(1)[1] == 0.5
+
+    player = SequencePlayer(sequence, fps=10.0)
+    try:
+        shown = {round(time_pos, 2): (node, frame) for time_pos, node, frame in iter(player.read, None)}
+    finally:
+        player.close()
+    assert len(shown) == 15
+    assert shown[0.4][0] is node_a and shown[0.4][1][0, 0, 0] == 0
+    assert shown[0.5][0] is node_b and shown[0.5][1][0, 0, 0] == 0
+    assert shown[0.7][0] is node_b and abs(int(shown[0.7][1][0, 0, 0]) - 80) <= 1
+    assert shown[1.0][1][0, 0, 0] == 200
+
+    # Starting inside the overlap opens the outgoing clip too
+    player = SequencePlayer(sequence, fps=10.0, start_time=0.7)
+    try:
+        time_pos, node, frame = player.read()
+    finally:
+        player.close()
+    assert node is node_b and abs(int(frame[0, 0, 0]) - 80) <= 1
@@ -0,0 +1,53 @@
+import numpy as np
+
+from src.core.audio.waveform import (BASE_BLOCK, WaveformPyramid, _base_peaks, _build_levels)
+
+
+def raw_audio(count, seed=8):
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0, 3000, count).clip(-32768, 32767).astype(np.int16)
+    samples[count // 3] = -32768  # Single-sample spikes must survive every level
+    samples[2 * count // 3] = 32767
+    return samples
+
+
+def test_every_level_matches_raw_min_max():
+    """Each peak of each level is the min and max of exactly the raw samples it covers."""
+    raw = raw_audio(BASE_BLOCK * 1000 + 17)  # A partial final block too
+    peaks, levels = _build_levels(_base_peaks(raw))
+    assert len(levels) > 3
+    for offset, count, samples in levels:
+        assert count == -(-len(raw) // samples)
+        for index in range(count):
+            span = raw[index * samples:(index + 1) * samples]
+            assert tuple(peaks[offset + index]) == (span.min(), span.max())
+
+
+def test_peaks_for_range_matches_raw_min_max():
+    """Each pixel column reports the extremes of the raw samples under the peaks it was given."""
+    rate = 8000
+    raw = raw_audio(BASE_BLOCK * 2000)
+    pyramid = WaveformPyramid(*_build_levels(_base_peaks(raw)), rate)
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        start = rng.uniform(0, pyramid.duration)
+        end = min(pyramid.duration, start + rng.uniform(0.01, pyramid.duration))
+        pixels = int(rng.integers(1, 400))
+        mins, maxs = pyramid.peaks_for_range(start, end, pixels)
+        assert len(mins) == len(maxs) == pixels
+
+        offset, count, samples = pyramid.levels[pyramid.level_for((end - start) / pixels)]
+        peak_duration = samples / rate
+        first = max(0, min(int(start / peak_duration), count))
+        last = max(0, min(int(np.ceil(end / peak_duration)), count))
+        edges = np.linspace(0, last - first, pixels + 1).astype(np.intp)
+        for column in range(pixels):
+            lo = min(edges[column], last - first - 1)
+            hi = max(edges[column + 1], lo + 1)
+            span = raw[(first + lo) * samples:(first + hi) * samples]
+            assert mins[column] * 32768 == span.min()
+            assert maxs[column] * 32768 == span.max()
+
+    assert [len(part) for part in pyramid.peaks_for_range(1.0, 1.0, 10)] == [0, 0]
+    mins, maxs = pyramid.peaks_for_range(pyramid.duration + 1, pyramid.duration + 2, 10)
+    assert not mins.any() and not maxs.any() and len(mins) == 10